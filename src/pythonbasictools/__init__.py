@@ -9,16 +9,34 @@ __package__ = "pythonbasictools"
 __version__ = importlib_metadata.version(__package__)
 
 from . import google_drive, lock
-from .collections_tools import list_insert_replace_at, ravel_dict, sequence_get
+from .collections_tools import (
+    ParameterGrid,
+    list_insert_replace_at,
+    ravel_dict,
+    sequence_get,
+    unravel_dict,
+)
 from .decorators import log_func
 from .device import DeepLib, log_device_setup
+from .experiment_utils.atomic_io import Durability
+from .experiment_utils.checkpoint import TaskCheckpoint
 from .experiment_utils.metadata_file import MetadataFile
 from .experiment_utils.output_folder import OutputFolder
 from .experiment_utils.run_output_file import RunOutputFile
-from .hash_tools import hash_dict
+from .experiment_utils.save_policy import SavePolicy
+from .hash_tools import hash_dict, hash_dicts
 from .logging_tools import logs_file_setup
 from .multiprocessing_tools import (
+    AsyncioPool,
+    ExecutorPool,
+    TaskError,
+    TaskTimeoutError,
+    WorkerPool,
     apply_func_multiprocess,
+    iter_func_multiprocess,
     multiprocess_logger_init,
     worker_init,
 )
+from .profiling_tools import RunProfile
+from .scheduling_tools import TaskCostModel
+from .shared_memory_tools import Shared
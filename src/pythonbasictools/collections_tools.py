@@ -1,29 +1,196 @@
 import itertools
-from typing import Any, Dict, List, Optional, Sequence, Union
-
-
-def ravel_dict(d: dict, key_sep: str = ".") -> dict:
+import math
+import threading
+from collections.abc import Sequence as SequenceABC
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+# The raveled keys by separator and prefix, then by key, so the keys of the dictionaries sharing a schema, e.g. the
+# result files of an experiment, are built once and shared by every raveled dictionary. The cache holds at most
+# RAVEL_KEY_CACHE_SIZE prefixes and as many keys in total, and is cleared when full.
+RAVEL_KEY_CACHE_SIZE = 2**16
+_RAVEL_KEY_CACHE: Dict[Tuple[str, str], Dict[str, str]] = {}
+_UNRAVEL_KEY_CACHE: Dict[Tuple[str, str], Tuple[str, ...]] = {}
+_nb_ravel_keys_cached = 0
+# Guards the insertions in and the eviction of the cache of raveled keys, which ravel_dict uses from many threads,
+# e.g. when output files are read by a thread pool. The lookups take no lock.
+_RAVEL_KEY_CACHE_LOCK = threading.Lock()
+
+
+def _clear_ravel_key_cache():
+    with _RAVEL_KEY_CACHE_LOCK:
+        _evict_ravel_keys()
+
+
+def _evict_ravel_keys():
+    global _nb_ravel_keys_cached
+    # The dictionaries of keys are emptied too, since ravel_dict may still hold the one of the current prefix.
+    for joined_keys in _RAVEL_KEY_CACHE.values():
+        joined_keys.clear()
+    _RAVEL_KEY_CACHE.clear()
+    _nb_ravel_keys_cached = 0
+
+
+def _joined_keys(prefix: str, key_sep: str) -> Dict[str, str]:
+    joined_keys = _RAVEL_KEY_CACHE.get((key_sep, prefix))
+    if joined_keys is None:
+        with _RAVEL_KEY_CACHE_LOCK:
+            joined_keys = _RAVEL_KEY_CACHE.get((key_sep, prefix))
+            if joined_keys is None:
+                if len(_RAVEL_KEY_CACHE) >= RAVEL_KEY_CACHE_SIZE:
+                    _evict_ravel_keys()
+                joined_keys = _RAVEL_KEY_CACHE[(key_sep, prefix)] = {}
+    return joined_keys
+
+
+def _cache_joined_key(joined_keys: Dict[str, str], k: str, key: str):
+    global _nb_ravel_keys_cached
+    with _RAVEL_KEY_CACHE_LOCK:
+        if _nb_ravel_keys_cached >= RAVEL_KEY_CACHE_SIZE:
+            _evict_ravel_keys()
+        joined_keys[k] = key
+        _nb_ravel_keys_cached += 1
+
+
+def _split_key(key: str, key_sep: str) -> Tuple[str, ...]:
+    cache_key = (key_sep, key)
+    parts = _UNRAVEL_KEY_CACHE.get(cache_key)
+    if parts is None:
+        if len(_UNRAVEL_KEY_CACHE) >= RAVEL_KEY_CACHE_SIZE:
+            _UNRAVEL_KEY_CACHE.clear()
+        parts = _UNRAVEL_KEY_CACHE[cache_key] = tuple(key.split(key_sep))
+    return parts
+
+
+def ravel_dict(
+    d: dict,
+    key_sep: str = ".",
+    max_depth: Optional[int] = None,
+    ravel_sequences: bool = False,
+) -> dict:
     """
     Ravel a dictionary into a single level dictionary.
 
+    The nested keys are joined with the separator, e.g. ``{"a": {"b": 1}}`` becomes ``{"a.b": 1}``, in a single pass
+    without recursion. The joined keys are cached, so raveling many dictionaries with the same schema builds each key
+    only once. The empty nested dictionaries are dropped.
+
+    :Example:
+        >>> ravel_dict({"a": {"b": 1, "c": [2, 3]}, "d": 4})
+        {'a.b': 1, 'a.c': [2, 3], 'd': 4}
+        >>> ravel_dict({"a": {"b": 1, "c": [2, 3]}, "d": 4}, ravel_sequences=True)
+        {'a.b': 1, 'a.c.0': 2, 'a.c.1': 3, 'd': 4}
+
     :param d: The dictionary to ravel.
     :type d: dict
     :param key_sep: The separator to use between keys in the raveled dictionary.
     :type key_sep: str
+    :param max_depth: The number of nesting levels to ravel. The values deeper than that are kept as they are. If
+        None, every level is raveled. Default is None.
+    :type max_depth: Optional[int]
+    :param ravel_sequences: If True, the lists and tuples are also raveled, with their indexes as keys. Default is
+        False.
+    :type ravel_sequences: bool
     :return: The raveled dictionary.
     :rtype: dict
     """
     raveled_dict = {}
-    for k, v in d.items():
-        if isinstance(v, dict):
-            raveled_v = ravel_dict(v, key_sep)
-            for k_, v_ in raveled_v.items():
-                raveled_dict[f"{k}{key_sep}{k_}"] = v_
+    # The stack holds the prefix, the remaining items and the depth of the containers being raveled.
+    stack: List[Tuple[Optional[str], Iterable, int]] = [(None, iter(d.items()), 0)]
+    while stack:
+        prefix, items, depth = stack[-1]
+        can_ravel = max_depth is None or depth < max_depth
+        joined_keys = _joined_keys(prefix, key_sep) if prefix is not None else None
+        for k, v in items:
+            if joined_keys is None:
+                key = k
+            # Only the str keys are cached, since keys like 1, 1.0 and True are equal but do not format the same.
+            elif type(k) is str:
+                key = joined_keys.get(k)
+                if key is None:
+                    key = f"{prefix}{key_sep}{k}"
+                    _cache_joined_key(joined_keys, k, key)
+            else:
+                key = f"{prefix}{key_sep}{k}"
+            if can_ravel:
+                if isinstance(v, dict):
+                    children = iter(v.items())
+                elif ravel_sequences and isinstance(v, (list, tuple)):
+                    children = iter(enumerate(v))
+                else:
+                    raveled_dict[key] = v
+                    continue
+                stack.append((key if prefix is not None else f"{k}", children, depth + 1))
+                break
+            raveled_dict[key] = v
         else:
-            raveled_dict[k] = v
+            stack.pop()
     return raveled_dict
 
 
+def unravel_dict(d: dict, key_sep: str = ".", unravel_sequences: bool = False) -> dict:
+    """
+    Unravel a dictionary raveled by :func:`ravel_dict` into a nested dictionary, splitting its keys on the separator.
+    The keys that are not strings are kept as they are.
+
+    :Example:
+        >>> unravel_dict({"a.b": 1, "a.c.0": 2, "a.c.1": 3, "d": 4}, unravel_sequences=True)
+        {'a': {'b': 1, 'c': [2, 3]}, 'd': 4}
+
+    :param d: The raveled dictionary.
+    :type d: dict
+    :param key_sep: The separator used between keys in the raveled dictionary.
+    :type key_sep: str
+    :param unravel_sequences: If True, the nested dictionaries whose keys are exactly "0", "1", ..., "n-1" are
+        converted to lists, the inverse of ``ravel_sequences`` in :func:`ravel_dict`. Default is False.
+    :type unravel_sequences: bool
+    :return: The nested dictionary.
+    :rtype: dict
+
+    :raises ValueError: If a key is both a value and the prefix of other keys, e.g. "a" and "a.b".
+    """
+    unraveled_dict: dict = {}
+    nested_ids = set()
+    for key, value in d.items():
+        if not isinstance(key, str) or key_sep not in key:
+            if id(unraveled_dict.get(key)) in nested_ids:
+                raise ValueError(f"The key {key!r} is both a value and the prefix of other keys.")
+            unraveled_dict[key] = value
+            continue
+        *parents, leaf = _split_key(key, key_sep)
+        node = unraveled_dict
+        for part in parents:
+            child = node.get(part, _MISSING)
+            if child is _MISSING:
+                child = node[part] = {}
+                nested_ids.add(id(child))
+            elif id(child) not in nested_ids:
+                raise ValueError(f"The key {key!r} is both a value and the prefix of other keys.")
+            node = child
+        if id(node.get(leaf)) in nested_ids:
+            raise ValueError(f"The key {key!r} is both a value and the prefix of other keys.")
+        node[leaf] = value
+    if unravel_sequences:
+        return _dicts_to_lists(unraveled_dict, nested_ids)
+    return unraveled_dict
+
+
+def _dicts_to_lists(d: dict, nested_ids: set) -> Any:
+    # The nested dictionaries are converted from the deepest up, without recursion.
+    order, stack = [], [d]
+    while stack:
+        node = stack.pop()
+        order.append(node)
+        stack.extend(child for child in node.values() if id(child) in nested_ids)
+    converted: Dict[int, Any] = {}
+    for node in reversed(order):
+        for key, child in node.items():
+            if id(child) in converted:
+                node[key] = converted[id(child)]
+        if node is not d and all(key == str(i) for i, key in enumerate(node)):
+            converted[id(node)] = list(node.values())
+    return d
+
+
 def sequence_get(sequence: Sequence, idx: int, default: Any = None) -> Any:
     """
     Get an item from a sequence at a specific index. If the index is out of bounds, return a default value.
@@ -113,8 +280,16 @@ def list_of_dicts_to_dict_of_lists(list_of_dicts: List[dict], default: Any = Non
     """
     Convert a list of dictionaries to a dictionary of lists.
     The keys of the dictionaries are used as keys in the dictionary of lists.
-    The values of the dictionaries are inserted into the lists at the same index as the dictionary.
-    This means that every list in the dictionary of lists will have the same length as the list of dictionaries.
+    The values of the dictionaries are inserted into the lists at the same index as the dictionary, and the cells of
+    the dictionaries missing a key are filled with the default value. The list of a key ends at the last dictionary
+    having this key, so it is shorter than the list of dictionaries if the last ones do not have the key.
+
+    The lists are allocated once with their final length and filled in a single pass over the dictionaries. See
+    :func:`list_of_dicts_to_dict_of_arrays` to get NumPy arrays instead.
+
+    :Example:
+        >>> list_of_dicts_to_dict_of_lists([{"a": 1, "b": 2}, {"a": 3}, {"c": 4}])
+        {'a': [1, 3], 'b': [2], 'c': [None, None, 4]}
 
     :param list_of_dicts: The list of dictionaries to convert.
     :type list_of_dicts: List[dict]
@@ -124,13 +299,54 @@ def list_of_dicts_to_dict_of_lists(list_of_dicts: List[dict], default: Any = Non
     :return: The dictionary of lists.
     :rtype: dict
     """
+    if not hasattr(list_of_dicts, "__len__"):
+        list_of_dicts = list(list_of_dicts)
+    n_rows = len(list_of_dicts)
     dict_of_lists: Dict[str, List[Any]] = {}
+    last_index: Dict[str, int] = {}
     for i, d in enumerate(list_of_dicts):
         for k, v in d.items():
-            dict_of_lists[k] = list_insert_replace_at(dict_of_lists.get(k, []), i, v, default=default)
+            try:
+                dict_of_lists[k][i] = v
+            except KeyError:
+                dict_of_lists[k] = [default] * n_rows
+                dict_of_lists[k][i] = v
+        last_index.update(dict.fromkeys(d, i))
+    for k, column in dict_of_lists.items():
+        del column[last_index[k] + 1 :]
     return dict_of_lists
 
 
+def list_of_dicts_to_dict_of_arrays(list_of_dicts: Iterable[dict]) -> Tuple[Dict[Any, Any], Dict[Any, Any]]:
+    """
+    Convert a list of dictionaries to a dictionary of NumPy arrays, one per key, along with the mask of the missing
+    values of each array, i.e. the dictionaries without the key or with None as value. The arrays can be given to
+    pandas without a copy, e.g. ``pd.arrays.IntegerArray(values, mask)`` for an integer column with missing values.
+    See :meth:`ColumnAccumulator.to_masked_arrays` for the dtypes of the arrays.
+
+    :Example:
+        >>> values, masks = list_of_dicts_to_dict_of_arrays([{"a": 1, "b": 0.5}, {"a": 2}])
+        >>> values
+        {'a': array([1, 2]), 'b': array([0.5, nan])}
+        >>> masks
+        {'a': array([False, False]), 'b': array([False,  True])}
+
+    :param list_of_dicts: The dictionaries to convert.
+    :type list_of_dicts: Iterable[dict]
+
+    :return: The arrays and the masks of the missing values, keyed by the keys of the dictionaries.
+    :rtype: Tuple[Dict[Any, np.ndarray], Dict[Any, np.ndarray]]
+    """
+    if not hasattr(list_of_dicts, "__len__"):
+        list_of_dicts = list(list_of_dicts)
+    n_rows = len(list_of_dicts)  # type: ignore
+    values, masks = {}, {}
+    for key, column in list_of_dicts_to_dict_of_lists(list_of_dicts, default=_MISSING).items():  # type: ignore
+        column.extend([_MISSING] * (n_rows - len(column)))
+        values[key], masks[key] = _masked_array(column, set(map(type, column)))
+    return values, masks
+
+
 def dict_of_lists_to_list_of_dicts(dict_of_lists: Dict) -> List[dict]:
     """
     Convert a dictionary of lists to a list of dictionaries.
@@ -158,13 +374,15 @@ def dict_of_lists_to_list_of_dicts(dict_of_lists: Dict) -> List[dict]:
     :rtype: List[dict]
     """
     keys = list(dict_of_lists.keys())
-    list_of_dict_of_parameters: List[dict] = []
-    for key in keys:
-        values = dict_of_lists[key]
-        for i, value in enumerate(values):
-            old_dict = sequence_get(list_of_dict_of_parameters, idx=i, default={})
-            new_dict = {**old_dict, key: value}
-            list_insert_replace_at(list_of_dict_of_parameters, i, new_dict, default={})
+    columns = [dict_of_lists[key] for key in keys]
+    columns = [column if hasattr(column, "__len__") else list(column) for column in columns]
+    lengths = {len(column) for column in columns}
+    if len(lengths) <= 1:
+        return [dict(zip(keys, values)) for values in zip(*columns)]
+    list_of_dict_of_parameters: List[dict] = [{} for _ in range(max(lengths))]
+    for key, column in zip(keys, columns):
+        for d, value in zip(list_of_dict_of_parameters, column):
+            d[key] = value
     return list_of_dict_of_parameters
 
 
@@ -181,6 +399,10 @@ def dict_of_lists_to_product_list_of_dicts(dict_of_lists: Dict) -> List[dict]:
         >>> print(list_of_dicts)
         [{'a': 1, 'b': 9}, {'a': 1, 'b': 8}, {'a': 2, 'b': 9}, {'a': 2, 'b': 8}]
 
+    :Note:
+        Every combination is built up front. Use :class:`ParameterGrid` for large grids: it has the same items in the
+        same order but builds them on access.
+
     :param dict_of_lists: The dictionary of lists to convert.
     :type dict_of_lists: dict
 
@@ -192,3 +414,359 @@ def dict_of_lists_to_product_list_of_dicts(dict_of_lists: Dict) -> List[dict]:
         dict(zip(keys, values)) for values in itertools.product(*[dict_of_lists[key] for key in keys])
     ]
     return list_of_dict_of_parameters
+
+
+class ParameterGrid(SequenceABC):
+    """
+    Lazy sequence of the combinations of the Cartesian product of a dictionary of lists, in the order of
+    :func:`dict_of_lists_to_product_list_of_dicts`, i.e. the last key varies the fastest. The combinations are never
+    all built: the length is computed in O(1) and the combination at an index is decoded from the index in
+    mixed radix, so grids of billions of combinations can be indexed, sliced, sharded and iterated.
+
+    The grid is small to pickle, so a worker can receive a shard, or the grid and an index, and decode its own
+    combinations.
+
+    :Example:
+        >>> grid = ParameterGrid({"lr": [1e-3, 1e-2], "depth": [2, 4, 8]})
+        >>> len(grid)
+        6
+        >>> grid[4]
+        {'lr': 0.01, 'depth': 4}
+        >>> list(grid[::4])
+        [{'lr': 0.001, 'depth': 2}, {'lr': 0.01, 'depth': 4}]
+        >>> grid.index({"lr": 0.01, "depth": 4})
+        4
+        >>> apply_func_multiprocess(train_shard, [(shard,) for shard in grid.shards(8)])
+
+    :param dict_of_lists: The values of every key.
+    :type dict_of_lists: Dict[Any, Iterable]
+    """
+
+    def __init__(self, dict_of_lists: Dict[Any, Iterable], _indexes: Optional[range] = None):
+        self.keys = list(dict_of_lists.keys())
+        self.axes = [list(dict_of_lists[key]) for key in self.keys]
+        self.sizes = [len(axis) for axis in self.axes]
+        # The stride of an axis is the number of combinations between two consecutive values of this axis.
+        self.strides = [math.prod(self.sizes[i + 1 :]) for i in range(len(self.sizes))]
+        self._indexes = range(math.prod(self.sizes)) if _indexes is None else _indexes
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}(sizes={dict(zip(self.keys, self.sizes))}, indexes={self._indexes})"
+
+    @property
+    def indexes(self) -> range:
+        """The indexes of the combinations of this grid in the full grid."""
+        return self._indexes
+
+    def _with_indexes(self, indexes: range) -> "ParameterGrid":
+        grid = self.__class__.__new__(self.__class__)
+        grid.keys, grid.axes, grid.sizes, grid.strides = self.keys, self.axes, self.sizes, self.strides
+        grid._indexes = indexes
+        return grid
+
+    def __len__(self) -> int:
+        return len(self._indexes)
+
+    def decode(self, index: int) -> dict:
+        """
+        Get the combination at an index of the full grid.
+
+        :param index: The index in the full grid, between 0 and the number of combinations of the full grid.
+        :type index: int
+
+        :return: The combination.
+        :rtype: dict
+        """
+        combination = {}
+        for key, axis, stride, size in zip(self.keys, self.axes, self.strides, self.sizes):
+            combination[key] = axis[(index // stride) % size]
+        return combination
+
+    def __getitem__(self, idx):
+        if isinstance(idx, slice):
+            return self._with_indexes(self._indexes[idx])
+        return self.decode(self._indexes[idx])
+
+    def __iter__(self):
+        for index in self._indexes:
+            yield self.decode(index)
+
+    def index(self, combination: dict, start: int = 0, stop: Optional[int] = None) -> int:
+        """
+        Get the index of a combination in this grid without scanning it.
+
+        :param combination: The combination, with a value for every key of the grid.
+        :type combination: dict
+
+        :return: The index of the combination.
+        :rtype: int
+
+        :raises ValueError: If the combination is not in the grid.
+        """
+        if not isinstance(combination, dict) or set(combination) != set(self.keys):
+            raise ValueError(f"{combination!r} is not in the grid.")
+        full_index = 0
+        for key, axis, stride in zip(self.keys, self.axes, self.strides):
+            try:
+                full_index += axis.index(combination[key]) * stride
+            except ValueError:
+                raise ValueError(f"{combination!r} is not in the grid.") from None
+        try:
+            index = self._indexes.index(full_index)
+        except ValueError:
+            raise ValueError(f"{combination!r} is not in the grid.") from None
+        if not start <= index < (len(self) if stop is None else stop):
+            raise ValueError(f"{combination!r} is not in the grid.")
+        return index
+
+    def __contains__(self, combination) -> bool:
+        try:
+            self.index(combination)
+        except ValueError:
+            return False
+        return True
+
+    def shard(self, nb_shards: int, shard_index: int) -> "ParameterGrid":
+        """
+        Get a contiguous range of the combinations, e.g. the ones of a node of a cluster. The shards have the same
+        length, up to one combination, and together hold every combination once.
+
+        :param nb_shards: The number of shards.
+        :type nb_shards: int
+        :param shard_index: The index of the shard, between 0 and nb_shards - 1.
+        :type shard_index: int
+
+        :return: The shard.
+        :rtype: ParameterGrid
+
+        :raises ValueError: If nb_shards is less than 1 or shard_index is not between 0 and nb_shards - 1.
+        """
+        if nb_shards < 1:
+            raise ValueError("The number of shards must be greater or equal than 1.")
+        if not 0 <= shard_index < nb_shards:
+            raise ValueError(f"The shard index must be between 0 and {nb_shards - 1}, got {shard_index}.")
+        quotient, remainder = divmod(len(self), nb_shards)
+        start = shard_index * quotient + min(shard_index, remainder)
+        stop = start + quotient + (shard_index < remainder)
+        return self[start:stop]
+
+    def shards(self, nb_shards: int) -> List["ParameterGrid"]:
+        """Split the grid in contiguous shards, see :meth:`shard`."""
+        return [self.shard(nb_shards, i) for i in range(nb_shards)]
+
+    def __eq__(self, other):
+        if not isinstance(other, ParameterGrid):
+            return NotImplemented
+        return self.keys == other.keys and self.axes == other.axes and self._indexes == other._indexes
+
+    def __reduce__(self):
+        return self.__class__, (dict(zip(self.keys, self.axes)), self._indexes)
+
+
+class _Missing:
+    def __repr__(self):
+        return "<MISSING>"
+
+
+_MISSING = _Missing()  # Fills the cells of the keys absent from a row
+
+_INT64_MIN, _INT64_MAX = -(2**63), 2**63 - 1
+
+
+def _fits_int64(column: List[Any]) -> bool:
+    """Tell whether every integer of a column fits in an int64, else the column is kept as Python objects."""
+    return all(_INT64_MIN <= v <= _INT64_MAX for v in column if type(v) is int)
+
+
+def _masked_array(column: List[Any], types: set) -> Tuple[Any, Any]:
+    """Build the values and the mask of the missing values of a column, see :meth:`ColumnAccumulator.get_masked_column`."""
+    import numpy as np
+
+    null_types = {_Missing, type(None)}
+    value_types = types - null_types
+    n_rows = len(column)
+    if types & null_types:
+        mask = np.fromiter((v is None or v is _MISSING for v in column), dtype=bool, count=n_rows)
+        filled = lambda fill: (fill if v is None or v is _MISSING else v for v in column)  # noqa: E731
+    else:
+        mask = np.zeros(n_rows, dtype=bool)
+        filled = lambda fill: column  # noqa: E731
+    if int not in value_types or _fits_int64(column):  # Integers too large for int64 stay Python objects.
+        if value_types and value_types <= {int}:
+            return np.fromiter(filled(0), dtype=np.int64, count=n_rows), mask
+        if value_types and value_types <= {int, float}:
+            return np.fromiter(filled(np.nan), dtype=np.float64, count=n_rows), mask
+        if value_types == {bool}:
+            return np.fromiter(filled(False), dtype=bool, count=n_rows), mask
+    values = np.empty(len(column), dtype=object)
+    values[:] = [None if v is _MISSING else v for v in column]
+    return values, mask
+
+
+class ColumnAccumulator:
+    """
+    Accumulate rows given as dictionaries into one buffer per column, then build a DataFrame or an Arrow table from
+    the columns. Compared to building a list of dictionaries, this avoids keeping one dictionary per row, repeated
+    strings are stored once per column, and the dtype of each column is inferred from the types seen while
+    accumulating instead of by scanning every cell again.
+
+    Missing values, i.e. keys absent from a row, are NaN in the output like in ``pd.DataFrame(list_of_dicts)``.
+
+    :Example:
+        >>> acc = ColumnAccumulator()
+        >>> acc.append({"a": 1, "b": "x"})
+        >>> acc.append({"a": 2, "c": 0.5})
+        >>> acc.to_dataframe()
+           a    b    c
+        0  1    x  NaN
+        1  2  NaN  0.5
+
+    :param categorical_threshold: If given, the string columns whose ratio of unique values over the number of rows
+        is lower or equal to this threshold are built as categoricals. Default is None.
+    :type categorical_threshold: Optional[float]
+    """
+
+    def __init__(self, categorical_threshold: Optional[float] = None):
+        self.categorical_threshold = categorical_threshold
+        self._columns: Dict[Any, List[Any]] = {}
+        self._types: Dict[Any, set] = {}
+        self._strings: Dict[Any, Dict[str, str]] = {}
+        self._n_rows = 0
+
+    def __len__(self) -> int:
+        return self._n_rows
+
+    @property
+    def columns(self) -> List[Any]:
+        return list(self._columns)
+
+    def append(self, row: dict):
+        """
+        Append a row.
+
+        :param row: The values of the row keyed by column.
+        :type row: dict
+        """
+        n_rows = self._n_rows
+        for key, value in row.items():
+            column = self._columns.get(key)
+            if column is None:
+                column = self._columns[key] = [_MISSING] * n_rows
+                self._types[key] = {_Missing} if n_rows else set()
+                self._strings[key] = {}
+            elif len(column) < n_rows:
+                column.extend([_MISSING] * (n_rows - len(column)))
+                self._types[key].add(_Missing)
+            value_type = type(value)
+            if value_type is str:
+                value = self._strings[key].setdefault(value, value)
+            self._types[key].add(value_type)
+            column.append(value)
+        self._n_rows += 1
+        return self
+
+    def extend(self, rows: Iterable[dict]):
+        """
+        Append every row of an iterable.
+
+        :param rows: The rows to append.
+        :type rows: Iterable[dict]
+        """
+        for row in rows:
+            self.append(row)
+        return self
+
+    def _padded(self, key) -> List[Any]:
+        column = self._columns[key]
+        if len(column) < self._n_rows:
+            column.extend([_MISSING] * (self._n_rows - len(column)))
+            self._types[key].add(_Missing)
+        return column
+
+    def get_column(self, key):
+        """
+        Build a column as a NumPy array or a pandas Categorical, with a dtype inferred from the types of its values.
+
+        :param key: The key of the column.
+        :return: The column.
+        """
+        import numpy as np
+        import pandas as pd
+
+        column = self._padded(key)
+        types = self._types[key]
+        null_types = {_Missing, type(None)}
+        has_null = bool(types & null_types)
+        value_types = types - null_types
+        if not value_types and _Missing in types:
+            return np.full(len(column), np.nan)
+        # Integers too large for int64 are kept as Python objects, a float64 would silently round them.
+        big_ints = int in value_types and not _fits_int64(column)
+        if value_types and value_types <= {int} and not big_ints:
+            ints = np.array([0 if v is None or v is _MISSING else v for v in column], dtype=np.int64)
+            if not has_null:
+                return ints
+            is_null = np.fromiter((v is None or v is _MISSING for v in column), dtype=bool, count=len(column))
+            floats = ints.astype(np.float64)
+            floats[is_null] = np.nan
+            return floats
+        if value_types and value_types <= {int, float} and not big_ints:
+            return np.array([np.nan if v is None or v is _MISSING else v for v in column], dtype=np.float64)
+        if value_types == {bool} and not has_null:
+            return np.array(column, dtype=bool)
+        if _Missing in types:
+            column = [np.nan if v is _MISSING else v for v in column]
+        if (
+            value_types == {str}
+            and self.categorical_threshold is not None
+            and len(self._strings[key]) <= self.categorical_threshold * self._n_rows
+        ):
+            return pd.Categorical(column)
+        return pd.Series(column, dtype=object if big_ints or not value_types else None).array
+
+    def to_dict_of_arrays(self) -> Dict[Any, Any]:
+        """Build every column, see :meth:`get_column`."""
+        return {key: self.get_column(key) for key in self._columns}
+
+    def get_masked_column(self, key) -> Tuple[Any, Any]:
+        """
+        Build a column as a NumPy array along with the mask of its missing values, i.e. the absent and None ones.
+        The integer, float and boolean columns get an int64, float64 and bool array whose missing values are 0,
+        NaN and False. The other columns get an object array whose missing values are None.
+
+        :param key: The key of the column.
+        :return: The values and the mask of the column.
+        """
+        return _masked_array(self._padded(key), self._types[key])
+
+    def to_masked_arrays(self) -> Tuple[Dict[Any, Any], Dict[Any, Any]]:
+        """Build every column with its mask of missing values, see :meth:`get_masked_column`."""
+        values, masks = {}, {}
+        for key in self._columns:
+            values[key], masks[key] = self.get_masked_column(key)
+        return values, masks
+
+    def to_dataframe(self):
+        """
+        Build a pandas DataFrame from the accumulated rows.
+
+        :return: The DataFrame.
+        :rtype: pd.DataFrame
+        """
+        import pandas as pd
+
+        return pd.DataFrame(self.to_dict_of_arrays(), index=pd.RangeIndex(self._n_rows))
+
+    def to_arrow(self):
+        """
+        Build a pyarrow Table from the accumulated rows. Requires ``pyarrow``.
+
+        :return: The Arrow table.
+        :rtype: pyarrow.Table
+        """
+        try:
+            import pyarrow as pa
+        except ImportError as e:
+            raise ImportError("pyarrow is required to build an Arrow table: pip install pyarrow") from e
+
+        return pa.Table.from_pandas(self.to_dataframe(), preserve_index=False)
@@ -1,6 +1,7 @@
 import functools
 import logging
 import time
+from typing import Optional
 
 
 def log_func(_func=None, *, box_length=50, box_char="-", logging_func=logging.info):
@@ -40,7 +41,54 @@ def log_func(_func=None, *, box_length=50, box_char="-", logging_func=logging.in
         return decorator_log_func(_func)
 
 
-def try_func_n_times(_func=None, *, n: int = 32, delay: float = 0.1):
+def retry_delay(attempt: int, delay: float = 0.1, backoff: float = 1.0, max_delay: Optional[float] = None) -> float:
+    """
+    Get the delay before retrying after the given failed attempt, growing geometrically with the backoff.
+
+    :param attempt: The index of the failed attempt, starting at 0.
+    :type attempt: int
+    :param delay: The delay after the first failed attempt.
+    :type delay: float
+    :param backoff: The factor multiplying the delay after each failed attempt. 1.0 keeps the delay constant.
+    :type backoff: float
+    :param max_delay: The maximum delay. If None, the delay is not bounded.
+    :type max_delay: Optional[float]
+
+    :return: The delay in seconds.
+    :rtype: float
+    """
+    current_delay = delay * backoff**attempt
+    if max_delay is not None:
+        current_delay = min(current_delay, max_delay)
+    return current_delay
+
+
+def try_func_n_times(
+    _func=None,
+    *,
+    n: int = 32,
+    delay: float = 0.1,
+    backoff: float = 1.0,
+    max_delay: Optional[float] = None,
+):
+    """
+    Call the function until it succeeds, at most n times, sleeping between the attempts. The exception of the last
+    attempt is raised if they all fail.
+
+    :param _func: The function to decorate.
+    :type _func: Callable
+    :param n: The maximum number of attempts.
+    :type n: int
+    :param delay: The delay in seconds after the first failed attempt.
+    :type delay: float
+    :param backoff: The factor multiplying the delay after each failed attempt. Default is 1.0, a constant delay.
+    :type backoff: float
+    :param max_delay: The maximum delay in seconds. If None, the delay is not bounded.
+    :type max_delay: Optional[float]
+
+    :return: The decorated function.
+    """
+
     def decorator_try_func_n_times(func):
         @functools.wraps(func)
         def wrapper(*args, **kwargs):
@@ -53,7 +101,7 @@ def try_func_n_times(_func=None, *, n: int = 32, delay: float = 0.1):
                     if i == n - 1:
                         raise e
                     else:
-                        time.sleep(delay)
+                        time.sleep(retry_delay(i, delay, backoff, max_delay))
             return out
 
         wrapper.__name__ = func.__name__ + "@log_func"
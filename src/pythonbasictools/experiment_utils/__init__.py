@@ -1,3 +1,10 @@
+from .atomic_io import Durability, atomic_write
+from .checkpoint import TaskCheckpoint
+from .env_store import EnvStore
 from .metadata_file import MetadataFile
 from .output_folder import ExperimentState, ExperimentStateFile, OutputFolder
+from .result_index import ResultIndex
 from .run_output_file import RunOutputFile
+from .save_policy import SavePolicy
+from .scanner import DirectoryScanner
+from .serializers import Serializer, get_serializer, register_serializer
@@ -0,0 +1,108 @@
+import enum
+import os
+import shutil
+import threading
+from pathlib import Path
+from typing import Optional, Union
+
+
+class Durability(enum.Enum):
+    """
+    How hard :func:`atomic_write` tries to make a write survive a crash.
+
+    - ``NONE``: the file is replaced atomically, which survives a crash or a kill of the process, but the data may
+      still be in the OS cache if the machine loses power.
+    - ``FILE``: the content of the file is also flushed to the storage device before it replaces the target.
+    - ``FULL``: the directory entry is also flushed after the replacement, so the rename itself survives a power loss.
+    """
+
+    NONE = "none"
+    FILE = "file"
+    FULL = "full"
+
+
+BACKUP_SUFFIX = ".bak"
+TMP_SUFFIX = ".tmp"
+
+
+def backup_path_of(path: Union[str, Path]) -> Path:
+    path = Path(path)
+    return path.with_name(path.name + BACKUP_SUFFIX)
+
+
+def _fsync_dir(directory: Path):
+    try:
+        fd = os.open(directory, os.O_RDONLY)
+    except OSError:  # pragma: no cover
+        return  # Directories cannot be opened on some platforms, e.g. Windows.
+    try:
+        os.fsync(fd)
+    except OSError:  # pragma: no cover
+        pass
+    finally:
+        os.close(fd)
+
+
+def _make_backup(path: Path, backup_path: Path):
+    """
+    Make ``backup_path`` a copy of ``path`` without ever leaving ``path`` missing. A hard link is used when the
+    filesystem supports it, otherwise the file is copied.
+    """
+    tmp_backup_path = backup_path.with_name(f".{backup_path.name}.{os.getpid()}.{threading.get_ident()}{TMP_SUFFIX}")
+    try:
+        os.link(path, tmp_backup_path)
+    except FileExistsError:
+        os.remove(tmp_backup_path)
+        os.link(path, tmp_backup_path)
+    except OSError:
+        shutil.copyfile(path, tmp_backup_path)
+    os.replace(tmp_backup_path, backup_path)
+
+
+def atomic_write(
+    path: Union[str, Path],
+    content: Union[str, bytes],
+    durability: Union[Durability, str] = Durability.NONE,
+    backup: bool = False,
+    encoding: Optional[str] = None,
+) -> Path:
+    """
+    Write the content to a temporary file in the same directory, then atomically rename it to ``path``. Readers and
+    crashes will therefore only ever see the old or the new content of the file, never a truncated one.
+
+    :param path: The path of the file to write.
+    :type path: Union[str, Path]
+    :param content: The content to write. Bytes are written as is, strings are encoded with ``encoding``.
+    :type content: Union[str, bytes]
+    :param durability: How hard to try to make the write survive a power loss. See :class:`Durability`.
+    :type durability: Union[Durability, str]
+    :param backup: If True and the file already exists, its current content is kept in a ``.bak`` file next to it.
+    :type backup: bool
+    :param encoding: The encoding used to write a string content.
+    :type encoding: Optional[str]
+
+    :return: The path of the written file.
+    :rtype: Path
+    """
+    path = Path(path)
+    durability = Durability(durability)
+    tmp_path = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}{TMP_SUFFIX}")
+    mode = "wb" if isinstance(content, bytes) else "w"
+    try:
+        with open(tmp_path, mode, encoding=None if isinstance(content, bytes) else encoding) as f:
+            f.write(content)
+            if durability != Durability.NONE:
+                f.flush()
+                os.fsync(f.fileno())
+        if backup and path.exists():
+            _make_backup(path, backup_path_of(path))
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+    if durability == Durability.FULL:
+        _fsync_dir(path.parent)
+    return path
@@ -0,0 +1,125 @@
+import os
+import pickle
+import threading
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Tuple, Union
+
+from ..hash_tools import hash_args
+from .atomic_io import Durability
+
+
+class TaskCheckpoint:
+    """
+    Append-only log of the results of the completed tasks of a batch run, keyed by the hash of the arguments of each
+    task, so a run killed before its end can be resumed without recomputing the finished tasks. Each result is
+    appended as a pickled record as soon as it is available; a truncated last record, left by a crash during an
+    append, is dropped when the log is loaded.
+
+    Example:
+
+        ```python
+        results = apply_func_multiprocess(train, params, checkpoint="train.ckpt")
+        # If the run is killed, the same call only runs the tasks missing from train.ckpt.
+        ```
+
+    A checkpoint holds the results of one function: the key of a task only depends on its arguments. Only one
+    process may append to a checkpoint at once.
+
+    :param path: The path of the log file. It is created on the first recorded result.
+    :type path: Union[str, Path]
+    :param key_fn: The function computing the key of a task from its arguments and keyword arguments. Default is
+        :func:`pythonbasictools.hash_tools.hash_args`, which hashes the arrays and buffers by their content and
+        converts the other objects that are not JSON serializable to strings, so give a key function if the string
+        of an argument does not identify it.
+    :type key_fn: Optional[Callable[[Tuple, Dict], str]]
+    :param durability: Whether each record is also flushed to the storage device, see :class:`Durability`. The
+        records are always flushed to the OS, so they survive a kill of the process. Default is ``Durability.NONE``.
+    :type durability: Union[Durability, str]
+    """
+
+    def __init__(
+        self,
+        path: Union[str, Path],
+        key_fn: Optional[Callable[[Tuple, Dict], str]] = None,
+        durability: Union[Durability, str] = Durability.NONE,
+    ):
+        self.path = Path(path)
+        self.key_fn = key_fn or hash_args
+        self.durability = Durability(durability)
+        self._results: Optional[Dict[str, Any]] = None
+        self._file = None
+        self._lock = threading.Lock()
+
+    def __repr__(self):
+        nb_results = len(self._results) if self._results is not None else "?"
+        return f"{self.__class__.__name__}(path={self.path}, nb_results={nb_results})"
+
+    @property
+    def results(self) -> Dict[str, Any]:
+        """The recorded results by key, loaded from the log on first access."""
+        if self._results is None:
+            self.load()
+        return self._results  # type: ignore
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.results
+
+    def __len__(self) -> int:
+        return len(self.results)
+
+    def key(self, args: Tuple, kwargs: Optional[Dict] = None) -> str:
+        return self.key_fn(args, kwargs or {})
+
+    def load(self) -> Dict[str, Any]:
+        """Read the results recorded in the log, truncating a partially written last record."""
+        results: Dict[str, Any] = {}
+        if not self.path.exists():
+            self._results = results
+            return results
+        valid_size = 0
+        with open(self.path, "rb") as f:
+            while True:
+                try:
+                    key, result = pickle.load(f)
+                except EOFError:
+                    break
+                except (pickle.UnpicklingError, ValueError, TypeError, AttributeError, IndexError):
+                    break
+                results[key] = result
+                valid_size = f.tell()
+        if valid_size < os.path.getsize(self.path):
+            os.truncate(self.path, valid_size)
+        self._results = results
+        return results
+
+    def record(self, key: str, result: Any):
+        """Append the result of a task to the log."""
+        data = pickle.dumps((key, result), protocol=pickle.HIGHEST_PROTOCOL)
+        with self._lock:
+            self.results[key] = result
+            if self._file is None:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                self._file = open(self.path, "ab")
+            self._file.write(data)
+            self._file.flush()
+            if self.durability != Durability.NONE:
+                os.fsync(self._file.fileno())
+
+    def close(self):
+        """Close the log file. It is reopened by the next :meth:`record`."""
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    def clear(self):
+        """Remove the log and forget the recorded results."""
+        self.close()
+        self.path.unlink(missing_ok=True)
+        self._results = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
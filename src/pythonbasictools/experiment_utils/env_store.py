@@ -0,0 +1,76 @@
+import functools
+import json
+from pathlib import Path
+from typing import Dict, Union
+
+from ..hash_tools import hash_dict
+from .atomic_io import atomic_write
+
+
+@functools.lru_cache(maxsize=128)
+def _read_env(path: str) -> Dict[str, str]:
+    # The files of a store are content-addressed, so they never change once written and can be cached by path.
+    with open(path, "r") as f:
+        return json.load(f)
+
+
+class EnvStore:
+    """
+    Content-addressed store of environment snapshots. Each snapshot is written once in the store directory under
+    the hash of its content, so the files sharing a store, e.g. every run of a sweep on the same host, only keep a
+    reference to their snapshot instead of a full copy.
+
+    Example:
+
+        ```python
+        store = EnvStore("results/.env_store")
+        ref = store.put(dict(os.environ))
+        env = store.get(ref)
+        ```
+
+    :param root: The directory of the store.
+    :type root: Union[str, Path]
+    """
+
+    DEFAULT_DIRNAME: str = ".env_store"
+    EXT: str = ".env.json"
+
+    def __init__(self, root: Union[str, Path]):
+        self.root = Path(root)
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}({self.root})"
+
+    def path_of(self, env_hash: str) -> Path:
+        return self.root / (env_hash + self.EXT)
+
+    def put(self, env: Dict[str, str]) -> str:
+        """
+        Add an environment snapshot to the store if it is not already there.
+
+        :param env: The environment snapshot.
+        :type env: Dict[str, str]
+
+        :return: The hash referencing the snapshot in the store.
+        :rtype: str
+        """
+        env_hash = hash_dict(env)
+        path = self.path_of(env_hash)
+        if not path.exists():
+            self.root.mkdir(parents=True, exist_ok=True)
+            atomic_write(path, json.dumps(env, sort_keys=True))
+        return env_hash
+
+    def get(self, env_hash: str) -> Dict[str, str]:
+        """
+        Get an environment snapshot from the store.
+
+        :param env_hash: The hash returned by :meth:`put`.
+        :type env_hash: str
+
+        :return: A copy of the environment snapshot.
+        :rtype: Dict[str, str]
+
+        :raises FileNotFoundError: If the snapshot is not in the store.
+        """
+        return dict(_read_env(str(self.path_of(env_hash))))
@@ -1,14 +1,18 @@
 import enum
+import functools
 import glob
 import os
 from pathlib import Path
-from typing import List, Optional, Tuple, Union
+from typing import Any, Dict, List, Optional, Tuple, Type, Union
 
 import pandas as pd
-from tqdm import tqdm
 
+from ..collections_tools import ColumnAccumulator
+from ..multiprocessing_tools import apply_func_multiprocess, iter_func_multiprocess
+from .atomic_io import Durability, atomic_write
 from .metadata_file import MetadataFile
 from .run_output_file import RunOutputFile
+from .scanner import DirectoryScanner
 
 
 class ExperimentState(enum.Enum):
@@ -20,14 +24,29 @@ class ExperimentState(enum.Enum):
 
 
 class ExperimentStateFile:
+    """
+    Store the state of an experiment as the extension of an empty-by-default file named ``state.<state>`` in the
+    experiment folder. The file is written atomically and a change of state is an atomic rename, so a crash never
+    leaves the folder without a state file.
+
+    :param folder: The experiment folder.
+    :type folder: Union[str, Path]
+    :param state: The initial state. If ``ExperimentState.UNKNOWN``, the state is loaded from the folder.
+    :type state: ExperimentState
+    :param durability: The durability of the writes, see :class:`Durability`. Default is ``Durability.NONE``.
+    :type durability: Union[Durability, str]
+    """
+
     FILENAME = "state"
 
     def __init__(
         self,
         folder: Union[str, Path],
         state: ExperimentState = ExperimentState.UNKNOWN,
+        durability: Union[Durability, str] = Durability.NONE,
     ):
         self._folder = Path(folder)
+        self.durability = Durability(durability)
         if state == ExperimentState.UNKNOWN:
             state = self._load_state()
         self._state = state
@@ -35,8 +54,7 @@ class ExperimentStateFile:
 
     def write(self, new_text: str):
         self._folder.mkdir(parents=True, exist_ok=True)
-        with self.path.open("w") as f:
-            f.write(new_text)
+        atomic_write(self.path, new_text, durability=self.durability)
 
     def append(self, new_text: str):
         self._folder.mkdir(parents=True, exist_ok=True)
@@ -53,6 +71,8 @@ class ExperimentStateFile:
         files = [Path(file) for file in files if Path(file).is_file()]
         if len(files) == 0:
             return ExperimentState.UNKNOWN
+        # If several state files exist, e.g. written by an older version interrupted mid-change, the newest wins.
+        files.sort(key=lambda file: file.stat().st_mtime_ns, reverse=True)
         state_str = files[0].suffix.replace(".", "")
         state = ExperimentState[state_str.upper()]
         return state
@@ -73,23 +93,71 @@ class ExperimentStateFile:
     @state.setter
     def state(self, new_state: ExperimentState):
         """
-        Delete the current file and create another with the new state.
+        Atomically rename the current file to the new state, then reset its content.
         """
-        try:
-            os.remove(self.path)
-        except FileNotFoundError:  # pragma: no cover
-            pass
+        old_path = self.path
         self._state = new_state
-        self._maybe_create()
+        if old_path != self.path:
+            try:
+                os.replace(old_path, self.path)
+            except FileNotFoundError:  # pragma: no cover
+                pass
+        self.write("")
+
+
+def _file_row(file_cls: Type[RunOutputFile], root_folder: Path, kwargs: Dict[str, Any], path: Path) -> dict:
+    return {
+        "_output_folder": path.parent.relative_to(root_folder),
+        **file_cls.raveled_state_from_file(path, **kwargs),
+    }
 
 
 class OutputFolder:
+    @classmethod
+    def make_scanner(
+        cls,
+        metadata_ext: str = MetadataFile.EXT,
+        data_ext: str = RunOutputFile.EXT,
+        **kwargs,
+    ) -> DirectoryScanner:
+        """
+        Make a scanner classifying the files of output folders as "metadata", "data" and "state" files. When the
+        default extensions are used, the files written by every registered serializer are found.
+
+        :Example:
+        >>> scanner = OutputFolder.make_scanner(prune=[".*"], max_depth=4, manifest_path="./data/root/.manifest.json")
+        >>> metadata_df, data_df = OutputFolder.root_folder_to_dataframe("./data/root", scanner=scanner)
+
+        :param metadata_ext: The extension of the metadata files.
+        :type metadata_ext: str
+        :param data_ext: The extension of the data files.
+        :type data_ext: str
+        :param kwargs: Additional keyword arguments passed to :class:`DirectoryScanner`, e.g. ``prune``,
+            ``max_depth`` or ``manifest_path``.
+
+        :return: The scanner.
+        :rtype: DirectoryScanner
+        """
+        metadata_exts = MetadataFile.get_all_exts() if metadata_ext == MetadataFile.EXT else [metadata_ext]
+        data_exts = RunOutputFile.get_all_exts() if data_ext == RunOutputFile.EXT else [data_ext]
+        state_names = {f"{ExperimentStateFile.FILENAME}.{state.value.lower()}" for state in ExperimentState}
+        return DirectoryScanner(
+            {"metadata": metadata_exts, "data": data_exts},
+            classifiers={"state": state_names.__contains__},
+            **kwargs,
+        )
+
     @classmethod
     def root_folder_to_dataframe(
         cls,
         root_folder: Union[str, Path],
         metadata_ext: str = MetadataFile.EXT,
         data_ext: str = RunOutputFile.EXT,
+        categorical_threshold: Optional[float] = None,
+        nb_workers: Optional[int] = 0,
+        backend: str = "thread",
+        chunksize: int = 64,
+        scanner: Optional[DirectoryScanner] = None,
         **kwargs,
     ) -> Tuple[pd.DataFrame, pd.DataFrame]:
         """
@@ -97,34 +165,57 @@ class OutputFolder:
         a second for the data. Each row in the dataframe corresponds to the data of one file.
         The dataframes can be merge together using the `_output_folder` column.
 
+        The rows are accumulated column by column with a :class:`ColumnAccumulator`, so no intermediate list of
+        dictionaries is built.
+
         :Example:
         >>> metadata_df, data_df = OutputFolder.root_folder_to_dataframe("./data/root")
         >>> full_df = pd.merge(metadata_df, data_df, on="_output_folder")
+
+        :param categorical_threshold: If given, the string columns with a ratio of unique values lower or equal to
+            this threshold are built as categoricals. See :class:`ColumnAccumulator`.
+        :type categorical_threshold: Optional[float]
+        :param nb_workers: The number of workers loading the files in parallel, see :func:`iter_func_multiprocess`.
+            If 0, the files are loaded one after the other. Default is 0.
+        :type nb_workers: Optional[int]
+        :param backend: "thread", well suited to reading files on a network filesystem, or "process" for files whose
+            decoding is CPU-bound, see :func:`iter_func_multiprocess`. Default is "thread".
+        :type backend: str
+        :param chunksize: The number of files sent to a worker at once. Default is 64.
+        :type chunksize: int
+        :param scanner: The scanner finding the files in a single walk of the tree, e.g. to prune directories, limit
+            the depth or cache the listing. Default is :meth:`make_scanner` with the given extensions.
+        :type scanner: Optional[DirectoryScanner]
+        :param kwargs: Additional keyword arguments passed to :meth:`RunOutputFile.raveled_state_from_file`.
         """
-        kwargs.setdefault("save_every_set", False)
+        if kwargs:
+            # The files are only built when keyword arguments are given, otherwise their data is read lazily.
+            kwargs.setdefault("save_every_set", False)
         root_folder = Path(root_folder)
-        metadata_paths = list(root_folder.rglob(f"*{metadata_ext}"))
-        data_paths = list(root_folder.rglob(f"*{data_ext}"))
-
-        metadata_df = pd.DataFrame(
-            [
-                {
-                    "_output_folder": p.parent.relative_to(root_folder),
-                    **MetadataFile.raveled_state_from_file(p, **kwargs),  # type: ignore
-                }
-                for p in tqdm(metadata_paths, desc="Gathering metadata")
-            ]
+        scanner = scanner or cls.make_scanner(metadata_ext, data_ext)
+        scanned = scanner.scan(root_folder)
+        metadata_paths, data_paths = scanned["metadata"], scanned["data"]
+
+        map_kwargs = dict(nb_workers=nb_workers, backend=backend, chunksize=chunksize)
+        metadata_acc = ColumnAccumulator(categorical_threshold=categorical_threshold)
+        metadata_acc.extend(
+            iter_func_multiprocess(
+                functools.partial(_file_row, MetadataFile, root_folder, kwargs),
+                [(path,) for path in metadata_paths],
+                desc="Gathering metadata",
+                **map_kwargs,  # type: ignore
+            )
         )
-        data_df = pd.DataFrame(
-            [
-                {
-                    "_output_folder": p.parent.relative_to(root_folder),
-                    **RunOutputFile.raveled_state_from_file(p, **kwargs),  # type: ignore
-                }
-                for p in tqdm(data_paths, desc="Gathering data")
-            ]
+        data_acc = ColumnAccumulator(categorical_threshold=categorical_threshold)
+        data_acc.extend(
+            iter_func_multiprocess(
+                functools.partial(_file_row, RunOutputFile, root_folder, kwargs),
+                [(path,) for path in data_paths],
+                desc="Gathering data",
+                **map_kwargs,  # type: ignore
+            )
         )
-        return metadata_df, data_df
+        return metadata_acc.to_dataframe(), data_acc.to_dataframe()
 
     @classmethod
     def gather_output_folders(
@@ -132,18 +223,51 @@ class OutputFolder:
         root_folder: Union[str, Path],
         metadata_ext: str = MetadataFile.EXT,
         data_ext: str = RunOutputFile.EXT,
+        nb_workers: Optional[int] = 0,
+        chunksize: int = 64,
+        scanner: Optional[DirectoryScanner] = None,
         **kwargs,
     ) -> List["OutputFolder"]:
+        """
+        Gather every output folder under the root folder, i.e. every folder containing a metadata or a data file.
+
+        :param root_folder: The root folder.
+        :type root_folder: Union[str, Path]
+        :param metadata_ext: The extension of the metadata files.
+        :type metadata_ext: str
+        :param data_ext: The extension of the data files.
+        :type data_ext: str
+        :param nb_workers: The number of threads loading the output folders in parallel, see
+            :func:`iter_func_multiprocess`. If 0, the output folders are loaded one after the other. Default is 0.
+        :type nb_workers: Optional[int]
+        :param chunksize: The number of output folders sent to a thread at once. Default is 64.
+        :type chunksize: int
+        :param scanner: The scanner finding the files in a single walk of the tree, see
+            :meth:`root_folder_to_dataframe`. Default is :meth:`make_scanner` with the given extensions.
+        :type scanner: Optional[DirectoryScanner]
+        :param kwargs: Additional keyword arguments passed to the constructor of the output folders.
+
+        :return: The output folders.
+        :rtype: List[OutputFolder]
+        """
         kwargs.setdefault("metadata_kwargs", {})
         kwargs.setdefault("data_kwargs", {})
         kwargs["metadata_kwargs"].setdefault("save_every_set", False)
         kwargs["data_kwargs"].setdefault("save_every_set", False)
 
         root_folder = Path(root_folder)
-        metadata_paths = list(root_folder.rglob(f"*{metadata_ext}"))
-        data_paths = list(root_folder.rglob(f"*{data_ext}"))
+        scanner = scanner or cls.make_scanner(metadata_ext, data_ext)
+        scanned = scanner.scan(root_folder)
+        metadata_paths, data_paths = scanned["metadata"], scanned["data"]
         parent_paths = set(p.parent for p in (metadata_paths + data_paths))
-        output_folders = [cls(p, **kwargs) for p in tqdm(parent_paths, desc="Gathering output folders")]
+        output_folders = apply_func_multiprocess(
+            functools.partial(cls, **kwargs),
+            [(path,) for path in parent_paths],
+            nb_workers=nb_workers,
+            backend="thread",
+            chunksize=chunksize,
+            desc="Gathering output folders",
+        )
         return output_folders
 
     def __init__(
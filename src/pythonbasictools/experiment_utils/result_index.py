@@ -0,0 +1,182 @@
+import contextlib
+import hashlib
+import json
+import os
+import sqlite3
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, Optional, Tuple, Union
+
+
+def file_content_hash(path: Union[str, Path], chunk_size: int = 1024 * 1024) -> str:
+    """
+    Hash the content of a file with the SHA256 algorithm.
+
+    :param path: The path of the file.
+    :type path: Union[str, Path]
+    :param chunk_size: The size of the chunks read from the file.
+    :type chunk_size: int
+
+    :return: The hash of the content of the file.
+    :rtype: str
+    """
+    hasher = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            hasher.update(chunk)
+    return hasher.hexdigest()
+
+
+class ResultIndex:
+    """
+    Persistent SQLite index caching the parsed state of the result files under a root directory. Each entry is keyed
+    by the path of the file relative to the root and stores its modification time, size and, optionally, content
+    hash, so the cached state is only used while the file is unchanged.
+
+    Example:
+
+        ```python
+        index = ResultIndex("results")
+        fresh = index.lookup(paths)  # {path: state} of the files that did not change since they were indexed
+        index.store({path: state for path, state in parse(set(paths) - set(fresh))})
+        ```
+
+    :param root: The root directory of the indexed files.
+    :type root: Union[str, Path]
+    :param path: The path of the SQLite database. Default is :attr:`DEFAULT_FILENAME` in the root directory.
+    :type path: Optional[Union[str, Path]]
+    :param check_content: If True, the content hash of the files is also compared, which detects changes keeping the
+        same modification time and size at the cost of reading every file. Default is False.
+    :type check_content: bool
+    """
+
+    DEFAULT_FILENAME: str = ".results_index.sqlite"
+    SCHEMA_VERSION: int = 1
+
+    def __init__(
+        self,
+        root: Union[str, Path],
+        path: Optional[Union[str, Path]] = None,
+        check_content: bool = False,
+    ):
+        self.root = Path(root)
+        self.path = Path(path) if path is not None else self.root / self.DEFAULT_FILENAME
+        self.check_content = check_content
+        self._create()
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}({self.path})"
+
+    @contextlib.contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        conn = sqlite3.connect(self.path)
+        try:
+            with conn:  # Commit on success, rollback on error
+                yield conn
+        finally:
+            conn.close()
+
+    def _create(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as conn:
+            version = conn.execute("PRAGMA user_version").fetchone()[0]
+            if version != self.SCHEMA_VERSION:
+                conn.execute("DROP TABLE IF EXISTS files")
+                conn.execute(f"PRAGMA user_version = {self.SCHEMA_VERSION}")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS files ("
+                "path TEXT PRIMARY KEY, mtime_ns INTEGER, size INTEGER, content_hash TEXT, state TEXT)"
+            )
+
+    def _key(self, path: Union[str, Path]) -> str:
+        return Path(os.path.relpath(path, self.root)).as_posix()
+
+    def _signature(self, path: Union[str, Path]) -> Tuple[int, int, Optional[str]]:
+        stat = os.stat(path)
+        content_hash = file_content_hash(path) if self.check_content else None
+        return stat.st_mtime_ns, stat.st_size, content_hash
+
+    def __len__(self) -> int:
+        with self._connect() as conn:
+            n = conn.execute("SELECT COUNT(*) FROM files").fetchone()[0]
+        return n
+
+    def lookup(self, paths: Iterable[Union[str, Path]]) -> Dict[str, dict]:
+        """
+        Get the cached states of the files that did not change since they were stored.
+
+        :param paths: The paths of the files.
+        :type paths: Iterable[Union[str, Path]]
+
+        :return: The cached state of every unchanged file, keyed by the path as given.
+        :rtype: Dict[str, dict]
+        """
+        with self._connect() as conn:
+            rows = {row[0]: row[1:] for row in conn.execute("SELECT * FROM files")}
+        fresh = {}
+        for path in paths:
+            row = rows.get(self._key(path))
+            if row is None:
+                continue
+            mtime_ns, size, content_hash, state = row
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                continue
+            if (stat.st_mtime_ns, stat.st_size) != (mtime_ns, size):
+                continue
+            if self.check_content and file_content_hash(path) != content_hash:
+                continue
+            fresh[str(path)] = json.loads(state)
+        return fresh
+
+    def store(self, states: Dict[Union[str, Path], dict], signatures: Optional[Dict[str, Tuple]] = None):
+        """
+        Store the states of the given files. The states that cannot be encoded to JSON are not stored.
+
+        :param states: The states keyed by the path of their file.
+        :type states: Dict[Union[str, Path], dict]
+        :param signatures: The (mtime_ns, size, content_hash) of the files taken before they were parsed. If a file
+            is missing, its signature is taken now. Taking the signature before parsing guarantees that a file
+            modified while being parsed is parsed again on the next lookup.
+        :type signatures: Optional[Dict[str, Tuple]]
+        """
+        signatures = signatures or {}
+        rows = []
+        for path, state in states.items():
+            try:
+                signature = signatures.get(str(path)) or self._signature(path)
+                rows.append((self._key(path), *signature, json.dumps(state)))
+            except (TypeError, ValueError, FileNotFoundError):
+                continue
+        with self._connect() as conn:
+            conn.executemany("INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?, ?)", rows)
+        return self
+
+    def signatures(self, paths: Iterable[Union[str, Path]]) -> Dict[str, Tuple]:
+        """Get the (mtime_ns, size, content_hash) of the given existing files."""
+        signatures = {}
+        for path in paths:
+            try:
+                signatures[str(path)] = self._signature(path)
+            except FileNotFoundError:
+                continue
+        return signatures
+
+    def prune(self, paths: Iterable[Union[str, Path]]):
+        """
+        Remove the entries of the files that are not in the given paths.
+
+        :param paths: The paths of the files to keep.
+        :type paths: Iterable[Union[str, Path]]
+        """
+        keep = {self._key(path) for path in paths}
+        with self._connect() as conn:
+            stale = [(key,) for (key,) in conn.execute("SELECT path FROM files") if key not in keep]
+            conn.executemany("DELETE FROM files WHERE path = ?", stale)
+        return self
+
+    def clear(self):
+        """Remove every entry."""
+        with self._connect() as conn:
+            conn.execute("DELETE FROM files")
+        return self
@@ -1,7 +1,9 @@
 import datetime
+import itertools
 import json
 import logging
 import os
+import threading
 import warnings
 from collections import defaultdict
 from pathlib import Path
@@ -11,6 +13,12 @@ import pandas as pd
 
 from ..collections_tools import ravel_dict
 from ..multiprocessing_tools import apply_func_multiprocess
+from .atomic_io import Durability, atomic_write, backup_path_of
+from .env_store import EnvStore
+from .result_index import ResultIndex
+from .save_policy import PolicyFlusher, SavePolicy
+from .scanner import DirectoryScanner
+from .serializers import SERIALIZERS, Serializer, detect_serializer, get_serializer
 
 
 class RunOutputFile:
@@ -37,7 +45,9 @@ class RunOutputFile:
         output.freeze()  # Lock the file — no further changes allowed
         ```
 
-    ENV is captured once at file creation and preserved across runs. Access it via ``get("ENV.key")``.
+    ENV is captured once at file creation and preserved across runs. Access it via ``get("ENV.key")``. With an
+    ``env_store``, the file only holds a reference to the ENV snapshot kept in the store, and the snapshot is only read
+    when the ENV is accessed.
 
     Freeze state is persisted to disk: a file created with :meth:`freeze` will be loaded already frozen.
     Call :meth:`unfreeze` to allow changes again.
@@ -50,12 +60,58 @@ class RunOutputFile:
     :type data: dict
     :param save_every_set: If True, the data will be saved every time an item is added or updated. Default is True.
     :type save_every_set: bool
+    :param journal: If True, each change is appended as a small record to a side journal file instead of rewriting
+        the whole output file. The journal is folded back into the output file by :meth:`compact`, which is called
+        every ``journal_compact_every`` records, on :meth:`close` and on every full :meth:`save`. Un-compacted
+        records are replayed by :meth:`load`. Default is False.
+    :type journal: bool
+    :param journal_compact_every: The number of journal records after which the journal is compacted. If None,
+        the journal is only compacted on :meth:`close` or explicit :meth:`save`. Default is 1000.
+    :type journal_compact_every: Optional[int]
+    :param save_policy: If given, decide when the changes are written to disk instead of writing them on every change.
+        See :class:`SavePolicy`. Only used if ``save_every_set`` is True. Call :meth:`flush` or :meth:`close`, or use
+        the object as a context manager, to write the pending changes. Default is None.
+    :type save_policy: Optional[SavePolicy]
+    :param durability: The file is always saved to a temporary file that atomically replaces the output file, so a
+        crash never leaves a truncated file. The durability decides if the data is also flushed to the storage
+        device, see :class:`Durability`. Default is ``Durability.NONE``.
+    :type durability: Union[Durability, str]
+    :param backup: If True, the previous version of the output file is kept in a ``.bak`` file on every save, and
+        :meth:`load` falls back to it if the output file cannot be decoded. The save following such a fallback keeps
+        the backup as it is instead of replacing it with the undecodable file. Default is False.
+    :type backup: bool
+    :param overwrite_corrupt: If the output file exists but cannot be decoded, nor its backup, the object starts from
+        an empty state and, unless this is True, refuses to save over the file: the object is built without saving,
+        but the following saves raise a ``RuntimeError``, including the ones of ``save_every_set``. Default is False.
+    :type overwrite_corrupt: bool
+    :param serializer: The name of a registered serializer, or a serializer instance, used to write the file, e.g.
+        ``"json"``, ``"compact_json"``, ``"orjson"`` or ``"msgpack"``. See :mod:`serializers`. The extension of the file
+        depends on the serializer, e.g. ``.out.msgpack`` for msgpack. Files are always read with the serializer
+        detected from their content. If None, :attr:`SERIALIZER` is used.
+    :type serializer: Optional[Union[str, Serializer]]
+    :param env_store: If given, the captured ENV is written once in this content-addressed store, see
+        :class:`EnvStore`, and the file only holds a reference to it. Can be a directory, an :class:`EnvStore`, or
+        True to use a store in the output directory. Share the same store between the files of a sweep to keep a
+        single copy per distinct environment. If None, the ENV is written in the file. Default is None.
+    :type env_store: Optional[Union[bool, str, Path, EnvStore]]
     :param kwargs: Additional keyword arguments
     """
 
     EXT: str = ".out.json"
     DEFAULT_FILENAME: str = "run_output"
     RAVEL_DICT_KEY_SEP = "."  # The separator used to ravel the dictionary
+    JOURNAL_SUFFIX: str = ".journal"  # Appended to the output file name to get the journal file name
+    SERIALIZER: str = "json"  # The default serializer, see serializers.SERIALIZERS
+
+    @classmethod
+    def get_all_exts(cls) -> List[str]:
+        """Get the extensions of the files written by every registered serializer, :attr:`EXT` first."""
+        exts = [cls.EXT]
+        for serializer in SERIALIZERS.values():
+            ext = serializer.ext_for(cls.EXT)
+            if ext not in exts:
+                exts.append(ext)
+        return exts
 
     @classmethod
     def parse_results_from_dir_to_dataframe(
@@ -64,6 +120,7 @@ class RunOutputFile:
         requires_columns: Optional[List[str]] = None,
         file_column: str = "_file",
         mp_kwargs: Optional[Dict[str, Any]] = None,
+        index: Optional[Union[bool, str, Path, ResultIndex]] = None,
     ) -> pd.DataFrame:
         """
         Parse the results from a root directory. If requires_columns is not None, the rows that do not contain all the
@@ -78,27 +135,49 @@ class RunOutputFile:
         :type file_column: str
         :param mp_kwargs: The keyword arguments to pass to the multiprocessing function.
         :type mp_kwargs: Optional[Dict[str, Any]]
+        :param index: If given, the raveled state of every file is cached in a persistent :class:`ResultIndex`, and
+            only the files that are new or changed since the previous call are parsed. Can be a :class:`ResultIndex`,
+            the path of its database, or True to use the default database in the root directory. Default is None.
+        :type index: Optional[Union[bool, str, Path, ResultIndex]]
         :return: The DataFrame containing the results.
         """
         if mp_kwargs is None:
             mp_kwargs = {}
-        all_files = [
-            os.path.join(root, file) for root, _, files in os.walk(root_dir) for file in files if file.endswith(cls.EXT)
-        ]
-        results = apply_func_multiprocess(
-            func=cls.raveled_state_from_file,
-            iterable_of_args=[(file, False) for file in all_files],
-            iterable_of_kwargs=[{"save_every_set": False, file_column: file} for file in all_files],
-            desc=f"Processing files '{cls.EXT}' in {os.path.abspath(root_dir)}",
-            **mp_kwargs,
-        )
+        all_files = [str(path) for path in DirectoryScanner({"data": cls.get_all_exts()}).scan(root_dir)["data"]]
+        if index is None or index is False:
+            result_index = None
+            cached: Dict[str, dict] = {}
+        else:
+            if isinstance(index, ResultIndex):
+                result_index = index
+            else:
+                result_index = ResultIndex(root_dir, path=None if index is True else index)  # type: ignore
+            cached = result_index.lookup(all_files)
+        files_to_parse = [file for file in all_files if file not in cached]
+        signatures = result_index.signatures(files_to_parse) if result_index is not None else {}
+        parsed = []
+        if files_to_parse:
+            parsed = apply_func_multiprocess(
+                func=cls.raveled_state_from_file,
+                iterable_of_args=[(file, False, True) for file in files_to_parse],
+                desc=f"Processing files '{cls.EXT}' in {os.path.abspath(root_dir)}",
+                **mp_kwargs,
+            )
+        new_states = dict(zip(files_to_parse, parsed))
+        if result_index is not None:
+            # Empty states come from files that could not be read: they are parsed again on the next call.
+            result_index.store({file: state for file, state in new_states.items() if state}, signatures)
+            result_index.prune(all_files)
+        results = [{**(cached[file] if file in cached else new_states[file]), file_column: file} for file in all_files]
         df = pd.DataFrame(results)
         if requires_columns is not None:
             df = df.dropna(subset=requires_columns)
         return df
 
     @classmethod
-    def raveled_state_from_file(cls, path: Union[str, Path], raise_on_error: bool = False, **kwargs) -> dict:
+    def raveled_state_from_file(
+        cls, path: Union[str, Path], raise_on_error: bool = False, lazy: Optional[bool] = None, **kwargs
+    ) -> dict:
         """
         Get the raveled state of the data in the file.
 
@@ -107,11 +186,20 @@ class RunOutputFile:
         :param raise_on_error: If True, raise an error if an error occurs while loading the file.
             If False, return an empty dictionary if an error occurs.
         :type raise_on_error: bool
-        :param kwargs: Additional keyword arguments.
+        :param lazy: If True, only the data section of the file is read with :meth:`read_data_from_file`, without
+            building a :class:`RunOutputFile`. In that case, the additional keyword arguments are ignored.
+            If False, the file is loaded with :meth:`from_file`. If None, the file is read lazily unless additional
+            keyword arguments are given.
+        :type lazy: Optional[bool]
+        :param kwargs: Additional keyword arguments passed to :meth:`from_file`.
         :return: The raveled state of the data in the file.
         :rtype: dict
         """
+        if lazy is None:
+            lazy = not kwargs
         try:
+            if lazy:
+                return ravel_dict(cls.read_data_from_file(path), key_sep=cls.RAVEL_DICT_KEY_SEP)
             return cls.from_file(path, **kwargs).raveled_state
         except Exception as e:
             if raise_on_error:
@@ -124,14 +212,40 @@ class RunOutputFile:
         filename: str = DEFAULT_FILENAME,
         data: Optional[dict] = None,
         save_every_set: bool = True,
+        journal: bool = False,
+        journal_compact_every: Optional[int] = 1000,
+        save_policy: Optional[SavePolicy] = None,
+        durability: Union[Durability, str] = Durability.NONE,
+        backup: bool = False,
+        serializer: Optional[Union[str, Serializer]] = None,
+        env_store: Optional[Union[bool, str, Path, EnvStore]] = None,
+        overwrite_corrupt: bool = False,
         **kwargs,
     ):
         self.output_dir = Path(output_dir)
         self.filename = filename
         self.save_every_set = save_every_set
+        self.serializer = get_serializer(serializer if serializer is not None else self.SERIALIZER)
+        self.durability = Durability(durability)
+        self.backup = backup
+        self.overwrite_corrupt = overwrite_corrupt
+        self._keep_backup: bool = False  # Whether the output file is undecodable and its backup must be kept
+        self._undecodable: bool = False  # Whether the output file and its backup could not be decoded
+        self.journal = journal
+        self.journal_compact_every = journal_compact_every
+        self._journal_seq: int = 0  # Sequence number of the last change applied to this object
+        self._journal_size: int = 0  # Number of records currently in the journal file
+        self._base_saved: bool = False  # Whether the output file holds a state the journal can be appended to
+        self._pending_journal: List[Dict[str, Any]] = []  # Journal records not written yet
+        self._lock = threading.RLock()  # Guards the in-memory state
+        self._io_lock = threading.RLock()  # Serializes the writes; always acquired before _lock
+        self.save_policy = save_policy
+        self._flusher = PolicyFlusher(self, save_policy) if save_policy is not None else None
         self.data = {}
         self.logs: Dict[str, list] = defaultdict(list)
-        self.env: Dict[str, str] = {}
+        self.env_store = self._make_env_store(env_store)
+        self._env: Optional[Dict[str, str]] = {}
+        self._env_ref: Optional[Dict[str, str]] = None  # {"hash": ..., "store": ...} of the ENV in an EnvStore
         self._frozen: bool = False
 
         file_exists = self.exists
@@ -145,17 +259,72 @@ class RunOutputFile:
             self._check_not_frozen()
             self.data.update(data)
 
-        self.save_if_save_every_set()
+        if not self._undecodable or self.overwrite_corrupt:
+            self.save_if_save_every_set()
         self.kwargs = kwargs
 
     @property
     def path(self) -> Path:
-        return self.output_dir / (self.filename + self.EXT)
+        return self.output_dir / (self.filename + self.ext)
+
+    @property
+    def ext(self) -> str:
+        return self.serializer.ext_for(self.EXT)
+
+    @property
+    def journal_path(self) -> Path:
+        return self.path.with_name(self.path.name + self.JOURNAL_SUFFIX)
+
+    @property
+    def backup_path(self) -> Path:
+        return backup_path_of(self.path)
 
     @property
     def exists(self) -> bool:
         return self.path.exists()
 
+    @property
+    def env(self) -> Dict[str, str]:
+        if self._env is None:
+            self._env = self._load_env_ref()
+        return self._env
+
+    @env.setter
+    def env(self, env: Dict[str, str]):
+        self._env = env
+        self._env_ref = None
+
+    def _make_env_store(self, env_store: Optional[Union[bool, str, Path, EnvStore]]) -> Optional[EnvStore]:
+        if env_store is None or env_store is False:
+            return None
+        if env_store is True:
+            return EnvStore(self.output_dir / EnvStore.DEFAULT_DIRNAME)
+        if isinstance(env_store, EnvStore):
+            return env_store
+        return EnvStore(env_store)
+
+    def _load_env_ref(self) -> Dict[str, str]:
+        ref: Dict[str, str] = self._env_ref  # type: ignore
+        store = EnvStore(self.output_dir / ref["store"])
+        try:
+            return store.get(ref["hash"])
+        except FileNotFoundError:
+            warnings.warn(f"The ENV '{ref['hash']}' of '{self.path}' is missing from the store '{store.root}'.")
+            return {}
+
+    def _get_env_state(self) -> Dict[str, Any]:
+        """Get the ENV entry of the saved state: a reference to the store if there is one, else the ENV itself."""
+        if self._env_ref is None and self.env_store is not None:
+            env_hash = self.env_store.put(self.env)
+            try:
+                store = os.path.relpath(self.env_store.root, self.output_dir)
+            except ValueError:  # pragma: no cover
+                store = os.path.abspath(self.env_store.root)  # On Windows, when the store is on another drive
+            self._env_ref = {"hash": env_hash, "store": Path(store).as_posix()}
+        if self._env_ref is not None:
+            return {"ENV_REF": self._env_ref}
+        return {"ENV": self.env}
+
     @property
     def frozen(self) -> bool:
         return self._frozen
@@ -169,6 +338,12 @@ class RunOutputFile:
         path = Path(path)
         output_dir = path.parent
         filename = path.name.replace(cls.EXT, "")
+        for name, serializer in SERIALIZERS.items():
+            ext = serializer.ext_for(cls.EXT)
+            if ext != cls.EXT and path.name.endswith(ext):
+                filename = path.name[: -len(ext)]
+                kwargs.setdefault("serializer", name)
+                break
         return cls(output_dir, filename, **kwargs)
 
     def _check_not_frozen(self):
@@ -191,13 +366,17 @@ class RunOutputFile:
         return self.data[key]
 
     def __setitem__(self, key, value):
-        self._check_not_frozen()
-        self.data[key] = value
+        with self._lock:
+            self._check_not_frozen()
+            self.data[key] = value
+            self._record_change("update", data={key: value})
         self.save_if_save_every_set()
 
     def __delitem__(self, key):
-        self._check_not_frozen()
-        del self.data[key]
+        with self._lock:
+            self._check_not_frozen()
+            del self.data[key]
+            self._record_change("sub", keys={key: None})
         self.save_if_save_every_set()
 
     def get(self, key, default=None):
@@ -240,15 +419,20 @@ class RunOutputFile:
         return len(self.data)
 
     def __add__(self, other):
-        self._check_not_frozen()
-        self.data.update(other)
+        with self._lock:
+            self._check_not_frozen()
+            self.data.update(other)
+            self._record_change("update", data=dict(other))
         self.save_if_save_every_set()
         return self
 
     def __sub__(self, other):
-        self._check_not_frozen()
-        for key in other:
-            self.data.pop(key, None)
+        with self._lock:
+            self._check_not_frozen()
+            keys = list(other)
+            for key in keys:
+                self.data.pop(key, None)
+            self._record_change("sub", keys=dict.fromkeys(keys))
         self.save_if_save_every_set()
         return self
 
@@ -270,62 +454,256 @@ class RunOutputFile:
         print_updated: bool = True,
         print_header: str = "New Data",
     ):
-        self._check_not_frozen()
-        self.data.update(other)
+        with self._lock:
+            self._check_not_frozen()
+            self.data.update(other)
+            self._record_change("update", data=dict(other))
         self.save_if_save_every_set()
         if print_updated:
             print(f"{print_header}:\n{json.dumps(other, indent=4, default=str)}\n")
         return self
 
     def save_if_save_every_set(self):
-        if self.save_every_set:
-            self.save()
+        if not self.save_every_set:
+            return self
+        if self._flusher is None:
+            return self._write_pending()
+        self._flusher.notify_change()
+        return self
+
+    def flush(self):
+        """Write the changes held back by the save policy now."""
+        if self._flusher is not None:
+            self._flusher.flush()
+        return self
+
+    def _write_pending(self):
+        """
+        Write the pending changes: the pending journal records are appended to the journal if there are any,
+        otherwise the whole file is saved.
+        """
+        with self._io_lock:
+            with self._lock:
+                records = list(self._pending_journal)
+            if not records:
+                return self.save()
+            # The records are only dropped once written, so they are kept if they cannot be encoded.
+            content = b"".join(self.serializer.dumps_record(record) for record in records)
+            with open(self.journal_path, "ab") as f:
+                f.write(content)
+            with self._lock:
+                del self._pending_journal[: len(records)]
+            self._journal_size += len(records)
+            if self.journal_compact_every is not None and self._journal_size >= self.journal_compact_every:
+                self.compact()
+        return self
+
+    def _record_change(self, op: str, **payload):
+        """
+        Account for a change made to this object. In journal mode, the change is queued as a journal record that is
+        written by the next :meth:`_write_pending`. Must be called while holding ``_lock``. The keys of the data and
+        logs are given as the keys of mappings, so the serializer converts them like in a full save.
+
+        :param op: The name of the operation, see :meth:`_apply_journal_record`.
+        :type op: str
+        :param payload: The arguments of the operation.
+        """
+        self._journal_seq += 1
+        if self.journal and self.save_every_set and self._base_saved:
+            self._pending_journal.append({"seq": self._journal_seq, "op": op, **payload})
+        return self
+
+    def _apply_journal_record(self, record: Dict[str, Any]):
+        op = record["op"]
+        if op == "update":
+            self.data.update(record["data"])
+        elif op == "sub":
+            for key in record["keys"]:
+                self.data.pop(key, None)
+        elif op == "log":
+            for level, msg in record["logs"].items():
+                self.logs[level].append(msg)
+        else:
+            raise ValueError(f"Unknown journal operation '{op}' in '{self.journal_path}'.")
+        return self
+
+    def _replay_journal(self):
+        """
+        Apply the records of the journal file that are newer than the loaded state. A truncated last record, left by a
+        crash during an append, is ignored. If this object writes its changes, i.e. ``save_every_set`` is set, the
+        truncated record is also cut from the file, so the next record is not appended to it and lost.
+        """
+        if not self.journal_path.exists():
+            return self
+        valid_size = 0
+        with open(self.journal_path, "rb") as f:
+            serializer = detect_serializer(f.read(64), self.journal_path)
+            f.seek(0)
+            for record, valid_size in serializer.iter_records(f):
+                self._journal_size += 1
+                if record["seq"] <= self._journal_seq:
+                    continue
+                self._apply_journal_record(record)
+                self._journal_seq = record["seq"]
+        if self.save_every_set and valid_size < os.path.getsize(self.journal_path):
+            os.truncate(self.journal_path, valid_size)
+        return self
+
+    def compact(self):
+        """Fold the journal into the output file and remove the journal."""
+        return self.save()
+
+    def close(self):
+        """Write the changes held back by the save policy and compact the journal, if any, into the output file."""
+        if self._flusher is not None:
+            self._flusher.close()
+        if self._journal_size > 0:
+            self.compact()
+        return self
+
+    def __enter__(self):
         return self
 
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
     def __getstate__(self):
         return {
             "datetime": str(datetime.datetime.now()),
             "data": self.data,
             "logs": self.logs,
             "path": str(self.path),
-            "ENV": self.env,
+            **self._get_env_state(),
             "frozen": self._frozen,
+            "journal_seq": self._journal_seq,
         }
 
     def __setstate__(self, state: Dict[str, Any]):
         self.data.update(state.get("data", {}))
         self.logs.update(state.get("logs", {}))
         self.env = state.get("ENV", {})
+        if "ENV_REF" in state:
+            self._env_ref = state["ENV_REF"]
+            self._env = None
         self._frozen = state.get("frozen", False)
+        self._journal_seq = state.get("journal_seq", 0)
         return self
 
     def save(self):
-        self.output_dir.mkdir(parents=True, exist_ok=True)
-        save_data = self.__getstate__()
-        with open(self.path, "w") as f:
-            json.dump(save_data, f, indent=4)
+        if self._undecodable and not self.overwrite_corrupt:
+            raise RuntimeError(
+                f"RunOutputFile at '{self.path}' could not be decoded and is not overwritten. "
+                f"Pass overwrite_corrupt=True to replace it."
+            )
+        with self._io_lock:
+            with self._lock:
+                content = self.serializer.dumps(self.__getstate__())
+                self._pending_journal = []
+            self.output_dir.mkdir(parents=True, exist_ok=True)
+            backup = self.backup and not self._keep_backup
+            atomic_write(self.path, content, durability=self.durability, backup=backup)
+            self._keep_backup = False
+            self._undecodable = False
+            self._base_saved = True
+            if self._journal_size > 0 or self.journal:
+                self.journal_path.unlink(missing_ok=True)
+                self._journal_size = 0
         return self
 
+    @classmethod
+    def read_data_from_file(cls, path: Union[str, Path]) -> dict:
+        """
+        Read only the data section of a file, without building a :class:`RunOutputFile` and without any side effect
+        on the file. The items of the file are decoded one at a time and the reading stops at the data section, so
+        the logs and the ENV written after it are neither decoded nor, for large files, read from disk.
+
+        If the file has an un-compacted journal, the file is fully loaded to replay it. If the file cannot be
+        decoded, its backup is read instead, if there is one.
+
+        :param path: The path to the file.
+        :type path: Union[str, Path]
+        :return: The data of the file.
+        :rtype: dict
+
+        :raises FileNotFoundError: If the file does not exist.
+        :raises ValueError: If the file cannot be decoded.
+        """
+        path = Path(path)
+        if path.with_name(path.name + cls.JOURNAL_SUFFIX).exists():
+            return cls.from_file(path, save_every_set=False).data
+        try:
+            return cls._read_data_section(path)
+        except ValueError:
+            backup_path = backup_path_of(path)
+            if not backup_path.exists():
+                raise
+            return cls._read_data_section(backup_path)
+
+    @classmethod
+    def _read_data_section(cls, path: Path) -> dict:
+        with open(path, "rb") as f:
+            serializer = detect_serializer(f.read(64), path)
+            f.seek(0)
+            items = serializer.iter_items(f)
+            first_key, first_value = next(items, (None, None))
+            if first_key != "datetime":
+                # Not written by __getstate__, e.g. a legacy file: decode everything and apply the rules of load().
+                state = dict(itertools.chain([(first_key, first_value)], items)) if first_key is not None else {}
+                if "data" in state and "logs" in state:
+                    return state["data"]
+                return state
+            for key, value in items:
+                if key == "data":
+                    return value
+        return {}
+
+    @staticmethod
+    def read_file(path: Union[str, Path]) -> Any:
+        """
+        Read and decode a file written by any registered serializer.
+
+        :raises ValueError: If the content of the file cannot be decoded.
+        """
+        with open(path, "rb") as f:
+            raw = f.read()
+        return detect_serializer(raw, path).loads(raw)
+
     def load(self):
-        with open(self.path, "r") as f:
-            saved_data = json.load(f)
+        try:
+            saved_data = self.read_file(self.path)
+        except ValueError:
+            if not self.backup_path.exists():
+                raise
+            warnings.warn(f"Could not decode '{self.path}', loading the backup '{self.backup_path}' instead.")
+            saved_data = self.read_file(self.backup_path)
+            # The next save replaces the undecodable file but must not replace the backup with it.
+            self._keep_backup = True
 
         if "data" not in saved_data or "logs" not in saved_data:
-            return self.legacy_load()
+            return self.legacy_load(saved_data)
 
         self.__setstate__(saved_data)
+        self._base_saved = True
+        self._replay_journal()
         return self
 
-    def legacy_load(self):
-        with open(self.path, "r") as f:
-            self.data.update(json.load(f))
+    def legacy_load(self, saved_data: Optional[dict] = None):
+        if saved_data is None:
+            saved_data = self.read_file(self.path)
+        self.data.update(saved_data)
         return self
 
     def load_if_exists(self):
         if self.exists:
             try:
                 self.load()
-            except (json.JSONDecodeError, FileNotFoundError):
+            except ValueError as e:
+                self._undecodable = True
+                warnings.warn(
+                    f"Could not decode '{self.path}', starting from an empty state. The file is not overwritten "
+                    f"unless overwrite_corrupt is True: {e}"
+                )
+            except FileNotFoundError:
                 pass
         return self
 
@@ -348,9 +726,11 @@ class RunOutputFile:
         return ravel_dict(raveled_state, key_sep=key_sep)
 
     def log(self, msg: str, level=logging.INFO, print_msg: bool = True, **kwargs):
-        self._check_not_frozen()
         msg = str(msg)
-        self.logs[level].append(msg)
+        with self._lock:
+            self._check_not_frozen()
+            self.logs[level].append(msg)
+            self._record_change("log", logs={level: msg})
         if print_msg:
             if level == logging.INFO:
                 print(msg)
@@ -0,0 +1,219 @@
+import atexit
+import os
+import signal
+import threading
+import time
+import warnings
+import weakref
+from typing import Any, Callable, Dict, Optional, Sequence, Set
+
+_LIVE_FLUSHERS: "weakref.WeakSet[PolicyFlusher]" = weakref.WeakSet()
+# The flushers whose target has pending changes, kept alive with their target until the changes are flushed.
+_DIRTY_FLUSHERS: "Set[PolicyFlusher]" = set()
+_PREVIOUS_SIGNAL_HANDLERS: Dict[int, Callable] = {}
+
+
+class SavePolicy:
+    """
+    Describe when the changes made to a :class:`RunOutputFile` are written to disk. The changes are coalesced and
+    flushed as soon as one of the enabled conditions is met.
+
+    Example:
+
+        ```python
+        # Flush at most every 500 ms or every 100 changes, and when the process exits or receives SIGTERM.
+        policy = SavePolicy(every_n_changes=100, interval_ms=500, signals=[signal.SIGTERM])
+        output = RunOutputFile("output_dir", save_policy=policy)
+        ```
+
+    :param every_n_changes: Flush when this number of changes is pending. If None, the number of changes is not
+        used to trigger a flush.
+    :type every_n_changes: Optional[int]
+    :param interval_ms: Flush at most once every ``interval_ms`` milliseconds. Changes made within the interval are
+        flushed together at the end of the interval. If None, the elapsed time is not used to trigger a flush.
+    :type interval_ms: Optional[float]
+    :param background: If True, a background thread flushes the pending changes at the end of the interval, even if
+        no other change is made. If False, the pending changes are flushed by the next change made after the end of
+        the interval. Default is True.
+    :type background: bool
+    :param at_exit: If True, the pending changes are flushed when the interpreter exits. Default is True.
+    :type at_exit: bool
+    :param signals: The signals on which the pending changes are flushed before calling the previous handler of the
+        signal. The handlers can only be installed from the main thread.
+    :type signals: Sequence[int]
+    """
+
+    def __init__(
+        self,
+        every_n_changes: Optional[int] = None,
+        interval_ms: Optional[float] = None,
+        background: bool = True,
+        at_exit: bool = True,
+        signals: Sequence[int] = (),
+    ):
+        if every_n_changes is not None and every_n_changes < 1:
+            raise ValueError("every_n_changes must be greater or equal than 1.")
+        if interval_ms is not None and interval_ms < 0:
+            raise ValueError("interval_ms must be greater or equal than 0.")
+        self.every_n_changes = every_n_changes
+        self.interval_ms = interval_ms
+        self.background = background
+        self.at_exit = at_exit
+        self.signals = tuple(signals)
+
+    def __repr__(self):
+        return (
+            f"{self.__class__.__name__}(every_n_changes={self.every_n_changes}, interval_ms={self.interval_ms}, "
+            f"background={self.background}, at_exit={self.at_exit}, signals={self.signals})"
+        )
+
+
+class PolicyFlusher:
+    """
+    Apply a :class:`SavePolicy` to a target object. The target must define a ``_write_pending`` method that writes
+    its pending changes to disk. Only a weak reference to the target is kept while it has no pending changes, so the
+    flusher does not keep it alive. A target with pending changes is kept alive until they are flushed, by the
+    background thread, at exit or on a signal, so dropping it does not lose them.
+
+    :param target: The object to flush.
+    :param policy: The policy deciding when the target is flushed.
+    :type policy: SavePolicy
+    """
+
+    def __init__(self, target, policy: SavePolicy):
+        self._target = weakref.ref(target)
+        self._pinned: Any = None  # Strong reference to the target while it has pending changes
+        self.policy = policy
+        # Reentrant, since the flush of a signal handler may interrupt the main thread while it holds the lock.
+        self._lock = threading.RLock()
+        self._n_pending = 0
+        self._last_flush = time.monotonic()
+        self._thread: Optional[threading.Thread] = None
+        self._wake = threading.Event()
+        if policy.at_exit or policy.signals:
+            _LIVE_FLUSHERS.add(self)
+        for signum in policy.signals:
+            _install_signal_handler(signum)
+
+    @property
+    def n_pending(self) -> int:
+        return self._n_pending
+
+    @property
+    def flushed_later(self) -> bool:
+        """Whether the pending changes are flushed even if no other change is made nor :meth:`flush` called."""
+        policy = self.policy
+        return policy.at_exit or bool(policy.signals) or (policy.background and policy.interval_ms is not None)
+
+    @property
+    def interval(self) -> Optional[float]:
+        if self.policy.interval_ms is None:
+            return None
+        return self.policy.interval_ms / 1000.0
+
+    def notify_change(self):
+        """Record a new change and flush if the policy says so."""
+        interval = self.interval
+        with self._lock:
+            self._n_pending += 1
+            if self._pinned is None and self.flushed_later:
+                self._pinned = self._target()
+                _DIRTY_FLUSHERS.add(self)
+            due = self.policy.every_n_changes is not None and self._n_pending >= self.policy.every_n_changes
+            due = due or (interval is not None and time.monotonic() - self._last_flush >= interval)
+            start_thread = not due and interval is not None and self.policy.background and self._thread is None
+            if start_thread:
+                self._thread = threading.Thread(target=self._run, name="PolicyFlusher", daemon=True)
+        if due:
+            self.flush()
+        elif start_thread:
+            self._thread.start()  # type: ignore
+        return self
+
+    def flush(self):
+        """Write the pending changes of the target, if any."""
+        with self._lock:
+            if self._n_pending == 0:
+                return self
+            n_pending, self._n_pending = self._n_pending, 0
+            self._last_flush = time.monotonic()
+            target = self._pinned if self._pinned is not None else self._target()
+            self._pinned = None
+            _DIRTY_FLUSHERS.discard(self)
+        if target is None:
+            return self
+        try:
+            target._write_pending()
+        except BaseException:
+            # The changes are still pending: keep the target until they are flushed.
+            with self._lock:
+                self._n_pending += n_pending
+                if self.flushed_later:
+                    self._pinned = target
+                    _DIRTY_FLUSHERS.add(self)
+            raise
+        return self
+
+    def close(self):
+        """Flush the pending changes and stop the background thread."""
+        self.flush()
+        self._wake.set()
+        return self
+
+    def _run(self):
+        while True:
+            with self._lock:
+                if self._n_pending == 0 or self._target() is None:
+                    self._thread = None
+                    return
+                wait = self._last_flush + self.interval - time.monotonic()  # type: ignore
+            if wait > 0:
+                if self._wake.wait(wait):
+                    self._wake.clear()
+            else:
+                self.flush()
+
+
+def flush_all(predicate: Optional[Callable[[SavePolicy], bool]] = None):
+    """
+    Flush the pending changes of every live target having a policy with ``at_exit`` or ``signals``.
+
+    :param predicate: If given, only the targets whose policy satisfies the predicate are flushed.
+    :type predicate: Optional[Callable[[SavePolicy], bool]]
+    """
+    for flusher in set(_LIVE_FLUSHERS) | _DIRTY_FLUSHERS:
+        if predicate is not None and not predicate(flusher.policy):
+            continue
+        try:
+            flusher.flush()
+        except Exception as e:  # pragma: no cover
+            warnings.warn(f"Could not flush {flusher._target()}: {e}")
+
+
+def _flush_at_exit():
+    flush_all(lambda policy: policy.at_exit)
+
+
+def _install_signal_handler(signum: int):
+    if signum in _PREVIOUS_SIGNAL_HANDLERS:
+        return
+    try:
+        previous = signal.signal(signum, _signal_handler)
+    except ValueError:
+        warnings.warn(f"Could not install the flush handler for signal {signum}: not in the main thread.")
+        return
+    _PREVIOUS_SIGNAL_HANDLERS[signum] = previous
+
+
+def _signal_handler(signum, frame):
+    flush_all(lambda policy: signum in policy.signals)
+    previous = _PREVIOUS_SIGNAL_HANDLERS.get(signum, signal.SIG_DFL)
+    if callable(previous):
+        previous(signum, frame)
+    elif previous == signal.SIG_DFL:
+        signal.signal(signum, signal.SIG_DFL)
+        _PREVIOUS_SIGNAL_HANDLERS.pop(signum, None)
+        os.kill(os.getpid(), signum)
+
+
+atexit.register(_flush_at_exit)
@@ -0,0 +1,164 @@
+import fnmatch
+import json
+import os
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence, Tuple, Union
+
+from ..hash_tools import hash_dict
+from .atomic_io import atomic_write
+
+Classifier = Callable[[str], bool]
+
+
+def suffix_classifier(suffixes: Sequence[str]) -> Classifier:
+    """Classify the file names ending with one of the given suffixes."""
+    suffixes = tuple(suffixes)
+    return lambda name: name.endswith(suffixes)
+
+
+def prefix_classifier(prefixes: Sequence[str]) -> Classifier:
+    """Classify the file names starting with one of the given prefixes."""
+    prefixes = tuple(prefixes)
+    return lambda name: name.startswith(prefixes)
+
+
+class DirectoryScanner:
+    """
+    Walk a directory tree once with :func:`os.scandir` and classify its files by kind, e.g. metadata, data and state
+    files of output folders, instead of walking the tree once per kind.
+
+    Example:
+
+        ```python
+        scanner = DirectoryScanner({"data": [".out.json"], "meta": [".meta.json"]}, prune=[".git"], max_depth=3)
+        files = scanner.scan("results")
+        files["data"]  # The paths of the data files
+        ```
+
+    :param kinds: The suffixes of the files of each kind. A file is classified in the first kind matching its name.
+        The names of the kinds are used as keys of the result of :meth:`scan`.
+    :type kinds: Dict[str, Sequence[str]]
+    :param prune: The directories not to descend into: either glob patterns matched against the directory names, or
+        a function taking the path of a directory and returning True to prune it. Default is None.
+    :type prune: Optional[Union[Sequence[str], Callable[[str], bool]]]
+    :param max_depth: The maximum depth of the directories to scan, the root being at depth 0. If None, the whole
+        tree is scanned. Default is None.
+    :type max_depth: Optional[int]
+    :param manifest_path: If given, the listing of every scanned directory is cached in this JSON manifest along with
+        the modification time of the directory. On the next scan, the directories whose modification time did not
+        change are not listed again, which saves a lot of time on network filesystems. Note that a directory
+        modified twice within the resolution of its modification time could be missed, and that the directory of
+        the manifest is listed on every scan since writing the manifest modifies it. Default is None.
+    :type manifest_path: Optional[Union[str, Path]]
+    :param classifiers: Additional kinds classified by a function taking the file name, checked after ``kinds``.
+        When a manifest is used, the name of the classifiers and the suffixes of the kinds identify the classification.
+    :type classifiers: Optional[Dict[str, Classifier]]
+    """
+
+    MANIFEST_VERSION: int = 1
+
+    def __init__(
+        self,
+        kinds: Dict[str, Sequence[str]],
+        prune: Optional[Union[Sequence[str], Callable[[str], bool]]] = None,
+        max_depth: Optional[int] = None,
+        manifest_path: Optional[Union[str, Path]] = None,
+        classifiers: Optional[Dict[str, Classifier]] = None,
+    ):
+        self.kinds = {kind: list(suffixes) for kind, suffixes in kinds.items()}
+        self.classifiers: Dict[str, Classifier] = {kind: suffix_classifier(s) for kind, s in self.kinds.items()}
+        self.classifiers.update(classifiers or {})
+        self.prune = prune
+        self.max_depth = max_depth
+        self.manifest_path = Path(manifest_path) if manifest_path is not None else None
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}(kinds={list(self.classifiers)}, max_depth={self.max_depth})"
+
+    def classify(self, name: str) -> Optional[str]:
+        """Get the kind of a file from its name, or None if it has no kind."""
+        for kind, classifier in self.classifiers.items():
+            if classifier(name):
+                return kind
+        return None
+
+    def is_pruned(self, path: str) -> bool:
+        if self.prune is None:
+            return False
+        if callable(self.prune):
+            return self.prune(path)
+        name = os.path.basename(path)
+        return any(fnmatch.fnmatch(name, pattern) for pattern in self.prune)
+
+    @property
+    def _signature(self) -> str:
+        return hash_dict({"kinds": self.kinds, "classifiers": sorted(self.classifiers)})
+
+    def _load_manifest(self) -> Dict[str, dict]:
+        if self.manifest_path is None or not self.manifest_path.exists():
+            return {}
+        try:
+            with open(self.manifest_path, "r") as f:
+                manifest = json.load(f)
+        except ValueError:
+            return {}
+        if manifest.get("version") != self.MANIFEST_VERSION or manifest.get("signature") != self._signature:
+            return {}
+        return manifest.get("dirs", {})
+
+    def _save_manifest(self, dirs: Dict[str, dict]):
+        manifest = {"version": self.MANIFEST_VERSION, "signature": self._signature, "dirs": dirs}
+        self.manifest_path.parent.mkdir(parents=True, exist_ok=True)  # type: ignore
+        atomic_write(self.manifest_path, json.dumps(manifest, separators=(",", ":")))  # type: ignore
+
+    def _list_dir(self, path: str) -> Tuple[List[Tuple[str, str]], List[str]]:
+        files, subdirs = [], []
+        with os.scandir(path) as it:
+            for entry in it:
+                if entry.is_dir(follow_symlinks=False):
+                    subdirs.append(entry.name)
+                elif entry.is_file():
+                    kind = self.classify(entry.name)
+                    if kind is not None:
+                        files.append((entry.name, kind))
+        return files, subdirs
+
+    def scan(self, root: Union[str, Path]) -> Dict[str, List[Path]]:
+        """
+        Scan the directory tree under the root.
+
+        :param root: The root directory.
+        :type root: Union[str, Path]
+
+        :return: The paths of the files of each kind. Every kind is a key, even if it has no file.
+        :rtype: Dict[str, List[Path]]
+        """
+        root = str(root)
+        cached_dirs = self._load_manifest()
+        scanned_dirs: Dict[str, dict] = {}
+        result: Dict[str, List[Path]] = {kind: [] for kind in self.classifiers}
+        stack = [(root, ".", 0)]
+        while stack:
+            path, rel_path, depth = stack.pop()
+            try:
+                mtime_ns = os.stat(path).st_mtime_ns if self.manifest_path is not None else None
+                cached = cached_dirs.get(rel_path)
+                if cached is not None and cached["mtime_ns"] == mtime_ns:
+                    files, subdirs = [tuple(f) for f in cached["files"]], cached["subdirs"]
+                else:
+                    files, subdirs = self._list_dir(path)
+            except (FileNotFoundError, NotADirectoryError, PermissionError):
+                continue
+            if self.manifest_path is not None:
+                scanned_dirs[rel_path] = {"mtime_ns": mtime_ns, "files": files, "subdirs": subdirs}
+            for name, kind in files:
+                result[kind].append(Path(path, name))
+            if self.max_depth is not None and depth >= self.max_depth:
+                continue
+            for name in reversed(subdirs):
+                subdir_path = os.path.join(path, name)
+                if not self.is_pruned(subdir_path):
+                    stack.append((subdir_path, os.path.join(rel_path, name), depth + 1))
+        if self.manifest_path is not None:
+            self._save_manifest(scanned_dirs)
+        return result
@@ -0,0 +1,391 @@
+import abc
+import codecs
+import json
+import math
+import os
+import warnings
+from pathlib import Path
+from typing import Any, BinaryIO, Dict, Iterator, Optional, Tuple, Union
+
+
+class Serializer(abc.ABC):
+    """
+    Base class of the serializers used by :class:`RunOutputFile` to write its state to disk and read it back.
+    A serializer is registered under its :attr:`NAME` with :func:`register_serializer`. The subclasses must define
+    :meth:`dumps` and :meth:`loads`, and :meth:`dumps_record` and :meth:`iter_records` to support the journal mode.
+
+    :cvar NAME: The name of the serializer in the registry.
+    :cvar FILE_SUFFIX: The last suffix of the files written by the serializer.
+    :cvar FALLBACK: The name of the serializer to use when this one is not available.
+    """
+
+    NAME: str = ""
+    FILE_SUFFIX: str = ".json"
+    FALLBACK: Optional[str] = "json"
+
+    def is_available(self) -> bool:
+        """Whether the dependencies of the serializer are installed."""
+        return True
+
+    def ext_for(self, ext: str) -> str:
+        """
+        Get the extension of the files written by this serializer for the given default extension, e.g.
+        ``".out.json"`` becomes ``".out.msgpack"`` for a msgpack serializer.
+        """
+        if ext.endswith(self.FILE_SUFFIX):
+            return ext
+        return os.path.splitext(ext)[0] + self.FILE_SUFFIX
+
+    @abc.abstractmethod
+    def dumps(self, obj: Any) -> Union[str, bytes]:
+        """Encode an object, e.g. the state of a :class:`RunOutputFile`."""
+
+    @abc.abstractmethod
+    def loads(self, raw: bytes) -> Any:
+        """Decode an object encoded by :meth:`dumps`."""
+
+    def iter_items(self, f: BinaryIO) -> Iterator[Tuple[Any, Any]]:
+        """
+        Iterate over the top-level items of a mapping written in the file. Serializers able to decode the items one
+        at a time override this method, so a reader stopping early does not decode the rest of the file.
+
+        :param f: The file opened in binary mode.
+        :type f: BinaryIO
+
+        :return: An iterator over the (key, value) pairs of the mapping.
+        :raises ValueError: If the content of the file is not a mapping or cannot be decoded.
+        """
+        obj = self.loads(f.read())
+        if not isinstance(obj, dict):
+            raise ValueError(f"Expected a mapping, got {type(obj).__name__}.")
+        yield from obj.items()
+
+    def dumps_record(self, obj: Any) -> bytes:
+        """
+        Encode a record appended to a journal, with the same conversions as :meth:`dumps`, e.g. of the keys, so the
+        replayed records give the same state as the saved one. Records are appended one after the other.
+        """
+        raise NotImplementedError
+
+    def iter_records(self, f: BinaryIO) -> Iterator[Tuple[Any, int]]:
+        """
+        Iterate over the records appended to a journal by :meth:`dumps_record`, stopping at the first record that
+        cannot be decoded, e.g. one truncated by a crash during an append.
+
+        :param f: The journal opened in binary mode, at its start.
+        :type f: BinaryIO
+
+        :return: An iterator over the records and the offset of the end of each of them in the file.
+        """
+        raise NotImplementedError
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}()"
+
+
+class _IncrementalJsonObjectReader:
+    """
+    Decode the top-level items of a JSON object one at a time, reading the file by growing chunks only as far as
+    needed to decode the next item.
+    """
+
+    WHITESPACES = " \t\n\r"
+
+    def __init__(self, f: BinaryIO, chunk_size: int = 64 * 1024):
+        self._f = f
+        self._chunk_size = chunk_size
+        self._text_decoder = codecs.getincrementaldecoder("utf-8")()
+        self._json_decoder = json.JSONDecoder()
+        self._buffer = ""
+        self._eof = False
+
+    def _read_more(self):
+        chunk = self._f.read(self._chunk_size)
+        self._chunk_size *= 2
+        if not chunk:
+            self._eof = True
+        self._buffer += self._text_decoder.decode(chunk, final=self._eof)
+
+    def _next_char(self, pos: int) -> Tuple[str, int]:
+        while True:
+            while pos < len(self._buffer) and self._buffer[pos] in self.WHITESPACES:
+                pos += 1
+            if pos < len(self._buffer):
+                return self._buffer[pos], pos
+            if self._eof:
+                raise json.JSONDecodeError("Unexpected end of data", self._buffer, pos)
+            self._read_more()
+
+    def _expect(self, expected: str, pos: int) -> int:
+        char, pos = self._next_char(pos)
+        if char not in expected:
+            raise json.JSONDecodeError(f"Expecting one of {expected!r}", self._buffer, pos)
+        return pos
+
+    def _decode(self, pos: int) -> Tuple[Any, int]:
+        while True:
+            try:
+                value, end = self._json_decoder.raw_decode(self._buffer, pos)
+                # A value ending with the buffer, e.g. a number, may continue in the next chunk.
+                if end < len(self._buffer) or self._eof:
+                    return value, end
+            except json.JSONDecodeError:
+                if self._eof:
+                    raise
+            self._read_more()
+
+    def __iter__(self) -> Iterator[Tuple[Any, Any]]:
+        pos = self._expect("{", 0)
+        char, pos = self._next_char(pos + 1)
+        if char == "}":
+            return
+        while True:
+            key, pos = self._decode(pos)
+            pos = self._expect(":", pos)
+            _, pos = self._next_char(pos + 1)
+            value, pos = self._decode(pos)
+            yield key, value
+            pos = self._expect(",}", pos)
+            if self._buffer[pos] == "}":
+                return
+            _, pos = self._next_char(pos + 1)
+
+
+class JsonSerializer(Serializer):
+    """Human-readable JSON with the standard library. This is the historical format of :class:`RunOutputFile`."""
+
+    NAME = "json"
+    FALLBACK = None
+
+    def __init__(self, indent: Optional[int] = 4):
+        self.indent = indent
+
+    def dumps(self, obj: Any) -> str:
+        return json.dumps(obj, indent=self.indent)
+
+    def loads(self, raw: bytes) -> Any:
+        return json.loads(raw)
+
+    def iter_items(self, f: BinaryIO) -> Iterator[Tuple[Any, Any]]:
+        return iter(_IncrementalJsonObjectReader(f))
+
+    def dumps_record(self, obj: Any) -> bytes:
+        return json.dumps(obj, separators=(",", ":")).encode() + b"\n"
+
+    def iter_records(self, f: BinaryIO) -> Iterator[Tuple[Any, int]]:
+        # One record per line: compact JSON never holds a line break, so a last line without one is truncated.
+        end = f.tell()
+        for line in f:
+            if not line.endswith(b"\n"):
+                return
+            try:
+                record = self.loads(line)
+            except ValueError:
+                return
+            end += len(line)
+            yield record, end
+
+
+class CompactJsonSerializer(JsonSerializer):
+    """JSON without indentation nor spaces with the standard library."""
+
+    NAME = "compact_json"
+    FALLBACK = None
+
+    def __init__(self):
+        super().__init__(indent=None)
+
+    def dumps(self, obj: Any) -> str:
+        return json.dumps(obj, separators=(",", ":"))
+
+
+def _has_non_finite_floats(obj: Any) -> bool:
+    """Whether the object holds a NaN or infinite float, in a nested container or a NumPy array."""
+    stack = [obj]
+    while stack:
+        item = stack.pop()
+        if isinstance(item, float):
+            if not math.isfinite(item):
+                return True
+        elif isinstance(item, dict):
+            stack.extend(item.values())
+        elif isinstance(item, (list, tuple)):
+            stack.extend(item)
+        elif type(item).__module__ == "numpy" and getattr(item, "dtype", None) is not None:
+            import numpy as np
+
+            if np.issubdtype(item.dtype, np.inexact) and not np.isfinite(item).all():
+                return True
+    return False
+
+
+def _numpy_default(obj: Any) -> Any:
+    if hasattr(obj, "tolist"):
+        return obj.tolist()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+class OrjsonSerializer(JsonSerializer):
+    """
+    Compact JSON with `orjson <https://github.com/ijl/orjson>`_. Non-string keys are converted to strings and NumPy
+    arrays are supported. Only used when explicitly selected: the files are read back with the standard library.
+    orjson writes NaN and Infinity as ``null``, so an object holding them is written with the standard library
+    instead, which keeps them like the ``json`` serializer.
+    """
+
+    NAME = "orjson"
+    FALLBACK = "compact_json"
+
+    def __init__(self):
+        super().__init__(indent=None)
+
+    def is_available(self) -> bool:
+        try:
+            import orjson  # noqa: F401
+        except ImportError:
+            return False
+        return True
+
+    def dumps(self, obj: Any) -> bytes:
+        import orjson
+
+        if _has_non_finite_floats(obj):
+            return json.dumps(obj, separators=(",", ":"), default=_numpy_default).encode()
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY)
+
+    def loads(self, raw: bytes) -> Any:
+        import orjson
+
+        try:
+            return orjson.loads(raw)
+        except orjson.JSONDecodeError:
+            # orjson rejects NaN and Infinity, which are written with the standard library.
+            return json.loads(raw)
+
+    def dumps_record(self, obj: Any) -> bytes:
+        return self.dumps(obj) + b"\n"
+
+
+class MsgpackSerializer(Serializer):
+    """Binary format with `msgpack <https://msgpack.org/>`_. Written files use the ``.msgpack`` suffix."""
+
+    NAME = "msgpack"
+    FILE_SUFFIX = ".msgpack"
+    FALLBACK = "json"
+
+    def is_available(self) -> bool:
+        try:
+            import msgpack  # noqa: F401
+        except ImportError:
+            return False
+        return True
+
+    def dumps(self, obj: Any) -> bytes:
+        import msgpack
+
+        return msgpack.packb(obj, use_bin_type=True)
+
+    def loads(self, raw: bytes) -> Any:
+        import msgpack
+
+        return msgpack.unpackb(raw, raw=False, strict_map_key=False)
+
+    def iter_items(self, f: BinaryIO) -> Iterator[Tuple[Any, Any]]:
+        import msgpack
+
+        unpacker = msgpack.Unpacker(f, raw=False, strict_map_key=False)
+        try:
+            for _ in range(unpacker.read_map_header()):
+                key = unpacker.unpack()
+                yield key, unpacker.unpack()
+        except msgpack.OutOfData as e:
+            raise ValueError(f"Unexpected end of data: {e}") from e
+
+    def dumps_record(self, obj: Any) -> bytes:
+        return self.dumps(obj)
+
+    def iter_records(self, f: BinaryIO) -> Iterator[Tuple[Any, int]]:
+        import msgpack
+
+        # The records are concatenated; a truncated last record is never yielded.
+        start = f.tell()
+        unpacker = msgpack.Unpacker(f, raw=False, strict_map_key=False)
+        try:
+            for record in unpacker:
+                yield record, start + unpacker.tell()
+        except (ValueError, msgpack.UnpackException):
+            return
+
+
+SERIALIZERS: Dict[str, Serializer] = {}
+
+
+def register_serializer(serializer: Serializer) -> Serializer:
+    """
+    Register a serializer under its name, replacing any serializer with the same name.
+
+    :param serializer: The serializer to register.
+    :type serializer: Serializer
+
+    :return: The registered serializer.
+    :rtype: Serializer
+    """
+    if not serializer.NAME:
+        raise ValueError("The serializer must have a NAME.")
+    SERIALIZERS[serializer.NAME] = serializer
+    return serializer
+
+
+for _serializer in (JsonSerializer(), CompactJsonSerializer(), OrjsonSerializer(), MsgpackSerializer()):
+    register_serializer(_serializer)
+
+
+def get_serializer(serializer: Union[str, Serializer]) -> Serializer:
+    """
+    Get a serializer from the registry. If the serializer is not available because its dependencies are not
+    installed, its fallback is returned instead with a warning.
+
+    :param serializer: The name of a registered serializer or a serializer instance.
+    :type serializer: Union[str, Serializer]
+
+    :return: The serializer.
+    :rtype: Serializer
+
+    :raises ValueError: If the serializer is not registered.
+    """
+    if isinstance(serializer, str):
+        if serializer not in SERIALIZERS:
+            raise ValueError(f"Unknown serializer '{serializer}'. Available serializers: {list(SERIALIZERS)}.")
+        serializer = SERIALIZERS[serializer]
+    if serializer.is_available():
+        return serializer
+    if serializer.FALLBACK is None:
+        raise ValueError(f"The serializer '{serializer.NAME}' is not available.")
+    warnings.warn(f"The serializer '{serializer.NAME}' is not available, using '{serializer.FALLBACK}' instead.")
+    return get_serializer(serializer.FALLBACK)
+
+
+def detect_serializer(raw: bytes, path: Optional[Union[str, Path]] = None) -> Serializer:
+    """
+    Detect the serializer of a file content from its first bytes, or from the suffix of its path if the content
+    is not recognized.
+
+    :param raw: The content of the file.
+    :type raw: bytes
+    :param path: The path of the file.
+    :type path: Optional[Union[str, Path]]
+
+    :return: The serializer able to read the content.
+    :rtype: Serializer
+    """
+    head = raw[:1]
+    if head in (b"{", b"[") or raw[:64].lstrip()[:1] in (b"{", b"["):
+        return SERIALIZERS["json"]
+    if head and (0x80 <= head[0] <= 0x8F or head[0] in (0xDE, 0xDF)):  # msgpack map headers
+        return SERIALIZERS["msgpack"]
+    if path is not None:
+        suffix = Path(path).suffix
+        for serializer in SERIALIZERS.values():
+            if serializer.FILE_SUFFIX == suffix:
+                return serializer
+    return SERIALIZERS["json"]
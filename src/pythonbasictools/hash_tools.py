@@ -1,15 +1,474 @@
 import hashlib
 import json
+import sys
+from typing import Any, Dict, Hashable, Iterable, List, Optional, Tuple, Union
 
+# The canonical encoding is the one of ``json.dumps(obj, sort_keys=True, separators=(",", ":"), default=str)``, so
+# the hashes of the JSON data are the same as before it was streamed. The JSON text is ASCII and never holds a NUL
+# byte, so the buffers are framed by NUL bytes and cannot be confused with it.
+_encode_str = json.encoder.encode_basestring_ascii  # type: ignore
+_encode_json = json.JSONEncoder(sort_keys=True, separators=(",", ":")).encode
+_FLUSH_SIZE = 4096
+_XXHASH_ALGORITHMS = ("xxh32", "xxh64", "xxh3_64", "xxh3_128", "xxh128")
 
-def hash_dict(d: dict) -> str:
+
+def _xxhash():
+    try:
+        import xxhash
+    except ImportError as e:
+        raise ImportError("xxhash is required for the xxh* hash algorithms: pip install xxhash") from e
+    return xxhash
+
+
+def fast_algorithm() -> str:
+    """Get the fastest available algorithm: ``xxh3_128`` if :mod:`xxhash` is installed, else ``blake2b``."""
+    try:
+        _xxhash()
+    except ImportError:
+        return "blake2b"
+    return "xxh3_128"
+
+
+def new_hash(algorithm: str = "sha256"):
+    """
+    Create a hash object of an algorithm of :mod:`hashlib`, e.g. ``sha256`` or ``blake2b``, or of :mod:`xxhash`, e.g.
+    ``xxh3_128``, which is much faster but not cryptographic. ``fast`` is the algorithm given by
+    :func:`fast_algorithm`.
+
+    :raises ValueError: If the algorithm is unknown or has a variable digest length, like ``shake_128``.
+    :raises ImportError: If a :mod:`xxhash` algorithm is asked but :mod:`xxhash` is not installed.
     """
-    Hash a dictionary using the SHA256 algorithm.
+    if algorithm == "fast":
+        algorithm = fast_algorithm()
+    if algorithm in _XXHASH_ALGORITHMS:
+        return getattr(_xxhash(), algorithm)()
+    if algorithm.startswith("shake_"):
+        raise ValueError(f"The hash algorithm {algorithm!r} has a variable digest length.")
+    try:
+        return hashlib.new(algorithm)
+    except ValueError:
+        raise ValueError(f"Unknown hash algorithm {algorithm!r}.") from None
+
+
+def _float_str(value: float) -> str:
+    if value != value:
+        return "NaN"
+    if value == float("inf"):
+        return "Infinity"
+    if value == -float("inf"):
+        return "-Infinity"
+    return float.__repr__(value)
+
+
+def _encode_json_or_none(obj: Any) -> Optional[str]:
+    # The JSON data are encoded at once by the C encoder of json, the others raise a TypeError.
+    try:
+        return _encode_json(obj)
+    except TypeError:
+        return None
+
+
+def _key_str(key: Any) -> str:
+    if isinstance(key, str):
+        return key
+    if key is True:
+        return "true"
+    if key is False:
+        return "false"
+    if key is None:
+        return "null"
+    if isinstance(key, int):
+        return int.__repr__(key)
+    if isinstance(key, float):
+        return _float_str(key)
+    raise TypeError(f"keys must be str, int, float, bool or None, not {key.__class__.__name__}")
+
+
+class CanonicalHasher:
+    """
+    Hash objects by feeding their canonical encoding to a hash incrementally, without building it in memory. The
+    encoding of the JSON data is their sorted compact JSON text, the buffers, e.g. NumPy arrays and bytes, are
+    encoded by their format, shape and raw memory, and the other objects by the JSON text of their string.
+
+    :Example:
+    >>> CanonicalHasher("blake2b").update({"lr": 1e-3, "weights": np.zeros((1000, 1000))}).hexdigest()
+
+    :param algorithm: The hash algorithm, see :func:`new_hash`. Default is ``sha256``.
+    :type algorithm: str
+    :param memo: The encodings of the JSON containers by id, shared by the hashers of objects sharing containers so
+        each of them is encoded once, see :func:`hash_dicts`. The containers must not be modified while the memo is
+        used. If None, nothing is memoized. Default is None.
+    :type memo: Optional[Dict[int, Tuple[Any, Optional[str]]]]
+    """
+
+    def __init__(self, algorithm: str = "sha256", memo: Optional[Dict[int, Tuple[Any, Optional[str]]]] = None):
+        self.algorithm = algorithm
+        self.memo = memo
+        self._hash = new_hash(algorithm)
+        self._parts: List[str] = []
+        self._skip_chunk = False
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}(algorithm={self.algorithm!r})"
+
+    def update(self, obj: Any) -> "CanonicalHasher":
+        """Feed the canonical encoding of an object to the hash."""
+        self._encode(obj)
+        self._flush()
+        return self
+
+    def digest(self) -> bytes:
+        self._flush()
+        return self._hash.digest()
+
+    def hexdigest(self) -> str:
+        self._flush()
+        return self._hash.hexdigest()
+
+    def _flush(self):
+        if self._parts:
+            self._hash.update("".join(self._parts).encode("ascii"))
+            self._parts.clear()
+
+    def _write(self, part: str):
+        self._parts.append(part)
+        if len(self._parts) >= _FLUSH_SIZE:
+            self._flush()
+
+    def _encode(self, obj: Any):
+        # The types are checked in the order of the json encoder so the subclasses are encoded the same way.
+        if isinstance(obj, str):
+            self._write(_encode_str(obj))
+        elif obj is None:
+            self._write("null")
+        elif obj is True:
+            self._write("true")
+        elif obj is False:
+            self._write("false")
+        elif isinstance(obj, int):
+            self._write(int.__repr__(obj))
+        elif isinstance(obj, float):
+            self._write(_float_str(obj))
+        elif isinstance(obj, (list, tuple, dict)):
+            if self.memo is None:
+                # The C encoder of json is tried first since it is much faster, and the container is streamed only
+                # if it holds objects that are not JSON data.
+                text = _encode_json_or_none(obj)
+                if text is None:
+                    self._stream_json(obj)
+                else:
+                    self._write(text)
+                return
+            text = self._memo_text(obj)
+            if text is not None:
+                self._write(text)
+            elif isinstance(obj, dict):
+                self._encode_dict(obj)
+            else:
+                self._encode_list(obj)
+        elif isinstance(obj, _SubtreeDigest):
+            self._write_header("merkle", obj.algorithm, (), len(obj.digest))
+            self._hash.update(obj.digest)
+        elif not self._encode_buffer(obj):
+            self._write(_encode_str(str(obj)))
+
+    def _stream_json(self, obj: Union[list, tuple, dict]):
+        # The chunks of the pure-Python json encoder are streamed to the hash. The objects that are not JSON data are
+        # handed to _encode_default as they come, so the container is encoded in a single pass whatever it holds.
+        encoder = json.JSONEncoder(sort_keys=True, separators=(",", ":"), default=self._encode_default)
+        for chunk in encoder.iterencode(obj):
+            if self._skip_chunk:
+                self._skip_chunk = False
+            else:
+                self._write(chunk)
+
+    def _encode_default(self, obj: Any) -> str:
+        # The object is encoded in place, after the chunks preceding it, then the encoding of the placeholder
+        # returned to the json encoder, which is its next chunk, is skipped.
+        self._encode(obj)
+        self._skip_chunk = True
+        return ""
+
+    def _memo_text(self, obj: Union[list, tuple, dict]) -> Optional[str]:
+        # The text of a container is built from the memoized texts of its children, so the children shared with
+        # other containers are encoded once. The text is None if the container holds objects that are not JSON data.
+        entry = self.memo.get(id(obj))  # type: ignore
+        if entry is not None:
+            return entry[1]
+        values = obj.values() if isinstance(obj, dict) else obj
+        if any(isinstance(value, (list, tuple, dict)) for value in values):
+            text = self._compose_text(obj)
+        else:
+            text = _encode_json_or_none(obj)
+        # The container is kept in the memo so its id is not reused by another object.
+        self.memo[id(obj)] = (obj, text)  # type: ignore
+        return text
+
+    def _compose_text(self, obj: Union[list, tuple, dict]) -> Optional[str]:
+        is_dict = isinstance(obj, dict)
+        parts: List[str] = []
+        for key, value in sorted(obj.items()) if is_dict else enumerate(obj):  # type: ignore
+            value_type = type(value)
+            if value_type is str:
+                value_text = _encode_str(value)
+            elif value_type is int:
+                value_text = int.__repr__(value)
+            elif value_type is float:
+                value_text = _float_str(value)
+            elif isinstance(value, (list, tuple, dict)):
+                value_text = self._memo_text(value)
+            else:
+                value_text = _encode_json_or_none(value)
+            if value_text is None:
+                return None
+            parts.append(f"{_encode_str(_key_str(key))}:{value_text}" if is_dict else value_text)
+        return "{" + ",".join(parts) + "}" if is_dict else "[" + ",".join(parts) + "]"
+
+    def _encode_list(self, obj: Union[list, tuple]):
+        self._write("[")
+        for i, item in enumerate(obj):
+            if i:
+                self._write(",")
+            self._encode(item)
+        self._write("]")
+
+    def _encode_dict(self, obj: dict):
+        self._write("{")
+        for i, (key, value) in enumerate(sorted(obj.items())):
+            if i:
+                self._write(",")
+            self._write(_encode_str(_key_str(key)))
+            self._write(":")
+            self._encode(value)
+        self._write("}")
+
+    def _write_header(self, kind: str, fmt: str, shape, nbytes: int):
+        self._flush()
+        self._hash.update(f"\0{kind}:{fmt}:{list(shape)}:{nbytes}\0".encode("ascii"))
+
+    def _encode_buffer(self, obj: Any) -> bool:
+        np = sys.modules.get("numpy")
+        if np is not None:
+            if isinstance(obj, np.generic):
+                # The NumPy scalars are hashed by their string, like with json.
+                return False
+            if isinstance(obj, np.ndarray):
+                if obj.dtype.hasobject:
+                    self._write_header("ndarray", obj.dtype.str, obj.shape, 0)
+                    self._encode(obj.tolist())
+                else:
+                    obj = np.ascontiguousarray(obj)
+                    self._write_header("ndarray", obj.dtype.str, obj.shape, obj.nbytes)
+                    self._hash.update(obj.reshape(-1).view(np.uint8))
+                return True
+        try:
+            view = memoryview(obj)
+        except TypeError:
+            return False
+        self._write_header("buffer", view.format, view.shape or (), view.nbytes)
+        self._hash.update(view if view.c_contiguous else view.tobytes())
+        return True
+
+
+def hash_object(obj: Any, algorithm: str = "sha256") -> str:
+    """
+    Hash an object with :class:`CanonicalHasher`.
+
+    :param obj: The object to hash.
+    :type obj: Any
+    :param algorithm: The hash algorithm, see :func:`new_hash`. Default is ``sha256``.
+    :type algorithm: str
+    :return: The hexadecimal digest.
+    :rtype: str
+    """
+    return CanonicalHasher(algorithm).update(obj).hexdigest()
+
+
+def hash_dict(d: dict, algorithm: str = "sha256") -> str:
+    """
+    Hash a dictionary, by default with the SHA256 algorithm.
+
+    The dictionary is hashed as its sorted compact JSON text, whose objects that are not JSON serializable are
+    converted to strings, except the NumPy arrays and the other buffers, e.g. bytes, that are hashed by their raw
+    memory. The text is streamed to the hash, not built in memory. See :class:`CanonicalHasher`.
 
     Args:
         d (dict): The dictionary to hash.
+        algorithm (str): The hash algorithm, see :func:`new_hash`. Default is ``sha256``.
 
     Returns:
         str: The hash of the dictionary.
     """
-    return hashlib.sha256(json.dumps(d, sort_keys=True, separators=(",", ":"), default=str).encode()).hexdigest()
+    return hash_object(d, algorithm)
+
+
+def hash_args(args: tuple, kwargs: dict, algorithm: str = "sha256") -> str:
+    """
+    Hash the arguments and keyword arguments of a call with :func:`hash_dict`.
+
+    Args:
+        args (tuple): The arguments.
+        kwargs (dict): The keyword arguments.
+        algorithm (str): The hash algorithm, see :func:`new_hash`. Default is ``sha256``.
+
+    Returns:
+        str: The hash of the arguments.
+    """
+    return hash_dict({"args": list(args), "kwargs": kwargs}, algorithm)
+
+
+def hash_dicts(dicts: Iterable[dict], algorithm: str = "sha256") -> List[str]:
+    """
+    Hash many dictionaries, giving the same hashes as :func:`hash_dict`. The containers shared by several
+    dictionaries, e.g. the nested dictionaries of a base config copied in every entry of a sweep with
+    ``{**base, "lr": lr}``, are encoded only once. The encoding of every container is kept during the call, so
+    :func:`hash_dict` is faster for dictionaries that do not share containers.
+
+    :Example:
+    >>> hash_dicts([{**base_config, "lr": lr} for lr in lrs])
+
+    Args:
+        dicts (Iterable[dict]): The dictionaries to hash. They must not be modified during the call.
+        algorithm (str): The hash algorithm, see :func:`new_hash`. Default is ``sha256``.
+
+    Returns:
+        List[str]: The hashes of the dictionaries.
+    """
+    memo: Dict[int, Tuple[Any, Optional[str]]] = {}
+    return [CanonicalHasher(algorithm, memo=memo).update(d).hexdigest() for d in dicts]
+
+
+class _SubtreeDigest:
+    """Stand-in for a container in the encoding of its parent in :func:`merkle_hash`."""
+
+    __slots__ = ("algorithm", "digest")
+
+    def __init__(self, algorithm: str, digest: bytes):
+        self.algorithm = algorithm
+        self.digest = digest
+
+
+class FrozenDict(dict):
+    """
+    Immutable dictionary whose nested dictionaries and lists are frozen, see :func:`freeze`, and which caches its
+    digest computed by :func:`merkle_hash`. It is a :class:`dict`, so it is hashed by :func:`hash_dict` like the
+    dictionary it freezes. The arrays it holds are not copied: they must not be modified either.
+
+    :Example:
+    >>> config = FrozenDict(base_config)
+    >>> merkle_hash(config)  # Every sub-tree is hashed once.
+    >>> merkle_hash(config.set(("model", "depth"), 8))  # Only the path to the changed leaf is hashed again.
+    """
+
+    __slots__ = ("_digests",)
+
+    def __init__(self, *args, **kwargs):
+        super().__init__((key, freeze(value)) for key, value in dict(*args, **kwargs).items())
+        self._digests: Dict[str, bytes] = {}
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}({super().__repr__()})"
+
+    def __reduce__(self):
+        return self.__class__, (dict(self),)
+
+    def _immutable(self, *args, **kwargs):
+        raise TypeError(f"{self.__class__.__name__} is immutable, use set to get a modified copy.")
+
+    __setitem__ = __delitem__ = __ior__ = clear = pop = popitem = setdefault = update = _immutable  # type: ignore
+
+    def set(self, path: Union[Hashable, Tuple[Hashable, ...]], value: Any) -> "FrozenDict":
+        """
+        Get a copy with a value set at a key, or at a path of keys in the nested dictionaries. The sub-trees off the
+        path are shared with this dictionary, along with their cached digests.
+
+        :param path: The key, or the tuple of the keys from this dictionary to the value.
+        :type path: Union[Hashable, Tuple[Hashable, ...]]
+        :param value: The new value.
+        :type value: Any
+        :return: The modified copy.
+        :rtype: FrozenDict
+
+        :raises TypeError: If a key of the path, except the last, is not a dictionary.
+        """
+        keys = path if isinstance(path, tuple) else (path,)
+        if not keys:
+            raise ValueError("The path must have at least one key.")
+        nodes = [self]
+        for key in keys[:-1]:
+            node = nodes[-1].get(key, FrozenDict())
+            if not isinstance(node, dict):
+                raise TypeError(f"The value at {key!r} of the path {path!r} is not a dictionary.")
+            nodes.append(node)
+        for node, key in zip(reversed(nodes), reversed(keys)):
+            value = FrozenDict({**node, key: value})
+        return value
+
+
+class FrozenList(tuple):
+    """Immutable list of frozen items, see :func:`freeze`, which caches its digest computed by :func:`merkle_hash`."""
+
+    def __new__(cls, iterable: Iterable = ()):
+        frozen_list = super().__new__(cls, (freeze(item) for item in iterable))
+        frozen_list._digests = {}
+        return frozen_list
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}({list(self)!r})"
+
+    def __reduce__(self):
+        return self.__class__, (tuple(self),)
+
+
+def freeze(obj: Any) -> Any:
+    """
+    Convert the dictionaries to :class:`FrozenDict` and the lists and tuples to :class:`FrozenList`, recursively.
+    The frozen objects are returned as they are.
+    """
+    if isinstance(obj, (FrozenDict, FrozenList)):
+        return obj
+    if isinstance(obj, dict):
+        return FrozenDict(obj)
+    if isinstance(obj, (list, tuple)):
+        return FrozenList(obj)
+    return obj
+
+
+def _merkle_digest(obj: Any, algorithm: str) -> bytes:
+    digests = getattr(obj, "_digests", None) if isinstance(obj, (FrozenDict, FrozenList)) else None
+    if digests is not None and algorithm in digests:
+        return digests[algorithm]
+    if isinstance(obj, dict):
+        node: Any = {key: _merkle_child(value, algorithm) for key, value in obj.items()}
+    else:
+        node = [_merkle_child(item, algorithm) for item in obj]
+    digest = CanonicalHasher(algorithm).update(node).digest()
+    if digests is not None:
+        digests[algorithm] = digest
+    return digest
+
+
+def _merkle_child(obj: Any, algorithm: str) -> Any:
+    if isinstance(obj, (dict, list, tuple)):
+        return _SubtreeDigest(algorithm, _merkle_digest(obj, algorithm))
+    return obj
+
+
+def merkle_hash(obj: Any, algorithm: str = "sha256") -> str:
+    """
+    Hash an object as a Merkle tree: every dictionary, list and tuple is hashed from the canonical encoding of its
+    leaves, see :class:`CanonicalHasher`, and the digests of its children. The digests of the :class:`FrozenDict`
+    and :class:`FrozenList` are cached, so hashing a frozen config again is immediate and hashing a copy modified
+    with :meth:`FrozenDict.set` only hashes the path to the changed value. The hashes differ from the ones of
+    :func:`hash_dict`.
+
+    :param obj: The object to hash, usually frozen with :func:`freeze`.
+    :type obj: Any
+    :param algorithm: The hash algorithm, see :func:`new_hash`. Default is ``sha256``.
+    :type algorithm: str
+    :return: The hexadecimal digest.
+    :rtype: str
+    """
+    if isinstance(obj, (dict, list, tuple)):
+        return _merkle_digest(obj, algorithm).hex()
+    return hash_object(obj, algorithm)
@@ -1,4 +1,8 @@
 import logging
+import os
+import threading
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from typing import Dict, List, Optional
 
 
 def logs_file_setup(file: str, level=logging.INFO, root_logs_dir: str = "./", add_stdout: bool = True):
@@ -34,3 +38,191 @@ def logs_file_setup(file: str, level=logging.INFO, root_logs_dir: str = "./", ad
         logging.getLogger().addHandler(sh)
     logging.info(f"Logs file at: {logs_file}\n")
     return logs_file
+
+
+class BatchingQueueHandler(QueueHandler):
+    """
+    Queue handler sending the records of a worker process to the parent in batches instead of one at a time, which
+    makes far fewer writes to the pipe of the queue when the worker logs a lot. The records are formatted in the worker,
+    so their arguments and exceptions are not pickled. The batch is sent when it holds ``batch_size`` records, when a
+    record of at least ``flush_level`` is logged, every ``flush_interval`` seconds, on :meth:`flush` and when the
+    handler is closed. The batches are lists of records, handled by :class:`BatchingQueueListener`.
+
+    :param queue: The queue to the parent process.
+    :type queue: multiprocessing.Queue
+    :param batch_size: The maximum number of records in a batch. Default is 64.
+    :type batch_size: int
+    :param flush_interval: The maximum delay in seconds before a record is sent. Default is 0.5.
+    :type flush_interval: float
+    :param flush_level: The records of at least this level are sent immediately with the pending ones.
+        Default is ``logging.ERROR``.
+    :type flush_level: int
+    """
+
+    def __init__(self, queue, batch_size: int = 64, flush_interval: float = 0.5, flush_level: int = logging.ERROR):
+        super().__init__(queue)
+        if batch_size < 1:
+            raise ValueError("The batch size must be greater or equal than 1.")
+        if flush_interval <= 0:
+            raise ValueError("The flush interval must be greater than 0.")
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.flush_level = flush_level
+        self._buffer: List[logging.LogRecord] = []
+        self._pid = os.getpid()
+        self._stop_event = threading.Event()
+        self._flusher: Optional[threading.Thread] = None
+
+    def _check_process(self):
+        # A forked child gets a copy of the pending records of its parent, which are the parent's to send, but not the
+        # thread flushing them, so the thread is started by the process logging.
+        if self._pid != os.getpid():
+            self._pid = os.getpid()
+            self._buffer = []
+            self._flusher = None
+        if self._flusher is None:
+            self._flusher = threading.Thread(target=self._run_flusher, name="BatchingQueueHandler", daemon=True)
+            self._flusher.start()
+
+    def _run_flusher(self):
+        while not self._stop_event.wait(self.flush_interval):
+            self.flush()
+
+    def emit(self, record: logging.LogRecord):
+        try:
+            record = self.prepare(record)
+        except Exception:
+            self.handleError(record)
+            return
+        with self.lock:
+            self._check_process()
+            self._buffer.append(record)
+            if len(self._buffer) >= self.batch_size or record.levelno >= self.flush_level:
+                self._send()
+
+    def _send(self):
+        if self._pid != os.getpid():
+            self._buffer = []
+        batch, self._buffer = self._buffer, []
+        if batch:
+            try:
+                self.enqueue(batch)  # type: ignore
+            except Exception:
+                self.handleError(batch[-1])
+
+    def flush(self):
+        """Send the pending records."""
+        with self.lock:
+            self._send()
+
+    def close(self):
+        self._stop_event.set()
+        self.flush()
+        super().close()
+
+
+class BatchingQueueListener(QueueListener):
+    """
+    Queue listener handling the batches of records of :class:`BatchingQueueHandler` as well as single records.
+    The records are only handled by the handlers whose level they reach.
+    """
+
+    def __init__(self, queue, *handlers: logging.Handler):
+        super().__init__(queue, *handlers, respect_handler_level=True)
+
+    def handle(self, record):
+        if isinstance(record, list):
+            for item in record:
+                super().handle(item)
+        else:
+            super().handle(record)
+
+
+class ProcessFileHandler(logging.Handler):
+    """
+    Handler writing the records of each process to its own rotating file, e.g. in the parent process to keep the logs
+    of every worker apart.
+
+    :param log_dir: The directory of the files.
+    :type log_dir: str
+    :param filename: The name of the file of a process, formatted with the attributes of the records, e.g.
+        ``processName`` and ``process``. Default is "{processName}-{process}.log".
+    :type filename: str
+    :param max_bytes: The size of a file after which it is rotated. If 0, the files are never rotated. Default is 0.
+    :type max_bytes: int
+    :param backup_count: The number of rotated files kept per process. Default is 0.
+    :type backup_count: int
+    :param level: The level of the handler. Default is ``logging.NOTSET``.
+    :type level: int
+    """
+
+    def __init__(
+        self,
+        log_dir: str,
+        filename: str = "{processName}-{process}.log",
+        max_bytes: int = 0,
+        backup_count: int = 0,
+        level: int = logging.NOTSET,
+    ):
+        super().__init__(level)
+        self.log_dir = log_dir
+        self.filename = filename
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self._handlers: Dict[str, RotatingFileHandler] = {}
+        self._pids: Dict[str, Optional[int]] = {}  # The process that last wrote to each file
+        os.makedirs(log_dir, exist_ok=True)
+
+    def _get_handler(self, record: logging.LogRecord) -> RotatingFileHandler:
+        path = os.path.join(self.log_dir, self.filename.format(**record.__dict__))
+        handler = self._handlers.get(path)
+        if handler is None:
+            self._close_exited()
+            handler = RotatingFileHandler(path, maxBytes=self.max_bytes, backupCount=self.backup_count)
+            handler.setFormatter(self.formatter)
+            self._handlers[path] = handler
+        self._pids[path] = record.process
+        return handler
+
+    def _close_exited(self):
+        """
+        Close the files of the processes that exited, e.g. the workers replaced because of ``maxtasksperchild``,
+        so the open files do not pile up. A file is opened again in append mode if a record of it comes later.
+        """
+        import psutil
+
+        for path, pid in list(self._pids.items()):
+            if pid is not None and not psutil.pid_exists(pid):
+                self._handlers.pop(path).close()
+                del self._pids[path]
+
+    def setFormatter(self, fmt: Optional[logging.Formatter]):
+        super().setFormatter(fmt)
+        for handler in self._handlers.values():
+            handler.setFormatter(fmt)
+
+    def emit(self, record: logging.LogRecord):
+        try:
+            self._get_handler(record).emit(record)
+        except Exception:
+            self.handleError(record)
+
+    def flush(self):
+        with self.lock:
+            for handler in self._handlers.values():
+                handler.flush()
+
+    def close(self):
+        with self.lock:
+            for handler in self._handlers.values():
+                handler.close()
+            self._handlers.clear()
+            self._pids.clear()
+        super().close()
+
+
+def flush_batching_handlers(logger: Optional[logging.Logger] = None):
+    """Send the pending records of the :class:`BatchingQueueHandler` of a logger, the root logger by default."""
+    for handler in (logger or logging.getLogger()).handlers:
+        if isinstance(handler, BatchingQueueHandler):
+            handler.flush()
@@ -1,33 +1,566 @@
+import asyncio
+import atexit
+import collections
+import concurrent.futures
+import functools
+import importlib
+import inspect
+import itertools
 import logging
+import math
 import multiprocessing
-from logging.handlers import QueueHandler, QueueListener
-from typing import Callable, Dict, List, Optional, Tuple
+import multiprocessing.util
+import os
+import pickle
+import queue
+import signal
+import threading
+import time
+import weakref
+from logging.handlers import QueueHandler
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Tuple,
+    Union,
+)
 
+from .decorators import retry_delay, try_func_n_times
+from .logging_tools import (
+    BatchingQueueHandler,
+    BatchingQueueListener,
+    ProcessFileHandler,
+    flush_batching_handlers,
+)
+from .profiling_tools import ProfiledFunc, RunProfile
+from .scheduling_tools import TaskCostModel, func_name, longest_first_order
+from .shared_memory_tools import (
+    SharedArena,
+    SharedMemoryFunc,
+    detach_segments,
+    receive_result,
+    unwrap_shared,
+)
 
-def worker_init(q):
+if TYPE_CHECKING:
+    from .experiment_utils.checkpoint import TaskCheckpoint
+
+
+MULTIPROCESS_LOG_FORMAT = "%(levelname)s: %(asctime)s - %(process)s - %(message)s"
+
+# The handlers of the listeners of this process, which forked workers must not inherit.
+_LISTENER_HANDLERS: "weakref.WeakSet[logging.Handler]" = weakref.WeakSet()
+
+
+def worker_init(q, level: int = logging.INFO, batch_size: int = 1, flush_interval: float = 0.5):
+    """
+    Send the log records of a worker process to the queue of :func:`multiprocess_logger_init`.
+
+    :param q: The queue to the parent process.
+    :type q: multiprocessing.Queue
+    :param level: The level of the root logger of the worker. Default to ``logging.INFO``.
+    :type level: int
+    :param batch_size: If greater than 1, the records are sent in batches of up to this number of records by a
+        :class:`pythonbasictools.logging_tools.BatchingQueueHandler`. Default to 1.
+    :type batch_size: int
+    :param flush_interval: The maximum delay in seconds before a batched record is sent. Default to 0.5.
+    :type flush_interval: float
+    """
     # all records from worker processes go to qh and then into q
-    qh = QueueHandler(q)
+    if batch_size > 1:
+        qh: QueueHandler = BatchingQueueHandler(q, batch_size=batch_size, flush_interval=flush_interval)
+        # The pending records are sent when the worker exits normally.
+        multiprocessing.util.Finalize(qh, qh.close, exitpriority=10)
+    else:
+        qh = QueueHandler(q)
     logger = logging.getLogger()
-    logger.setLevel(logging.INFO)
+    for handler in list(logger.handlers):
+        if handler in _LISTENER_HANDLERS:
+            # A worker forked while a listener runs would otherwise write its records twice.
+            logger.removeHandler(handler)
+    logger.setLevel(level)
     logger.addHandler(qh)
 
 
-def multiprocess_logger_init():
+def multiprocess_logger_init(
+    log_dir: Optional[str] = None,
+    max_bytes: int = 0,
+    backup_count: int = 0,
+    stream: bool = True,
+    fmt: str = MULTIPROCESS_LOG_FORMAT,
+):
+    """
+    Start a listener handling in this process the log records sent by the workers initialized with
+    :func:`worker_init`, one at a time or in batches.
+
+    :param log_dir: If given, the records of every process are also written to their own rotating file in this
+        directory, see :class:`pythonbasictools.logging_tools.ProcessFileHandler`. Default to None.
+    :type log_dir: Optional[str]
+    :param max_bytes: The size of a file after which it is rotated. If 0, the files are never rotated. Default to 0.
+    :type max_bytes: int
+    :param backup_count: The number of rotated files kept per process. Default to 0.
+    :type backup_count: int
+    :param stream: If True, the records are written to stderr. Default to True.
+    :type stream: bool
+    :param fmt: The format of the records. Default to :data:`MULTIPROCESS_LOG_FORMAT`.
+    :type fmt: str
+
+    :return: The started listener and the queue to give to :func:`worker_init`.
+    """
     q = multiprocessing.Queue()
-    # this is the handler for all log records
-    handler = logging.StreamHandler()
-    handler.setFormatter(logging.Formatter("%(levelname)s: %(asctime)s - %(process)s - %(message)s"))
+    # these are the handlers for all log records
+    handlers: List[logging.Handler] = []
+    if stream:
+        handlers.append(logging.StreamHandler())
+    if log_dir is not None:
+        handlers.append(ProcessFileHandler(log_dir, max_bytes=max_bytes, backup_count=backup_count))
+    for handler in handlers:
+        handler.setFormatter(logging.Formatter(fmt))
+        _LISTENER_HANDLERS.add(handler)
 
-    # ql gets records from the queue and sends them to the handler
-    ql = QueueListener(q, handler)
+    # ql gets records from the queue and sends them to the handlers
+    ql = BatchingQueueListener(q, *handlers)
     ql.start()
 
-    # add the handler to the logger so records from this process are handled
-    logging.getLogger().addHandler(handler)
+    # add the handlers to the logger so records from this process are handled
+    for handler in handlers:
+        logging.getLogger().addHandler(handler)
 
     return ql, q
 
 
+def get_nb_workers(nb_workers: Optional[int] = -2) -> int:
+    """
+    Resolve a number of workers given with the conventions of :func:`apply_func_multiprocess`.
+
+    :param nb_workers: The number of workers. If -1, use all the logical available CPUs. If -2, use all the
+        available CPUs. If 0, use the main process. If greater than 0, use the specified number of workers.
+        If None, same as -2.
+    :type nb_workers: Optional[int]
+
+    :return: The number of workers.
+    :rtype: int
+
+    :raises ValueError: If the number of workers is less than -2.
+    """
+    import psutil
+
+    if nb_workers is None:
+        nb_workers = -2
+
+    if nb_workers == -1:
+        nb_workers = psutil.cpu_count(logical=True)
+    elif nb_workers == -2:
+        # The number of physical cores is unknown on some platforms.
+        nb_workers = psutil.cpu_count(logical=False) or psutil.cpu_count(logical=True)
+
+    if nb_workers < 0:
+        raise ValueError("The number of workers must be greater or equal than 0.")
+    return nb_workers
+
+
+def _worker_pool_init(q, initializers: List[Union[str, Callable]], logging_options: Dict):
+    worker_init(q, **logging_options)
+    for initializer in initializers:
+        if isinstance(initializer, str):
+            importlib.import_module(initializer)
+        else:
+            initializer()
+
+
+class WorkerPool:
+    """
+    Long-lived pool of worker processes that can be reused by several calls of :func:`apply_func_multiprocess` and
+    :func:`iter_func_multiprocess`, so the workers are started, and their heavy imports done, only once. The pool
+    also owns the logging queue of its workers.
+
+    :Example:
+    >>> with WorkerPool(nb_workers=8, initializers=["torch", "pandas"]) as pool:
+    ...     results = apply_func_multiprocess(func, args, pool=pool)
+    ...     other_results = apply_func_multiprocess(other_func, other_args, pool=pool)
+
+    :param nb_workers: The number of workers, see :func:`apply_func_multiprocess`. Must not resolve to 0.
+        Default to -2.
+    :type nb_workers: int
+    :param initializers: Warm-up initializers run in every worker when it starts, before its first task: either
+        names of modules to import or picklable callables without arguments. Default to None.
+    :type initializers: Optional[List[Union[str, Callable]]]
+    :param context: The start method of the workers, e.g. "fork" or "spawn". Default to the start method of
+        :mod:`multiprocessing`.
+    :type context: Optional[str]
+    :param maxtasksperchild: The number of chunks of tasks a worker runs before being replaced by a fresh one, which
+        bounds the memory leaked by the tasks. If None, the workers live as long as the pool. Default to None.
+    :type maxtasksperchild: Optional[int]
+    :param logging_options: The options of the logging of the workers: "level", "batch_size" and "flush_interval"
+        are given to :func:`worker_init`, the other ones to :func:`multiprocess_logger_init`. The records of the
+        workers are sent in batches of 64 by default, and the pending ones are sent after every chunk of tasks.
+        Default to None.
+    :type logging_options: Optional[Dict]
+
+    :raises ValueError: If the number of workers resolves to 0.
+    """
+
+    WORKER_LOGGING_OPTIONS = ("level", "batch_size", "flush_interval")
+
+    def __init__(
+        self,
+        nb_workers: int = -2,
+        initializers: Optional[List[Union[str, Callable]]] = None,
+        context: Optional[str] = None,
+        maxtasksperchild: Optional[int] = None,
+        logging_options: Optional[Dict] = None,
+    ):
+        self.nb_workers = get_nb_workers(nb_workers)
+        if self.nb_workers == 0:
+            raise ValueError("A WorkerPool needs at least one worker.")
+        self.initializers = list(initializers or [])
+        if os.name == "posix":
+            from multiprocessing import resource_tracker
+
+            # Started before the workers so they share it. A tracker of their own would unlink the shared memory
+            # segments they attached when they exit, see :mod:`pythonbasictools.shared_memory_tools`.
+            resource_tracker.ensure_running()
+        listener_options = dict(logging_options or {})
+        worker_options = {"batch_size": 64}
+        for key in self.WORKER_LOGGING_OPTIONS:
+            if key in listener_options:
+                worker_options[key] = listener_options.pop(key)
+        self._q_listener, q = multiprocess_logger_init(**listener_options)
+        self.maxtasksperchild = maxtasksperchild
+        self._pool = multiprocessing.get_context(context).Pool(
+            self.nb_workers, _worker_pool_init, (q, self.initializers, worker_options), maxtasksperchild
+        )
+        self._closed = False
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}(nb_workers={self.nb_workers}, closed={self.closed})"
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+    def apply_async(self, func, args=(), kwds=None, callback=None, error_callback=None):
+        """See :meth:`multiprocessing.pool.Pool.apply_async`."""
+        if self._closed:
+            raise ValueError("The pool is closed.")
+        return self._pool.apply_async(func, args, kwds or {}, callback, error_callback)
+
+    @property
+    def shares_memory(self) -> bool:
+        """Whether the workers share the memory of the caller, in which case nothing is pickled."""
+        return False
+
+    def submit_chunk(self, func, chunk: List[Tuple[Tuple, Dict]], callback=None, error_callback=None):
+        """Submit a chunk of tasks. The result of the chunk is the list of the results and the time spent."""
+        return self.apply_async(_apply_chunk, (func, chunk), callback=callback, error_callback=error_callback)
+
+    def _stop_logging(self):
+        self._q_listener.stop()
+        for handler in self._q_listener.handlers:
+            logging.getLogger().removeHandler(handler)
+            handler.close()
+
+    def close(self):
+        """Wait for the submitted tasks to finish, then stop the workers."""
+        if self._closed:
+            return
+        self._closed = True
+        self._pool.close()
+        self._pool.join()
+        self._stop_logging()
+
+    def terminate(self):
+        """Stop the workers immediately, dropping the submitted tasks."""
+        if self._closed:
+            return
+        self._closed = True
+        self._pool.terminate()
+        self._pool.join()
+        self._stop_logging()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.terminate()
+
+
+class _FutureResult:
+    """Give a :class:`concurrent.futures.Future` the interface of :class:`multiprocessing.pool.AsyncResult`."""
+
+    def __init__(self, future: concurrent.futures.Future, callback=None, error_callback=None):
+        self._future = future
+        self._callbacks_done = threading.Event()
+        if callback is None and error_callback is None:
+            self._callbacks_done.set()
+        else:
+            future.add_done_callback(functools.partial(self._on_done, callback, error_callback))
+
+    def _on_done(self, callback, error_callback, future: concurrent.futures.Future):
+        try:
+            if future.cancelled():
+                return
+            error = future.exception()
+            if error is None:
+                if callback is not None:
+                    callback(future.result())
+            elif error_callback is not None:
+                error_callback(error)
+        finally:
+            self._callbacks_done.set()
+
+    def get(self, timeout: Optional[float] = None):
+        # Like multiprocessing, the result is only returned once the callbacks have run.
+        result = self._future.result(timeout)
+        self._callbacks_done.wait(timeout)
+        return result
+
+    def ready(self) -> bool:
+        return self._future.done()
+
+
+class ExecutorPool:
+    """
+    Adapt a :class:`concurrent.futures.Executor` to the interface of :class:`WorkerPool`, so it can run the tasks
+    of :func:`apply_func_multiprocess` and :func:`iter_func_multiprocess`.
+
+    :Example:
+    >>> with ExecutorPool(ThreadPoolExecutor(32), shutdown_executor=True) as pool:
+    ...     files = apply_func_multiprocess(download, urls, pool=pool)
+
+    :param executor: The executor running the tasks.
+    :type executor: concurrent.futures.Executor
+    :param nb_workers: The number of workers of the executor, used to size the chunks and the number of tasks in
+        flight. Default to the number of workers of the executor if it is known, otherwise to 1.
+    :type nb_workers: Optional[int]
+    :param shutdown_executor: If True, the executor is shut down when the pool is closed. Default to False.
+    :type shutdown_executor: bool
+    """
+
+    def __init__(
+        self,
+        executor: concurrent.futures.Executor,
+        nb_workers: Optional[int] = None,
+        shutdown_executor: bool = False,
+    ):
+        self.executor = executor
+        self.nb_workers = nb_workers or getattr(executor, "_max_workers", None) or 1
+        self.shutdown_executor = shutdown_executor
+        self._closed = False
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}({self.executor!r}, nb_workers={self.nb_workers}, closed={self.closed})"
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+    @property
+    def shares_memory(self) -> bool:
+        """See :attr:`WorkerPool.shares_memory`."""
+        return not isinstance(self.executor, concurrent.futures.ProcessPoolExecutor)
+
+    def apply_async(self, func, args=(), kwds=None, callback=None, error_callback=None) -> _FutureResult:
+        """Submit a task with the interface of :meth:`multiprocessing.pool.Pool.apply_async`."""
+        if self._closed:
+            raise ValueError("The pool is closed.")
+        future = self.executor.submit(func, *args, **(kwds or {}))
+        return _FutureResult(future, callback, error_callback)
+
+    def submit_chunk(self, func, chunk: List[Tuple[Tuple, Dict]], callback=None, error_callback=None):
+        """See :meth:`WorkerPool.submit_chunk`."""
+        return self.apply_async(_apply_chunk, (func, chunk), callback=callback, error_callback=error_callback)
+
+    def close(self):
+        """Wait for the submitted tasks to finish, then shut down the executor if the pool owns it."""
+        if self._closed:
+            return
+        self._closed = True
+        if self.shutdown_executor:
+            self.executor.shutdown(wait=True)
+
+    def terminate(self):
+        """Cancel the tasks not started yet and shut down the executor without waiting if the pool owns it."""
+        if self._closed:
+            return
+        self._closed = True
+        if self.shutdown_executor:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.terminate()
+
+
+class _EventLoopExecutor(concurrent.futures.Executor):
+    """Executor running the tasks in an event loop in a background thread, at most ``max_workers`` at once."""
+
+    def __init__(self, max_workers: int):
+        self._max_workers = max_workers
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name="EventLoopExecutor", daemon=True)
+        self._thread.start()
+        self._semaphore = self._run_in_loop(self._make_semaphore()).result()
+
+    def _run_in_loop(self, coro) -> concurrent.futures.Future:
+        return asyncio.run_coroutine_threadsafe(coro, self._loop)
+
+    async def _make_semaphore(self) -> asyncio.Semaphore:
+        # Before Python 3.10, the semaphore is bound to the running loop when it is created.
+        return asyncio.Semaphore(self._max_workers)
+
+    async def _run(self, func, args, kwds):
+        async with self._semaphore:
+            result = func(*args, **kwds)
+            if inspect.isawaitable(result):
+                result = await result
+            return result
+
+    def submit(self, func, *args, **kwds) -> concurrent.futures.Future:
+        return self._run_in_loop(self._run(func, args, kwds))
+
+    @staticmethod
+    def _other_tasks() -> List[asyncio.Task]:
+        return [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]
+
+    async def _cancel_all(self):
+        for task in self._other_tasks():
+            task.cancel()
+
+    async def _wait_all(self):
+        await asyncio.gather(*self._other_tasks(), return_exceptions=True)
+
+    def shutdown(self, wait: bool = True, *, cancel_futures: bool = False):
+        if self._loop.is_closed():
+            return
+        if cancel_futures:
+            self._run_in_loop(self._cancel_all()).result()
+        if wait:
+            self._run_in_loop(self._wait_all()).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop.close()
+
+
+class AsyncioPool(ExecutorPool):
+    """
+    Run the tasks in an event loop in a background thread, for I/O-bound coroutine functions. The tasks of a chunk
+    run concurrently and at most ``nb_workers`` chunks run at once. Plain functions are also accepted but block the
+    event loop while they run.
+
+    :Example:
+    >>> async def download(url):
+    ...     ...
+    >>> files = apply_func_multiprocess(download, [(url,) for url in urls], nb_workers=64, backend="asyncio")
+
+    :param nb_workers: The maximum number of chunks running at once, see :func:`apply_func_multiprocess`. Resolves
+        to at least 1. Default to -2.
+    :type nb_workers: int
+    """
+
+    def __init__(self, nb_workers: int = -2):
+        super().__init__(_EventLoopExecutor(max(1, get_nb_workers(nb_workers))), shutdown_executor=True)
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}(nb_workers={self.nb_workers}, closed={self.closed})"
+
+    def submit_chunk(self, func, chunk: List[Tuple[Tuple, Dict]], callback=None, error_callback=None):
+        return self.apply_async(_apply_chunk_async, (func, chunk), callback=callback, error_callback=error_callback)
+
+
+BACKENDS = ("process", "thread", "asyncio")
+# The backends falling back to the main process when there is no worker.
+_MAIN_PROCESS_BACKENDS = ("process", "thread")
+
+
+def _check_backend(backend: Union[str, concurrent.futures.Executor]):
+    if not isinstance(backend, concurrent.futures.Executor) and backend not in BACKENDS:
+        raise ValueError(
+            f"Unknown backend {backend!r}. Available backends: {BACKENDS} or a concurrent.futures.Executor."
+        )
+
+
+def _make_pool(
+    backend: Union[str, concurrent.futures.Executor], nb_workers: int, maxtasksperchild: Optional[int] = None
+):
+    _check_backend(backend)
+    if isinstance(backend, concurrent.futures.Executor):
+        return ExecutorPool(backend, nb_workers=nb_workers)
+    if backend == "process":
+        return WorkerPool(nb_workers, maxtasksperchild=maxtasksperchild)
+    if backend == "thread":
+        return ExecutorPool(concurrent.futures.ThreadPoolExecutor(nb_workers), shutdown_executor=True)
+    return AsyncioPool(nb_workers)
+
+
+_DEFAULT_POOL: Optional[WorkerPool] = None
+_DEFAULT_POOL_LOCK = threading.Lock()
+
+
+def get_default_pool(nb_workers: int = -2, **kwargs) -> WorkerPool:
+    """
+    Get the module-level pool used by ``apply_func_multiprocess(..., pool=True)``. The pool is created on the first
+    call with the given arguments, which are ignored afterwards until :func:`shutdown_default_pool` is called. The
+    pool is shut down when the interpreter exits.
+
+    :param nb_workers: The number of workers of the pool if it is created.
+    :type nb_workers: int
+    :param kwargs: The additional arguments of :class:`WorkerPool` if it is created.
+
+    :return: The default pool.
+    :rtype: WorkerPool
+    """
+    global _DEFAULT_POOL
+    with _DEFAULT_POOL_LOCK:
+        if _DEFAULT_POOL is None or _DEFAULT_POOL.closed:
+            _DEFAULT_POOL = WorkerPool(nb_workers, **kwargs)
+        return _DEFAULT_POOL
+
+
+@atexit.register
+def shutdown_default_pool(wait: bool = False):
+    """
+    Shut down the module-level pool if it exists.
+
+    :param wait: If True, wait for the submitted tasks to finish, otherwise stop the workers immediately.
+    :type wait: bool
+    """
+    global _DEFAULT_POOL
+    with _DEFAULT_POOL_LOCK:
+        pool, _DEFAULT_POOL = _DEFAULT_POOL, None
+    if pool is None:
+        return
+    if wait:
+        pool.close()
+    else:
+        pool.terminate()
+
+
+def _resolve_pool(pool: Optional[Union[WorkerPool, ExecutorPool, bool]], nb_workers):
+    if pool is None or pool is False:
+        return None
+    if pool is True:
+        return get_default_pool(nb_workers)
+    if pool.closed:
+        raise ValueError("The pool is closed.")
+    return pool
+
+
 def _make_callable_from_list(list_of_callable: Optional[List[Callable]] = None):
     """
     Make a callable from a list of callable.
@@ -54,6 +587,288 @@ def _make_callable_from_list(list_of_callable: Optional[List[Callable]] = None):
     return _callable
 
 
+_NO_ITEM = object()
+
+
+def _zip_args_kwargs(
+    iterable_of_args: Iterable[Tuple],
+    iterable_of_kwargs: Optional[Iterable[Dict]] = None,
+) -> Iterator[Tuple[Tuple, Dict]]:
+    """
+    Lazily pair the arguments with their keyword arguments.
+
+    :raises ValueError: If iterable_of_args and iterable_of_kwargs do not have the same length. Since the iterables
+        are consumed lazily, the error is raised when the shortest one is exhausted.
+    """
+    if iterable_of_kwargs is None:
+        for args in iterable_of_args:
+            yield args, {}
+        return
+    for args, kwds in itertools.zip_longest(iterable_of_args, iterable_of_kwargs, fillvalue=_NO_ITEM):
+        if args is _NO_ITEM or kwds is _NO_ITEM:
+            raise ValueError("The length of iterable_of_args and iterable_of_kwargs must be the same.")
+        yield args, kwds
+
+
+def _get_list_of_callbacks(kwargs: Dict) -> List[Callable]:
+    list_of_callbacks = kwargs.get("callbacks", [])
+    if not isinstance(list_of_callbacks, list):
+        list_of_callbacks = [list_of_callbacks]
+    return list(list_of_callbacks)
+
+
+def _iter_func_main_process(
+    func,
+    iterable_of_args: Iterable[Tuple],
+    iterable_of_kwargs: Optional[Iterable[Dict]] = None,
+    total: Optional[int] = None,
+    tqdm_options: Optional[Dict] = None,
+    on_result: Optional[Callable[[Tuple, Dict, Any], None]] = None,
+    **kwargs,
+) -> Iterator:
+    import tqdm
+
+    tqdm_options = tqdm_options or {}
+    callback = _make_callable_from_list(_get_list_of_callbacks(kwargs))
+    with tqdm.tqdm(
+        total=total,
+        desc=kwargs.get("desc", None),
+        unit=kwargs.get("unit", "it"),
+        disable=not kwargs.get("verbose", True),
+        **tqdm_options,
+    ) as pbar:
+        for args, kwds in itertools.starmap(unwrap_shared, _zip_args_kwargs(iterable_of_args, iterable_of_kwargs)):
+            result = func(*args, **kwds)
+            if on_result is not None:
+                on_result(args, kwds, result)
+            pbar.update()
+            callback(*args, **kwds)
+            yield result
+
+
+class _ChunkOutput(NamedTuple):
+    results: List
+    duration: float
+    durations: List[float]
+
+
+def _apply_chunk(func, chunk: List[Tuple[Tuple, Dict]]) -> _ChunkOutput:
+    """Apply the function to a chunk of tasks in a worker and measure the time spent by each task."""
+    results, durations = [], []
+    start = time.perf_counter()
+    try:
+        for args, kwds in chunk:
+            results.append(func(*args, **kwds))
+            end = time.perf_counter()
+            durations.append(end - start)
+            start = end
+    finally:
+        # The records of the chunk are queued before its result, so they are not lost in the batch of a worker that
+        # is terminated once the results are in.
+        flush_batching_handlers()
+        detach_segments()
+    return _ChunkOutput(results, sum(durations), durations)
+
+
+async def _apply_chunk_async(func, chunk: List[Tuple[Tuple, Dict]]) -> _ChunkOutput:
+    """Apply the function, a coroutine function or not, concurrently to a chunk of tasks in an event loop."""
+
+    async def _apply(args, kwds):
+        task_start = time.perf_counter()
+        result = func(*args, **kwds)
+        if inspect.isawaitable(result):
+            result = await result
+        return result, time.perf_counter() - task_start
+
+    start = time.perf_counter()
+    outputs = await asyncio.gather(*(_apply(args, kwds) for args, kwds in chunk))
+    duration = time.perf_counter() - start
+    return _ChunkOutput([result for result, _ in outputs], duration, [task_duration for _, task_duration in outputs])
+
+
+class TaskTimeoutError(TimeoutError):
+    """Raised when a task of :func:`apply_func_multiprocess` does not finish within its timeout."""
+
+
+class TaskError(Exception):
+    """Stand-in for an exception of a task that cannot be pickled, returned when ``return_exceptions`` is set."""
+
+
+def _call_with_alarm(func, args: Tuple, kwargs: Dict, timeout: float):
+    def _on_alarm(signum, frame):
+        raise TaskTimeoutError(f"The task did not finish within {timeout} seconds.")
+
+    previous_handler = signal.signal(signal.SIGALRM, _on_alarm)
+    signal.setitimer(signal.ITIMER_REAL, timeout)
+    try:
+        return func(*args, **kwargs)
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, previous_handler)
+
+
+def _call_in_thread(func, args: Tuple, kwargs: Dict, timeout: float):
+    outcome: Dict[str, Any] = {}
+
+    def _target():
+        try:
+            outcome["result"] = func(*args, **kwargs)
+        except BaseException as e:
+            outcome["error"] = e
+
+    thread = threading.Thread(target=_target, name="TaskRunner", daemon=True)
+    thread.start()
+    thread.join(timeout)
+    if thread.is_alive():
+        raise TaskTimeoutError(f"The task did not finish within {timeout} seconds.")
+    if "error" in outcome:
+        raise outcome["error"]
+    return outcome["result"]
+
+
+def _picklable_exception(error: Exception) -> Exception:
+    try:
+        return pickle.loads(pickle.dumps(error))
+    except Exception:
+        return TaskError(f"{type(error).__name__}: {error}")
+
+
+class TaskRunner:
+    """
+    Picklable wrapper running each task of :func:`apply_func_multiprocess` with a timeout and retries, and
+    optionally returning its exception instead of raising it.
+
+    The timeout interrupts the task with ``SIGALRM`` when it runs in the main thread of a process on POSIX, e.g. in
+    the workers of a :class:`WorkerPool`. Otherwise, the task runs in a helper thread which is abandoned when it times
+    out, since threads cannot be interrupted. Coroutine functions are awaited with :func:`asyncio.wait_for`. Note
+    that a task blocked in a C extension is only interrupted when it returns to the interpreter.
+
+    :param func: The function running a task.
+    :type func: Callable
+    :param timeout: The maximum duration in seconds of an attempt. If None, the attempts are not limited.
+    :type timeout: Optional[float]
+    :param retries: The number of retries after a failed attempt, including a timeout. The semantics are the ones of
+        :func:`pythonbasictools.decorators.try_func_n_times` with ``n=retries + 1``.
+    :type retries: int
+    :param retry_delay: The delay in seconds before the first retry.
+    :type retry_delay: float
+    :param retry_backoff: The factor multiplying the delay after each retry.
+    :type retry_backoff: float
+    :param return_exceptions: If True, the exception of the last attempt is returned as the result of the task.
+    :type return_exceptions: bool
+    """
+
+    def __init__(
+        self,
+        func,
+        timeout: Optional[float] = None,
+        retries: int = 0,
+        retry_delay: float = 0.1,
+        retry_backoff: float = 2.0,
+        return_exceptions: bool = False,
+    ):
+        if timeout is not None and timeout <= 0:
+            raise ValueError("The timeout must be greater than 0.")
+        if retries < 0:
+            raise ValueError("The number of retries must be greater or equal than 0.")
+        self.func = func
+        self.timeout = timeout
+        self.retries = retries
+        self.retry_delay = retry_delay
+        self.retry_backoff = retry_backoff
+        self.return_exceptions = return_exceptions
+
+    def _call_once(self, *args, **kwargs):
+        if self.timeout is None:
+            return self.func(*args, **kwargs)
+        if hasattr(signal, "setitimer") and threading.current_thread() is threading.main_thread():
+            return _call_with_alarm(self.func, args, kwargs, self.timeout)
+        return _call_in_thread(self.func, args, kwargs, self.timeout)
+
+    def __call__(self, *args, **kwargs):
+        if inspect.iscoroutinefunction(self.func):
+            return self._acall(*args, **kwargs)
+        call = try_func_n_times(self._call_once, n=self.retries + 1, delay=self.retry_delay, backoff=self.retry_backoff)
+        try:
+            return call(*args, **kwargs)
+        except Exception as e:
+            if not self.return_exceptions:
+                raise
+            return _picklable_exception(e)
+
+    async def _acall_once(self, *args, **kwargs):
+        try:
+            return await asyncio.wait_for(self.func(*args, **kwargs), self.timeout)
+        except asyncio.TimeoutError as e:
+            raise TaskTimeoutError(f"The task did not finish within {self.timeout} seconds.") from e
+
+    async def _acall(self, *args, **kwargs):
+        for i in range(self.retries + 1):
+            try:
+                return await self._acall_once(*args, **kwargs)
+            except Exception as e:
+                if i < self.retries:
+                    await asyncio.sleep(retry_delay(i, self.retry_delay, self.retry_backoff))
+                elif self.return_exceptions:
+                    return _picklable_exception(e)
+                else:
+                    raise
+
+
+def _make_task_runner(
+    func,
+    timeout: Optional[float] = None,
+    retries: int = 0,
+    retry_delay: float = 0.1,
+    retry_backoff: float = 2.0,
+    return_exceptions: bool = False,
+):
+    if timeout is None and retries == 0 and not return_exceptions:
+        return func
+    return TaskRunner(func, timeout, retries, retry_delay, retry_backoff, return_exceptions)
+
+
+class _AutoChunksize:
+    """
+    Choose the number of tasks sent to a worker at once from the measured duration of the tasks, so that a chunk
+    takes about :attr:`TARGET_CHUNK_DURATION` seconds, which makes the overhead of a dispatch negligible.
+    Single tasks are sent until the first measurement is available.
+    """
+
+    TARGET_CHUNK_DURATION: float = 0.05
+    MAX_CHUNKSIZE: int = 10_000
+    SMOOTHING: float = 0.3
+
+    def __init__(self, nb_workers: int, total: Optional[int] = None):
+        self.max_chunksize = self.MAX_CHUNKSIZE
+        if total is not None:
+            # Keep several chunks per worker so the load stays balanced at the end of the run.
+            self.max_chunksize = max(1, min(self.max_chunksize, math.ceil(total / (4 * nb_workers))))
+        self.duration_per_task: Optional[float] = None
+
+    def __call__(self) -> int:
+        if self.duration_per_task is None:
+            return 1
+        if self.duration_per_task <= 0:
+            return self.max_chunksize
+        return max(1, min(self.max_chunksize, int(self.TARGET_CHUNK_DURATION / self.duration_per_task)))
+
+    def record(self, nb_tasks: int, duration: float):
+        duration_per_task = duration / max(1, nb_tasks)
+        if self.duration_per_task is None:
+            self.duration_per_task = duration_per_task
+        else:
+            self.duration_per_task += self.SMOOTHING * (duration_per_task - self.duration_per_task)
+
+
+def _iter_chunks(tasks: Iterator[Tuple[Tuple, Dict]], get_chunksize: Callable[[], int]) -> Iterator[List]:
+    while True:
+        chunk = list(itertools.islice(tasks, get_chunksize()))
+        if not chunk:
+            return
+        yield chunk
+
+
 def apply_func_main_process(
     func,
     iterable_of_args: List[Tuple],
@@ -90,34 +905,14 @@ def apply_func_main_process(
     >>> apply_func_main_process(func, [(1, 2), (3, 4)])
     >>> [3, 7]
     """
-    import tqdm
-
-    tqdm_options = tqdm_options or {}
-    if iterable_of_kwargs is None:
-        iterable_of_kwargs = [{} for _ in range(len(iterable_of_args))]
-
-    if len(iterable_of_args) != len(iterable_of_kwargs):
+    if iterable_of_kwargs is not None and len(iterable_of_args) != len(iterable_of_kwargs):
         raise ValueError("The length of iterable_of_args and iterable_of_kwargs must be the same.")
 
-    list_of_callbacks = kwargs.get("callbacks", [])
-    if not isinstance(list_of_callbacks, list):
-        list_of_callbacks = [list_of_callbacks]
-
-    with tqdm.tqdm(
-        total=len(iterable_of_args),
-        desc=kwargs.get("desc", None),
-        unit=kwargs.get("unit", "it"),
-        disable=not kwargs.get("verbose", True),
-        **tqdm_options,
-    ) as pbar:
-        callback = _make_callable_from_list(list_of_callbacks)
-        results = []
-        for args, kwargs in zip(iterable_of_args, iterable_of_kwargs):
-            results.append(func(*args, **kwargs))
-            pbar.update()
-            callback(*args, **kwargs)
-
-    return results
+    return list(
+        _iter_func_main_process(
+            func, iterable_of_args, iterable_of_kwargs, total=len(iterable_of_args), tqdm_options=tqdm_options, **kwargs
+        )
+    )
 
 
 def apply_func_multiprocess(
@@ -126,6 +921,20 @@ def apply_func_multiprocess(
     iterable_of_kwargs: Optional[List[Dict]] = None,
     nb_workers=-2,
     tqdm_options: Optional[Dict] = None,
+    chunksize: Union[int, str] = 1,
+    pool: Optional[Union[WorkerPool, ExecutorPool, bool]] = None,
+    backend: Union[str, concurrent.futures.Executor] = "process",
+    share_args: Union[bool, int] = False,
+    share_results: bool = False,
+    timeout: Optional[float] = None,
+    retries: int = 0,
+    retry_delay: float = 0.1,
+    retry_backoff: float = 2.0,
+    return_exceptions: bool = False,
+    maxtasksperchild: Optional[int] = None,
+    cost_fn: Optional[Union[Callable[..., float], TaskCostModel]] = None,
+    checkpoint: Optional[Union[str, os.PathLike, "TaskCheckpoint"]] = None,
+    profile: Optional[RunProfile] = None,
     **kwargs,
 ):
     """
@@ -143,6 +952,63 @@ def apply_func_multiprocess(
     :type nb_workers: int
     :param tqdm_options: The options for tqdm.tqdm.
     :type tqdm_options: Optional[Dict]
+    :param chunksize: The number of tasks sent to a worker at once. Sending several tasks at once amortizes the
+        cost of a dispatch when the function is cheap. If "auto", the chunk size is adapted from the measured
+        duration of the tasks. The callbacks and the progress bar still advance for each task. Default to 1.
+    :type chunksize: Union[int, str]
+    :param pool: The :class:`WorkerPool` running the tasks, or True to use the module-level pool of
+        :func:`get_default_pool`. In both cases the pool is left running and nb_workers is ignored. If None, a pool
+        of nb_workers workers is created for this call. Default to None.
+    :type pool: Optional[Union[WorkerPool, ExecutorPool, bool]]
+    :param backend: What runs the tasks when no pool is given: "process" for a pool of processes, "thread" for a
+        pool of threads, "asyncio" for an event loop running coroutine functions, see :class:`AsyncioPool`, or a
+        :class:`concurrent.futures.Executor`, which is left running. The threads and the event loop suit I/O-bound
+        functions since nothing is pickled. Default to "process".
+    :type backend: Union[str, concurrent.futures.Executor]
+    :param share_args: The arguments marked with :class:`Shared` are always passed to worker processes through
+        shared memory: they are copied once in a segment and the workers get read-only views instead of unpickled
+        copies. If True, every NumPy array or DataFrame argument of at least 1 MiB is shared as well, and if an int,
+        every one of at least this number of bytes. The segments are unlinked when the call finishes.
+        Default to False.
+    :type share_args: Union[bool, int]
+    :param share_results: If True, the NumPy arrays and DataFrames returned by the function are sent back through
+        shared memory instead of being pickled. Default to False.
+    :type share_results: bool
+    :param timeout: The maximum duration in seconds of each attempt of a task, after which it fails with a
+        :class:`TaskTimeoutError`. See :class:`TaskRunner` for how the tasks are interrupted. Default to None.
+    :type timeout: Optional[float]
+    :param retries: The number of times a failed task is retried in its worker, with the semantics of
+        :func:`pythonbasictools.decorators.try_func_n_times`. Default to 0.
+    :type retries: int
+    :param retry_delay: The delay in seconds before the first retry of a task. Default to 0.1.
+    :type retry_delay: float
+    :param retry_backoff: The factor multiplying the delay after each retry. Default to 2.0.
+    :type retry_backoff: float
+    :param return_exceptions: If True, a task failing after its retries gives its exception as result, and the
+        callbacks, instead of stopping the whole call, so a long run finishes with partial results. The exceptions
+        that cannot be pickled are replaced by a :class:`TaskError`. Default to False.
+    :type return_exceptions: bool
+    :param maxtasksperchild: The number of chunks of tasks a worker process runs before being replaced, for tasks
+        leaking memory. Only used when a pool of processes is created for the call. Default to None.
+    :type maxtasksperchild: Optional[int]
+    :param cost_fn: The estimated cost of the tasks, used to submit them longest-first so a long task does not start
+        last while the other workers are idle. The workers pull the tasks from a shared queue, so the load is
+        balanced as the tasks finish. Either a function taking the arguments and keyword arguments of a task and
+        returning its cost, or a :class:`pythonbasictools.scheduling_tools.TaskCostModel` which also records the
+        duration of every task and saves them at the end of the call, so the next runs of the function are
+        scheduled better. The results keep the order of the arguments. Use it with a chunksize of 1, since a
+        chunk runs its tasks one after the other. Ignored when the tasks run in the main process. Default to None.
+    :type cost_fn: Optional[Union[Callable[..., float], TaskCostModel]]
+    :param checkpoint: The log, or the path of the log, where the result of every task is recorded as soon as it
+        completes, see :class:`pythonbasictools.experiment_utils.checkpoint.TaskCheckpoint`. The tasks whose
+        result is already in the log are not run again, so a killed run is resumed by repeating the call, and the
+        results are the same as the ones of a run from scratch. With ``return_exceptions``, the failed tasks are not
+        recorded so they are run again. Default to None.
+    :type checkpoint: Optional[Union[str, os.PathLike, TaskCheckpoint]]
+    :param profile: If given, the timings, worker, peak RSS and payload sizes of every task are recorded in this
+        :class:`pythonbasictools.profiling_tools.RunProfile`, which summarizes them, e.g. to tune nb_workers and
+        chunksize. The tasks run in the main process are not profiled. Default to None.
+    :type profile: Optional[RunProfile]
     :param kwargs: The additional arguments.
 
     :keyword str desc: The description of the function to apply. See tqdm.tqdm for more details.
@@ -155,6 +1021,8 @@ def apply_func_multiprocess(
 
     :raises ValueError: If the length of iterable_of_args and iterable_of_kwargs are not the same.
     :raises ValueError: If the number of workers is less than -2.
+    :raises ValueError: If chunksize is neither "auto" nor greater or equal than 1.
+    :raises ValueError: If the backend is unknown.
 
     :Example:
     >>> from pythonbasictools.multiprocessing import apply_func_multiprocess
@@ -163,58 +1031,433 @@ def apply_func_multiprocess(
     >>> apply_func_multiprocess(func, [(1, 2), (3, 4), (5, 6)])
     >>> [3, 7, 11]
     """
-    from multiprocessing import Pool
+    worker_pool = _resolve_pool(pool, nb_workers)
+    if worker_pool is None:
+        _check_backend(backend)
+        nb_workers = get_nb_workers(nb_workers)
+        if nb_workers == 0 and backend in _MAIN_PROCESS_BACKENDS and checkpoint is None:
+            func = _make_task_runner(func, timeout, retries, retry_delay, retry_backoff, return_exceptions)
+            return apply_func_main_process(func, iterable_of_args, iterable_of_kwargs, tqdm_options, **kwargs)
+    else:
+        nb_workers = worker_pool.nb_workers
 
-    import psutil
-    import tqdm
+    if iterable_of_kwargs is not None and len(iterable_of_args) != len(iterable_of_kwargs):
+        raise ValueError("The length of iterable_of_args and iterable_of_kwargs must be the same.")
 
-    tqdm_options = tqdm_options or {}
-    if nb_workers is None:
-        nb_workers = -2
+    checkpoint = _make_checkpoint(checkpoint)
+    done_results: List[Any] = []
+    if checkpoint is not None:
+        tasks = list(_zip_args_kwargs(iterable_of_args, iterable_of_kwargs))
+        keys = [checkpoint.key(*unwrap_shared(args, kwds)) for args, kwds in tasks]
+        done_results = [checkpoint.results.get(key, _NO_ITEM) for key in keys]
+        missing = [i for i, result in enumerate(done_results) if result is _NO_ITEM]
+        iterable_of_args = [tasks[i][0] for i in missing]
+        iterable_of_kwargs = [tasks[i][1] for i in missing]
+    if worker_pool is None:
+        nb_workers = min(nb_workers, len(iterable_of_args))
 
-    if nb_workers == -1:
-        nb_workers = psutil.cpu_count(logical=True)
-    elif nb_workers == -2:
-        nb_workers = psutil.cpu_count(logical=False)
+    cost_model, order = None, None
+    if cost_fn is not None:
+        tasks = list(_zip_args_kwargs(iterable_of_args, iterable_of_kwargs))
+        unwrapped_tasks = [unwrap_shared(args, kwds) for args, kwds in tasks]
+        if isinstance(cost_fn, TaskCostModel):
+            cost_model = cost_fn
+            costs = cost_model.costs(func, unwrapped_tasks)
+        else:
+            costs = [cost_fn(*args, **kwds) for args, kwds in unwrapped_tasks]
+        order = longest_first_order(costs)
+        iterable_of_args = [tasks[i][0] for i in order]
+        iterable_of_kwargs = [tasks[i][1] for i in order]
 
-    if nb_workers == 0:
-        return apply_func_main_process(func, iterable_of_args, iterable_of_kwargs, tqdm_options, **kwargs)
+    # Every task is submitted up front since all the outputs are kept anyway, except with an automatic chunk size
+    # which needs the first measurements before sending bigger chunks.
+    max_in_flight = 4 * max(1, nb_workers) if chunksize == "auto" else max(1, len(iterable_of_args))
+    outputs = list(
+        iter_func_multiprocess(
+            func,
+            iterable_of_args,
+            iterable_of_kwargs,
+            nb_workers=nb_workers,
+            max_in_flight=max_in_flight,
+            tqdm_options=tqdm_options,
+            chunksize=chunksize,
+            pool=worker_pool,
+            backend=backend,
+            share_args=share_args,
+            share_results=share_results,
+            timeout=timeout,
+            retries=retries,
+            retry_delay=retry_delay,
+            retry_backoff=retry_backoff,
+            return_exceptions=return_exceptions,
+            maxtasksperchild=maxtasksperchild,
+            cost_model=cost_model,
+            checkpoint=checkpoint,
+            profile=profile,
+            **kwargs,
+        )
+    )
+    if order is not None:
+        results: List[Any] = [None] * len(outputs)
+        for i, output in zip(order, outputs):
+            results[i] = output
+        outputs = results
+    if checkpoint is not None:
+        # The computed results fill the gaps of the ones read from the checkpoint, in the order of the arguments.
+        computed = iter(outputs)
+        outputs = [next(computed) if result is _NO_ITEM else result for result in done_results]
+    return outputs
 
-    if nb_workers < 0:
-        raise ValueError("The number of workers must be greater or equal than 0.")
 
-    if iterable_of_kwargs is None:
-        iterable_of_kwargs = [{} for _ in range(len(iterable_of_args))]
+def iter_func_multiprocess(
+    func,
+    iterable_of_args: Iterable[Tuple],
+    iterable_of_kwargs: Optional[Iterable[Dict]] = None,
+    nb_workers=-2,
+    ordered: bool = True,
+    max_in_flight: Optional[int] = None,
+    total: Optional[int] = None,
+    tqdm_options: Optional[Dict] = None,
+    chunksize: Union[int, str] = 1,
+    pool: Optional[Union[WorkerPool, ExecutorPool, bool]] = None,
+    backend: Union[str, concurrent.futures.Executor] = "process",
+    share_args: Union[bool, int] = False,
+    share_results: bool = False,
+    timeout: Optional[float] = None,
+    retries: int = 0,
+    retry_delay: float = 0.1,
+    retry_backoff: float = 2.0,
+    return_exceptions: bool = False,
+    maxtasksperchild: Optional[int] = None,
+    cost_model: Optional[TaskCostModel] = None,
+    checkpoint: Optional[Union[str, os.PathLike, "TaskCheckpoint"]] = None,
+    profile: Optional[RunProfile] = None,
+    **kwargs,
+) -> Iterator[Any]:
+    """
+    Apply a function to an iterable of arguments in parallel and yield the results as they are available. Unlike
+    :func:`apply_func_multiprocess`, the arguments are consumed lazily and at most ``max_in_flight`` tasks are
+    submitted at once, so the memory stays bounded whatever the number of tasks.
 
-    if len(iterable_of_args) != len(iterable_of_kwargs):
-        raise ValueError("The length of iterable_of_args and iterable_of_kwargs must be the same.")
+    :param func: The function to apply.
+    :type func: Callable
+    :param iterable_of_args: The arguments to apply the function to. Can be any iterable, e.g. a generator.
+    :type iterable_of_args: Iterable[Tuple]
+    :param iterable_of_kwargs: The keyword arguments to apply the function to, consumed along iterable_of_args.
+    :type iterable_of_kwargs: Optional[Iterable[Dict]]
+    :param nb_workers: The number of workers to use, see :func:`apply_func_multiprocess`. Default to -2.
+    :type nb_workers: int
+    :param ordered: If True, the results are yielded in the order of the arguments. Otherwise, they are yielded as
+        soon as they complete, which keeps the workers busy when the tasks have very different durations.
+        Default to True.
+    :type ordered: bool
+    :param max_in_flight: The maximum number of tasks, or chunks of tasks, submitted but not yet yielded. Default to
+        twice the number of workers.
+    :type max_in_flight: Optional[int]
+    :param total: The number of tasks shown by the progress bar. Default to ``len(iterable_of_args)`` if it has a
+        length, otherwise the progress bar has no total.
+    :type total: Optional[int]
+    :param tqdm_options: The options for tqdm.tqdm.
+    :type tqdm_options: Optional[Dict]
+    :param chunksize: The number of tasks sent to a worker at once, or "auto", see :func:`apply_func_multiprocess`.
+        Default to 1.
+    :type chunksize: Union[int, str]
+    :param pool: The pool running the tasks, see :func:`apply_func_multiprocess`. If the iterator is closed before
+        its end, a pool created for the call is terminated while a given pool finishes the submitted tasks.
+        Default to None.
+    :type pool: Optional[Union[WorkerPool, ExecutorPool, bool]]
+    :param backend: What runs the tasks when no pool is given, see :func:`apply_func_multiprocess`.
+        Default to "process".
+    :type backend: Union[str, concurrent.futures.Executor]
+    :param share_args: Which arguments are passed through shared memory, see :func:`apply_func_multiprocess`.
+        Default to False.
+    :type share_args: Union[bool, int]
+    :param share_results: If True, the results are returned through shared memory, see
+        :func:`apply_func_multiprocess`. Default to False.
+    :type share_results: bool
+    :param timeout: The maximum duration in seconds of each attempt of a task, see :func:`apply_func_multiprocess`.
+        Default to None.
+    :type timeout: Optional[float]
+    :param retries: The number of retries of a failed task, see :func:`apply_func_multiprocess`. Default to 0.
+    :type retries: int
+    :param retry_delay: The delay in seconds before the first retry of a task. Default to 0.1.
+    :type retry_delay: float
+    :param retry_backoff: The factor multiplying the delay after each retry. Default to 2.0.
+    :type retry_backoff: float
+    :param return_exceptions: If True, the exceptions of the failed tasks are yielded as results, see
+        :func:`apply_func_multiprocess`. Default to False.
+    :type return_exceptions: bool
+    :param maxtasksperchild: The number of chunks of tasks a worker process runs before being replaced, see
+        :func:`apply_func_multiprocess`. Default to None.
+    :type maxtasksperchild: Optional[int]
+    :param cost_model: The model recording the duration of every task run by the workers, saved when the iterator
+        ends. The tasks are not reordered, see the ``cost_fn`` of :func:`apply_func_multiprocess`. Default to None.
+    :type cost_model: Optional[TaskCostModel]
+    :param checkpoint: The log, or the path of the log, where the result of every task is recorded as soon as it
+        completes. Unlike :func:`apply_func_multiprocess`, the tasks already recorded are run again. Default to None.
+    :type checkpoint: Optional[Union[str, os.PathLike, TaskCheckpoint]]
+    :param profile: The profile recording the telemetry of every task, see :func:`apply_func_multiprocess`.
+        Default to None.
+    :type profile: Optional[RunProfile]
+    :param kwargs: The additional arguments, see :func:`apply_func_multiprocess`.
 
-    nb_workers = min(nb_workers, len(iterable_of_args))
-    q_listener, q = multiprocess_logger_init()
+    :return: An iterator over the results.
 
-    with tqdm.tqdm(
-        total=len(iterable_of_args),
-        desc=kwargs.get("desc", None),
-        unit=kwargs.get("unit", "it"),
-        disable=not kwargs.get("verbose", True),
-        **tqdm_options,
-    ) as pbar:
-        with Pool(nb_workers, worker_init, [q]) as pool:
+    :raises ValueError: If iterable_of_args and iterable_of_kwargs do not have the same length.
+    :raises ValueError: If the number of workers is less than -2 or max_in_flight is less than 1.
+    :raises ValueError: If chunksize is neither "auto" nor greater or equal than 1.
+    :raises ValueError: If the backend is unknown.
+
+    :Example:
+    >>> from pythonbasictools.multiprocessing_tools import iter_func_multiprocess
+    >>> def func(a, b):
+    ...     return a + b
+    >>> for result in iter_func_multiprocess(func, ((i, i) for i in range(10**6)), total=10**6):
+    ...     print(result)
+    """
+    import tqdm
+
+    tqdm_options = tqdm_options or {}
+    if total is None and hasattr(iterable_of_args, "__len__"):
+        total = len(iterable_of_args)  # type: ignore
+    name = func_name(func)
+    func = _make_task_runner(func, timeout, retries, retry_delay, retry_backoff, return_exceptions)
+    checkpoint = _make_checkpoint(checkpoint)
+
+    def record_results(chunk: List[Tuple[Tuple, Dict]], results: List):
+        for (args, kwds), result in zip(chunk, results):
+            if not (return_exceptions and isinstance(result, Exception)):
+                checkpoint.record(checkpoint.key(*unwrap_shared(args, kwds)), result)  # type: ignore
+
+    worker_pool = _resolve_pool(pool, nb_workers)
+    if worker_pool is None:
+        _check_backend(backend)
+        nb_workers = get_nb_workers(nb_workers)
+        if nb_workers == 0 and backend in _MAIN_PROCESS_BACKENDS:
+            on_result = None
+            if checkpoint is not None:
+                on_result = lambda args, kwds, result: record_results([(args, kwds)], [result])  # noqa: E731
+            try:
+                yield from _iter_func_main_process(
+                    func, iterable_of_args, iterable_of_kwargs, total, tqdm_options, on_result=on_result, **kwargs
+                )
+            finally:
+                if checkpoint is not None:
+                    checkpoint.close()
+            return
+        if isinstance(backend, concurrent.futures.Executor):
+            nb_workers = getattr(backend, "_max_workers", None) or nb_workers
+        if total is not None:
+            nb_workers = min(nb_workers, total)
+        nb_workers = max(1, nb_workers)
+    else:
+        nb_workers = worker_pool.nb_workers
+
+    if max_in_flight is None:
+        max_in_flight = 2 * nb_workers
+    if max_in_flight < 1:
+        raise ValueError("max_in_flight must be greater or equal than 1.")
+    if chunksize == "auto":
+        auto_chunksize = _AutoChunksize(nb_workers, total)
+        get_chunksize: Callable[[], int] = auto_chunksize
+    elif isinstance(chunksize, int) and chunksize >= 1:
+        auto_chunksize = None
+        get_chunksize = lambda: chunksize  # noqa: E731
+    else:
+        raise ValueError(f"chunksize must be 'auto' or greater or equal than 1, got {chunksize!r}.")
+
+    arena: Optional[SharedArena] = _make_arena(share_args)
+    if profile is not None:
+        profile.start(nb_workers)
+    owns_pool = worker_pool is None
+    if owns_pool:
+        worker_pool = _make_pool(backend, nb_workers, maxtasksperchild)
+    tasks = _zip_args_kwargs(iterable_of_args, iterable_of_kwargs)
+    if worker_pool.shares_memory:  # type: ignore
+        arena = None
+        encode: Callable = unwrap_shared
+    else:
+        encode = arena.encode  # type: ignore
+        func = SharedMemoryFunc(func, share_results=share_results)
+    if profile is not None:
+        func = ProfiledFunc(func, measure_results=not worker_pool.shares_memory)  # type: ignore
+    try:
+        with tqdm.tqdm(
+            total=total,
+            desc=kwargs.get("desc", None),
+            unit=kwargs.get("unit", "it"),
+            disable=not kwargs.get("verbose", True),
+            **tqdm_options,
+        ) as pbar:
 
             def p_bar_update_callback(*args, **kwds):
                 pbar.update()
                 return
 
-            list_of_callbacks = kwargs.get("callbacks", [])
-            if not isinstance(list_of_callbacks, list):
-                list_of_callbacks = [list_of_callbacks]
-            list_of_callbacks.append(p_bar_update_callback)
+            callback = _make_callable_from_list(_get_list_of_callbacks(kwargs) + [p_bar_update_callback])
 
-            results = [
-                pool.apply_async(func, args=args, kwds=kwds, callback=_make_callable_from_list(list_of_callbacks))
-                for args, kwds in zip(iterable_of_args, iterable_of_kwargs)
-            ]
-            outputs = [r.get() for r in results]
+            def chunk_callback(
+                chunk: List[Tuple[Tuple, Dict]], records: Optional[List[Dict]], chunk_output: _ChunkOutput
+            ):
+                results = chunk_output.results
+                if records is not None:
+                    telemetry = [result.telemetry for result in results]
+                    results[:] = [result.result for result in results]
+                    callback_start = time.perf_counter()
+                if auto_chunksize is not None:
+                    auto_chunksize.record(len(results), chunk_output.duration)
+                if cost_model is not None:
+                    for (args, kwds), duration in zip(chunk, chunk_output.durations):
+                        cost_model.record_key(name, cost_model.key_fn(*unwrap_shared(args, kwds)), duration)
+                if arena is not None and share_results:
+                    # The results are replaced in place, so the iterator also gets the received ones.
+                    results[:] = [receive_result(result) for result in results]
+                if checkpoint is not None:
+                    record_results(chunk, results)
+                for result in results:
+                    callback(result)
+                if records is not None:
+                    profile.receive(records, telemetry, time.perf_counter() - callback_start)  # type: ignore
 
-    q_listener.stop()
-    return outputs
+            def make_chunks():
+                for chunk in _iter_chunks(tasks, get_chunksize):
+                    encoded_chunk = [encode(args, kwds) for args, kwds in chunk]
+                    records = None
+                    if profile is not None:
+                        records = profile.submit(encoded_chunk, measure_args=not worker_pool.shares_memory)
+                    yield encoded_chunk, functools.partial(chunk_callback, chunk, records)
+
+            if ordered:
+                yield from _iter_ordered(worker_pool, func, make_chunks(), max_in_flight)
+            else:
+                yield from _iter_unordered(worker_pool, func, make_chunks(), max_in_flight)
+    finally:
+        if profile is not None:
+            profile.stop()
+        if owns_pool:
+            worker_pool.terminate()  # type: ignore
+        if arena is not None:
+            arena.close()
+        if cost_model is not None:
+            cost_model.save()
+        if checkpoint is not None:
+            checkpoint.close()
+
+
+def _make_checkpoint(checkpoint: Optional[Union[str, os.PathLike, "TaskCheckpoint"]]) -> Optional["TaskCheckpoint"]:
+    if checkpoint is None:
+        return None
+    from .experiment_utils.checkpoint import TaskCheckpoint
+
+    if isinstance(checkpoint, TaskCheckpoint):
+        return checkpoint
+    return TaskCheckpoint(checkpoint)
+
+
+def _make_arena(share_args: Union[bool, int]) -> SharedArena:
+    if isinstance(share_args, bool):
+        return SharedArena(auto=share_args)
+    if share_args < 0:
+        raise ValueError("share_args must be a boolean or a number of bytes greater or equal than 0.")
+    return SharedArena(auto=True, min_nbytes=share_args)
+
+
+def _on_chunk_done(done: queue.Queue, index: int, chunk_callback: Callable, chunk_output: _ChunkOutput):
+    done.put((index, True, (chunk_callback, chunk_output)))
+
+
+def _on_chunk_error(done: queue.Queue, index: int, error: BaseException):
+    done.put((index, False, error))
+
+
+def _receive_chunk(item: Tuple[int, bool, Any]) -> Tuple[int, bool, Any]:
+    """
+    Run the callback of a chunk taken from the queue of the completed chunks and get its results. The pools only
+    queue the outputs, so the callbacks run in the consumer: an exception raised by one, e.g. while writing the
+    checkpoint, reaches the caller instead of killing the result handler thread of the pool and blocking the
+    iterator forever.
+    """
+    index, succeeded, value = item
+    if succeeded:
+        chunk_callback, chunk_output = value
+        chunk_callback(chunk_output)
+        value = chunk_output.results
+    return index, succeeded, value
+
+
+def _receive_remaining_chunks(done: queue.Queue):
+    """Run the callbacks of the chunks completed but not consumed when the iterator is closed."""
+    while True:
+        try:
+            item = done.get_nowait()
+        except queue.Empty:
+            return
+        _receive_chunk(item)
+
+
+def _submit(pool, func, chunk: List, chunk_callback: Callable, done: queue.Queue, index: int):
+    pool.submit_chunk(
+        func,
+        chunk,
+        callback=functools.partial(_on_chunk_done, done, index, chunk_callback),
+        error_callback=functools.partial(_on_chunk_error, done, index),
+    )
+
+
+def _iter_ordered(pool, func, chunks: Iterator[Tuple[List, Callable]], max_in_flight: int):
+    # The callbacks run as soon as the chunks complete, while the results are yielded in the order of the chunks.
+    done: queue.Queue = queue.Queue()
+    received: Dict[int, Tuple[bool, Any]] = {}
+    nb_submitted, next_index = 0, 0
+
+    def _next_in_order():
+        while next_index not in received:
+            index, succeeded, value = _receive_chunk(done.get())
+            received[index] = (succeeded, value)
+        succeeded, value = received.pop(next_index)
+        if not succeeded:
+            raise value
+        return value
+
+    try:
+        for chunk, chunk_callback in chunks:
+            _submit(pool, func, chunk, chunk_callback, done, nb_submitted)
+            nb_submitted += 1
+            if nb_submitted - next_index >= max_in_flight:
+                results = _next_in_order()
+                next_index += 1
+                yield from results
+        while next_index < nb_submitted:
+            results = _next_in_order()
+            next_index += 1
+            yield from results
+    except GeneratorExit:
+        _receive_remaining_chunks(done)
+        raise
+
+
+def _iter_unordered(pool, func, chunks: Iterator[Tuple[List, Callable]], max_in_flight: int):
+    done: queue.Queue = queue.Queue()
+
+    def _next_done():
+        _, succeeded, value = _receive_chunk(done.get())
+        if not succeeded:
+            raise value
+        return value
+
+    nb_in_flight = 0
+    try:
+        for index, (chunk, chunk_callback) in enumerate(chunks):
+            _submit(pool, func, chunk, chunk_callback, done, index)
+            nb_in_flight += 1
+            if nb_in_flight >= max_in_flight:
+                results = _next_done()
+                nb_in_flight -= 1
+                yield from results
+        while nb_in_flight:
+            results = _next_done()
+            nb_in_flight -= 1
+            yield from results
+    except GeneratorExit:
+        _receive_remaining_chunks(done)
+        raise
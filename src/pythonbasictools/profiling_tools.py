@@ -0,0 +1,252 @@
+import json
+import os
+import pickle
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Union
+
+# The largest resident set size sampled after the tasks run by this process.
+_PEAK_RSS = 0
+_PROCESS = None
+
+
+def sample_peak_rss() -> int:
+    """Sample the resident set size of this process with :mod:`psutil` and get the largest one sampled so far."""
+    global _PEAK_RSS, _PROCESS
+    import psutil
+
+    if _PROCESS is None or _PROCESS.pid != os.getpid():
+        _PROCESS, _PEAK_RSS = psutil.Process(), 0
+    _PEAK_RSS = max(_PEAK_RSS, _PROCESS.memory_info().rss)
+    return _PEAK_RSS
+
+
+class ProfiledResult:
+    """Result of a task run by :class:`ProfiledFunc`, along with the telemetry of the task."""
+
+    __slots__ = ("result", "telemetry")
+
+    def __init__(self, result: Any, telemetry: Dict[str, Any]):
+        self.result = result
+        self.telemetry = telemetry
+
+
+class ProfiledFunc:
+    """
+    Wrap the function run by the workers so it returns a :class:`ProfiledResult` with the start and end times of the
+    task, the process and thread running it, the peak RSS of the process and, if ``measure_results`` is set, the
+    size of the pickled result and the time spent pickling it.
+    """
+
+    def __init__(self, func, measure_results: bool = True):
+        self.func = func
+        self.measure_results = measure_results
+
+    def __call__(self, *args, **kwargs):
+        start = time.time()
+        result = self.func(*args, **kwargs)
+        if hasattr(result, "__await__"):
+            return self._await(result, start)
+        return self._wrap(result, start)
+
+    async def _await(self, awaitable, start: float):
+        return self._wrap(await awaitable, start)
+
+    def _wrap(self, result: Any, start: float) -> ProfiledResult:
+        telemetry = {
+            "started": start,
+            "ended": time.time(),
+            "pid": os.getpid(),
+            "thread": threading.get_ident(),
+            "peak_rss": sample_peak_rss(),
+        }
+        if self.measure_results:
+            pickle_start = time.perf_counter()
+            telemetry["result_nbytes"] = len(pickle.dumps(result, protocol=pickle.HIGHEST_PROTOCOL))
+            telemetry["result_pickle_time"] = time.perf_counter() - pickle_start
+        return ProfiledResult(result, telemetry)
+
+
+class RunProfile:
+    """
+    Telemetry of the tasks of a call of :func:`pythonbasictools.multiprocessing_tools.apply_func_multiprocess` or
+    :func:`pythonbasictools.multiprocessing_tools.iter_func_multiprocess`, to see where the time goes and tune the
+    number of workers and the chunk size. For every task, it records when it was submitted, started, ended and
+    received, the process and thread that ran it, the peak RSS of that process, the size of the pickled arguments and
+    result, and the time spent in the callbacks. Profiling pickles the arguments and results once more to measure
+    them, so it slows the call down a little.
+
+    :Example:
+    >>> profile = RunProfile()
+    >>> apply_func_multiprocess(func, args, chunksize="auto", profile=profile)
+    >>> profile.summary()["utilization"]
+    >>> profile.per_worker()
+    >>> profile.to_chrome_trace("trace.json")  # Open it in chrome://tracing or https://ui.perfetto.dev
+
+    The times are wall-clock times in seconds since the epoch, comparable between the processes.
+    """
+
+    COLUMNS = [
+        "task",
+        "chunk",
+        "pid",
+        "thread",
+        "submitted",
+        "started",
+        "ended",
+        "received",
+        "queue_wait",
+        "run_time",
+        "transfer_time",
+        "callback_time",
+        "args_nbytes",
+        "args_pickle_time",
+        "result_nbytes",
+        "result_pickle_time",
+        "peak_rss",
+    ]
+
+    def __init__(self):
+        self.records: List[Dict[str, Any]] = []
+        self.nb_workers: Optional[int] = None
+        self.started: Optional[float] = None
+        self.ended: Optional[float] = None
+        self._nb_tasks = 0
+        self._nb_chunks = 0
+        self._lock = threading.Lock()
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}(nb_tasks={len(self.records)}, nb_workers={self.nb_workers})"
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def start(self, nb_workers: int):
+        """Mark the start of a call run by ``nb_workers`` workers."""
+        self.nb_workers = nb_workers
+        self.started = time.time()
+        self.ended = None
+
+    def stop(self):
+        """Mark the end of the call."""
+        self.ended = time.time()
+
+    def submit(self, tasks: List, measure_args: bool = True) -> List[Dict[str, Any]]:
+        """Create the records of a chunk of tasks being submitted, measuring the size of their pickled arguments."""
+        with self._lock:
+            first_task, chunk = self._nb_tasks, self._nb_chunks
+            self._nb_tasks += len(tasks)
+            self._nb_chunks += 1
+        submitted = time.time()
+        records = []
+        for i, task in enumerate(tasks):
+            record: Dict[str, Any] = {"task": first_task + i, "chunk": chunk, "submitted": submitted}
+            if measure_args:
+                pickle_start = time.perf_counter()
+                record["args_nbytes"] = len(pickle.dumps(task, protocol=pickle.HIGHEST_PROTOCOL))
+                record["args_pickle_time"] = time.perf_counter() - pickle_start
+            records.append(record)
+        return records
+
+    def receive(self, records: List[Dict[str, Any]], telemetry: List[Dict[str, Any]], callback_time: float):
+        """Complete the records of a chunk with the telemetry of its tasks and the time spent in its callbacks."""
+        received = time.time()
+        for record, task_telemetry in zip(records, telemetry):
+            record.update(task_telemetry)
+            record["received"] = received
+            record["callback_time"] = callback_time / max(1, len(records))
+        self.records.extend(records)
+
+    def to_dataframe(self):
+        """
+        Get a DataFrame with a row per task, sorted by submission, and the columns :attr:`COLUMNS`. The durations
+        are derived from the times: ``queue_wait`` from submission to start, ``run_time`` from start to end and
+        ``transfer_time`` from end to reception by the caller, which includes sending the result back.
+        """
+        import pandas as pd
+
+        df = pd.DataFrame(self.records)
+        for column in self.COLUMNS:
+            if column not in df:
+                df[column] = pd.Series(dtype=float)
+        if len(df):
+            df["queue_wait"] = df["started"] - df["submitted"]
+            df["run_time"] = df["ended"] - df["started"]
+            df["transfer_time"] = df["received"] - df["ended"]
+        return df[self.COLUMNS].sort_values("task", ignore_index=True)
+
+    def per_worker(self):
+        """Get a DataFrame with a row per worker process and thread: its number of tasks, busy time and peak RSS."""
+        df = self.to_dataframe()
+        return (
+            df.groupby(["pid", "thread"])
+            .agg(
+                nb_tasks=("task", "size"),
+                busy_time=("run_time", "sum"),
+                mean_run_time=("run_time", "mean"),
+                peak_rss=("peak_rss", "max"),
+            )
+            .reset_index()
+        )
+
+    def summary(self) -> Dict[str, Any]:
+        """
+        Get the totals and means of the call. The ``utilization`` is the fraction of the time the workers spent
+        running tasks between the start and the end of the call: a low one means the workers waited for tasks, e.g.
+        because the chunks are too small or the arguments too large to send.
+        """
+        df = self.to_dataframe()
+        ended = self.ended if self.ended is not None else time.time()
+        wall_time = ended - self.started if self.started is not None else float("nan")
+        busy_time = float(df["run_time"].sum())
+        nb_workers = self.nb_workers or 1
+        return {
+            "nb_tasks": len(df),
+            "nb_chunks": int(df["chunk"].nunique()),
+            "nb_workers": self.nb_workers,
+            "nb_processes": int(df["pid"].nunique()),
+            "wall_time": wall_time,
+            "busy_time": busy_time,
+            "utilization": busy_time / (wall_time * nb_workers) if wall_time > 0 else float("nan"),
+            "mean_queue_wait": float(df["queue_wait"].mean()),
+            "mean_run_time": float(df["run_time"].mean()),
+            "mean_transfer_time": float(df["transfer_time"].mean()),
+            "callback_time": float(df["callback_time"].sum()),
+            "args_nbytes": int(df["args_nbytes"].sum()),
+            "args_pickle_time": float(df["args_pickle_time"].sum()),
+            "result_nbytes": int(df["result_nbytes"].sum()),
+            "result_pickle_time": float(df["result_pickle_time"].sum()),
+            "peak_rss": int(df["peak_rss"].max()) if len(df) else 0,
+        }
+
+    def to_chrome_trace(self, path: Optional[Union[str, Path]] = None) -> Dict[str, Any]:
+        """
+        Get the tasks as a Chrome trace, with a row per worker thread, and save it as JSON if a path is given. The
+        trace opens in ``chrome://tracing`` or https://ui.perfetto.dev.
+        """
+        origin = self.started if self.started is not None else min((r["submitted"] for r in self.records), default=0)
+        events: List[Dict[str, Any]] = []
+        for pid in sorted({record["pid"] for record in self.records}):
+            events.append({"name": "process_name", "ph": "M", "pid": pid, "args": {"name": f"worker {pid}"}})
+        for record in self.records:
+            args = {key: record[key] for key in ("chunk", "args_nbytes", "result_nbytes", "peak_rss") if key in record}
+            args["queue_wait_ms"] = (record["started"] - record["submitted"]) * 1e3
+            events.append(
+                {
+                    "name": f"task {record['task']}",
+                    "cat": "task",
+                    "ph": "X",
+                    "ts": (record["started"] - origin) * 1e6,
+                    "dur": (record["ended"] - record["started"]) * 1e6,
+                    "pid": record["pid"],
+                    "tid": record["thread"],
+                    "args": args,
+                }
+            )
+        trace = {"traceEvents": events, "displayTimeUnit": "ms"}
+        if path is not None:
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+            with open(path, "w") as f:
+                json.dump(trace, f)
+        return trace
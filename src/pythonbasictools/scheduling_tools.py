@@ -0,0 +1,115 @@
+import json
+import threading
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence, Tuple, Union
+
+from .hash_tools import hash_args
+
+
+def func_name(func: Callable) -> str:
+    """Get a name identifying a function across runs, unwrapping the partials and the wrappers of the tasks."""
+    while not hasattr(func, "__qualname__"):
+        inner = getattr(func, "func", None)
+        if inner is None:
+            return repr(func)
+        func = inner
+    return f"{getattr(func, '__module__', '')}.{func.__qualname__}"
+
+
+def longest_first_order(costs: Sequence[float]) -> List[int]:
+    """
+    Get the indexes of the tasks sorted by decreasing cost. Submitting the tasks in this order to workers pulling
+    them from a shared queue is the longest-processing-time-first heuristic: the longest tasks start first and the
+    short ones fill the gaps at the end, instead of a long task starting last while the other workers are idle.
+    The tasks of equal costs keep their order.
+    """
+    return sorted(range(len(costs)), key=lambda i: -costs[i])
+
+
+class TaskCostModel:
+    """
+    Learn the duration of the tasks of functions to schedule the next runs longest-first. The duration of a task is
+    keyed by the name of its function and the hash of its arguments, and smoothed over the runs. The duration of a
+    task never seen is estimated by the mean duration of the tasks of its function.
+
+    :Example:
+    >>> model = TaskCostModel("durations.json")
+    >>> apply_func_multiprocess(train, [(lr, depth) for lr in lrs for depth in depths], cost_fn=model)
+
+    :param path: The JSON file where the durations are saved by :meth:`save` and loaded from at the creation of the
+        model. If None, the durations are only kept in memory. Default is None.
+    :type path: Optional[Union[str, Path]]
+    :param key_fn: The function computing the key of a task from its arguments and keyword arguments. Default is the
+        hash of the arguments with :func:`pythonbasictools.hash_tools.hash_args`, which hashes the arrays by their
+        content and converts the other objects that are not JSON serializable to strings.
+    :type key_fn: Optional[Callable[[Tuple, Dict], str]]
+    :param smoothing: The weight of a new duration in the estimate of a task, between 0 and 1. Default is 0.5.
+    :type smoothing: float
+    """
+
+    def __init__(
+        self,
+        path: Optional[Union[str, Path]] = None,
+        key_fn: Optional[Callable[[Tuple, Dict], str]] = None,
+        smoothing: float = 0.5,
+    ):
+        if not 0 < smoothing <= 1:
+            raise ValueError("The smoothing must be in ]0, 1].")
+        self.path = Path(path) if path is not None else None
+        self.key_fn = key_fn or self.default_key
+        self.smoothing = smoothing
+        self.durations: Dict[str, Dict[str, float]] = {}
+        self._lock = threading.Lock()
+        if self.path is not None and self.path.exists():
+            self.load()
+
+    def __repr__(self):
+        nb_tasks = sum(len(durations) for durations in self.durations.values())
+        return f"{self.__class__.__name__}(path={self.path}, nb_funcs={len(self.durations)}, nb_tasks={nb_tasks})"
+
+    @staticmethod
+    def default_key(args: Tuple, kwargs: Dict) -> str:
+        return hash_args(args, kwargs)
+
+    def predict(self, func: Callable, args: Tuple = (), kwargs: Optional[Dict] = None) -> Optional[float]:
+        """Get the estimated duration of a task, or None if no task of the function was recorded."""
+        durations = self.durations.get(func_name(func))
+        if not durations:
+            return None
+        duration = durations.get(self.key_fn(args, kwargs or {}))
+        if duration is None:
+            duration = sum(durations.values()) / len(durations)
+        return duration
+
+    def costs(self, func: Callable, tasks: Sequence[Tuple[Tuple, Dict]]) -> List[float]:
+        """Get the estimated durations of tasks, 0 for all of them if no task of the function was recorded."""
+        durations = self.durations.get(func_name(func), {})
+        keys = [self.key_fn(args, kwargs) for args, kwargs in tasks]
+        default = sum(durations.values()) / len(durations) if durations else 0.0
+        return [durations.get(key, default) for key in keys]
+
+    def record(self, func: Callable, args: Tuple, kwargs: Optional[Dict], duration: float):
+        """Record the duration in seconds of a task."""
+        self.record_key(func_name(func), self.key_fn(args, kwargs or {}), duration)
+
+    def record_key(self, name: str, key: str, duration: float):
+        with self._lock:
+            durations = self.durations.setdefault(name, {})
+            previous = durations.get(key)
+            durations[key] = duration if previous is None else previous + self.smoothing * (duration - previous)
+
+    def load(self):
+        """Load the durations saved in :attr:`path`, replacing the ones in memory."""
+        with open(self.path, "r") as f:  # type: ignore
+            self.durations = json.load(f)
+
+    def save(self):
+        """Save the durations in :attr:`path`, if any."""
+        if self.path is None:
+            return
+        from .experiment_utils.atomic_io import atomic_write
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self._lock:
+            content = json.dumps(self.durations, separators=(",", ":"))
+        atomic_write(self.path, content)
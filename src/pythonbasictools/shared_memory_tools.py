@@ -0,0 +1,303 @@
+import collections
+import os
+from multiprocessing import shared_memory
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+import numpy as np
+
+SHARE_MIN_NBYTES = 1024 * 1024
+MAX_ATTACHED_SEGMENTS = 16
+
+
+class Shared:
+    """
+    Mark an argument of :func:`apply_func_multiprocess` to be passed to the workers through shared memory instead
+    of being pickled with every task. The same object marked in several tasks is placed in shared memory only once.
+
+    :Example:
+    >>> big = np.random.rand(10_000, 1_000)
+    >>> apply_func_multiprocess(row_mean, [(Shared(big), i) for i in range(len(big))], share_results=True)
+
+    :param obj: A NumPy array without Python objects, or a DataFrame whose numeric columns are shared.
+    :type obj: Union[np.ndarray, pd.DataFrame]
+    """
+
+    def __init__(self, obj: Any):
+        if not is_shareable(obj):
+            raise ValueError(f"Cannot share an object of type {type(obj).__name__}.")
+        self.obj = obj
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}({type(self.obj).__name__})"
+
+
+def is_shareable(obj: Any) -> bool:
+    """Whether the object can be placed in shared memory, i.e. a NumPy array without Python objects or a DataFrame."""
+    if isinstance(obj, np.ndarray):
+        return not obj.dtype.hasobject
+    import pandas as pd
+
+    return isinstance(obj, pd.DataFrame)
+
+
+def _nbytes(obj: Any) -> int:
+    if isinstance(obj, np.ndarray):
+        return obj.nbytes
+    return int(obj.memory_usage(index=False, deep=False).sum())
+
+
+class SharedArray:
+    """
+    Handle to a NumPy array in a shared memory segment. The handle is pickled as the name of the segment, the shape
+    and the dtype of the array, so it is cheap to send to another process.
+    """
+
+    def __init__(self, name: str, shape: Tuple[int, ...], dtype: np.dtype):
+        self.name = name
+        self.shape = tuple(shape)
+        self.dtype = np.dtype(dtype)
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}(name={self.name!r}, shape={self.shape}, dtype={self.dtype})"
+
+    @classmethod
+    def create(cls, array: np.ndarray) -> Tuple["SharedArray", shared_memory.SharedMemory]:
+        """Copy the array in a new segment. The caller owns the segment and must close and unlink it."""
+        array = np.ascontiguousarray(array)
+        segment = shared_memory.SharedMemory(create=True, size=max(1, array.nbytes))
+        np.ndarray(array.shape, array.dtype, buffer=segment.buf)[...] = array
+        return cls(segment.name, array.shape, array.dtype), segment
+
+    def view(self, segment: shared_memory.SharedMemory) -> np.ndarray:
+        return np.ndarray(self.shape, self.dtype, buffer=segment.buf)
+
+
+class SharedDataFrame:
+    """
+    Handle to a DataFrame whose numeric columns are in shared memory. The other columns and the index are pickled
+    with the handle.
+    """
+
+    def __init__(self, columns: List[Tuple[Any, Union[SharedArray, Any]]], index: Any):
+        self.columns = columns
+        self.index = index
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}(columns={[name for name, _ in self.columns]})"
+
+    @property
+    def arrays(self) -> List[SharedArray]:
+        return [column for _, column in self.columns if isinstance(column, SharedArray)]
+
+    @classmethod
+    def create(cls, df) -> Tuple["SharedDataFrame", List[shared_memory.SharedMemory]]:
+        """Copy the numeric columns in new segments. The caller owns the segments and must close and unlink them."""
+        columns, segments = [], []
+        for name, series in df.items():
+            if isinstance(series.dtype, np.dtype) and not series.dtype.hasobject:
+                handle, segment = SharedArray.create(series.to_numpy())
+                columns.append((name, handle))
+                segments.append(segment)
+            else:
+                columns.append((name, series.array))
+        return cls(columns, df.index), segments
+
+    def frame(self, views: Dict[str, np.ndarray]):
+        import pandas as pd
+
+        # The columns are assembled by position since their names may be duplicated.
+        data = {
+            i: views[column.name] if isinstance(column, SharedArray) else column
+            for i, (_, column) in enumerate(self.columns)
+        }
+        df = pd.DataFrame(data, index=self.index, copy=False)
+        df.columns = pd.Index([name for name, _ in self.columns])
+        return df
+
+
+SharedHandle = Union[SharedArray, SharedDataFrame]
+
+
+def _arrays_of(handle: SharedHandle) -> List[SharedArray]:
+    return [handle] if isinstance(handle, SharedArray) else handle.arrays
+
+
+def _close_quietly(segment: shared_memory.SharedMemory) -> bool:
+    """Close the segment, returning False if views of it are still alive."""
+    try:
+        segment.close()
+    except BufferError:
+        return False
+    return True
+
+
+class SharedArena:
+    """
+    Owner of the shared memory segments created for a call of :func:`apply_func_multiprocess`. The arguments marked
+    with :class:`Shared`, or large enough when ``auto`` is set, are placed in shared memory once and replaced by
+    handles. Every segment is unlinked when the arena is closed.
+
+    :param auto: If True, every shareable argument of at least ``min_nbytes`` bytes is shared even if it is not
+        marked with :class:`Shared`. Default is False.
+    :type auto: bool
+    :param min_nbytes: The minimum size of the automatically shared arguments. Default is :data:`SHARE_MIN_NBYTES`.
+    :type min_nbytes: int
+    """
+
+    def __init__(self, auto: bool = False, min_nbytes: int = SHARE_MIN_NBYTES):
+        self.auto = auto
+        self.min_nbytes = min_nbytes
+        self._segments: List[shared_memory.SharedMemory] = []
+        # The shared objects are kept alive so their id is not reused by another object during the call.
+        self._handles: Dict[int, Tuple[Any, SharedHandle]] = {}
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}(nb_segments={len(self._segments)})"
+
+    def share(self, obj: Any) -> SharedHandle:
+        """Place the object in shared memory, once per object, and get its handle."""
+        if id(obj) in self._handles:
+            return self._handles[id(obj)][1]
+        if isinstance(obj, np.ndarray):
+            handle, segment = SharedArray.create(obj)
+            segments = [segment]
+        else:
+            handle, segments = SharedDataFrame.create(obj)  # type: ignore
+        self._segments.extend(segments)
+        self._handles[id(obj)] = (obj, handle)
+        return handle
+
+    def _encode(self, value: Any) -> Any:
+        if isinstance(value, Shared):
+            return self.share(value.obj)
+        if self.auto and is_shareable(value) and _nbytes(value) >= self.min_nbytes:
+            return self.share(value)
+        return value
+
+    def encode(self, args: Tuple, kwargs: Dict) -> Tuple[Tuple, Dict]:
+        """Replace the shared arguments of a task by their handles."""
+        return tuple(self._encode(arg) for arg in args), {key: self._encode(value) for key, value in kwargs.items()}
+
+    def close(self):
+        """Close and unlink every segment of the arena."""
+        for segment in self._segments:
+            _close_quietly(segment)
+            try:
+                segment.unlink()
+            except FileNotFoundError:
+                pass
+        self._segments.clear()
+        self._handles.clear()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+def unwrap_shared(args: Tuple, kwargs: Dict) -> Tuple[Tuple, Dict]:
+    """Replace the :class:`Shared` markers by their object, for the backends sharing the memory of the caller."""
+
+    def _unwrap(value):
+        return value.obj if isinstance(value, Shared) else value
+
+    return tuple(_unwrap(arg) for arg in args), {key: _unwrap(value) for key, value in kwargs.items()}
+
+
+# The segments attached by this process, the most recently used last. Keeping them attached during a chunk of tasks
+# avoids attaching a segment again for every task using it.
+_ATTACHED: "collections.OrderedDict[str, Tuple[shared_memory.SharedMemory, np.ndarray]]" = collections.OrderedDict()
+_CLOSE_LATER: List[shared_memory.SharedMemory] = []
+
+
+def _attached_view(handle: SharedArray) -> np.ndarray:
+    if handle.name in _ATTACHED:
+        _ATTACHED.move_to_end(handle.name)
+        return _ATTACHED[handle.name][1]
+    segment = shared_memory.SharedMemory(name=handle.name)
+    view = handle.view(segment)
+    view.flags.writeable = False
+    _ATTACHED[handle.name] = (segment, view)
+    while len(_ATTACHED) > MAX_ATTACHED_SEGMENTS:
+        _, (old_segment, _) = _ATTACHED.popitem(last=False)
+        _CLOSE_LATER.append(old_segment)
+    # The segments still viewed by the objects of a task are closed once they are released.
+    _CLOSE_LATER[:] = [segment for segment in _CLOSE_LATER if not _close_quietly(segment)]
+    return view
+
+
+def detach_segments():
+    """
+    Detach this process from the segments attached to resolve shared arguments. The workers call it at the end of
+    every chunk of tasks, so the idle workers of a persistent pool do not keep the memory of a finished call mapped.
+    The segments still viewed, e.g. by a result not sent yet, are closed at the next call.
+    """
+    _CLOSE_LATER.extend(segment for segment, _ in _ATTACHED.values())
+    _ATTACHED.clear()
+    _CLOSE_LATER[:] = [segment for segment in _CLOSE_LATER if not _close_quietly(segment)]
+
+
+def _resolve(value: Any) -> Any:
+    if isinstance(value, SharedArray):
+        return _attached_view(value)
+    if isinstance(value, SharedDataFrame):
+        return value.frame({array.name: _attached_view(array) for array in value.arrays})
+    return value
+
+
+def _share_result(result: Any) -> Any:
+    if os.name == "nt" or not is_shareable(result):
+        # On Windows, a segment is destroyed with its last handle, so it cannot outlive the worker's one.
+        return result
+    if isinstance(result, np.ndarray):
+        handle, segment = SharedArray.create(result)
+        segments = [segment]
+    else:
+        handle, segments = SharedDataFrame.create(result)  # type: ignore
+    for segment in segments:
+        segment.close()  # The receiver unlinks the segment once it has read it.
+    return handle
+
+
+def receive_result(result: Any) -> Any:
+    """
+    Copy a result shared by a worker out of shared memory and unlink its segments. This is a single copy instead of
+    pickling the result, sending it through a pipe and unpickling it.
+    """
+    if not isinstance(result, (SharedArray, SharedDataFrame)):
+        return result
+    arrays = _arrays_of(result)
+    segments = {array.name: shared_memory.SharedMemory(name=array.name) for array in arrays}
+    try:
+        copies = {array.name: np.array(array.view(segments[array.name])) for array in arrays}
+        return copies[result.name] if isinstance(result, SharedArray) else result.frame(copies)
+    finally:
+        for segment in segments.values():
+            _close_quietly(segment)
+            segment.unlink()
+
+
+class SharedMemoryFunc:
+    """
+    Wrap a function run in worker processes so the handles of its shared arguments are resolved to read-only views
+    of the shared memory and, optionally, its result is returned through shared memory.
+
+    :param func: The function.
+    :type func: Callable
+    :param share_results: If True, the NumPy arrays and DataFrames returned by the function are placed in shared
+        memory and copied out by :func:`receive_result` in the caller.
+    :type share_results: bool
+    """
+
+    def __init__(self, func, share_results: bool = False):
+        self.func = func
+        self.share_results = share_results
+
+    def __call__(self, *args, **kwargs):
+        args = tuple(_resolve(arg) for arg in args)
+        kwargs = {key: _resolve(value) for key, value in kwargs.items()}
+        result = self.func(*args, **kwargs)
+        if self.share_results:
+            result = _share_result(result)
+        return result
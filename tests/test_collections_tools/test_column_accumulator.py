@@ -0,0 +1,75 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from pythonbasictools.collections_tools import ColumnAccumulator
+
+handmade_rows = [
+    [{"a": 1, "b": 2.5}, {"a": 2, "b": 3.5}],
+    [{"a": 1}, {"b": "x"}, {"a": 3, "b": "y"}],
+    [{"flag": True}, {"flag": False}],
+    [{"flag": True}, {}],
+    [{"mixed": 1}, {"mixed": "one"}, {"mixed": None}],
+    [{"nested": {"x": 1}}, {"nested": [1, 2]}],
+    [{"big": 10**30}, {"big": 1}],
+    [{"big": 10**30}, {"big": 1.5}],
+    [{"a": 1, "b": 2}, {"b": 3, "a": 4}, {"c": None}],
+    [],
+]
+
+
+@pytest.mark.parametrize("rows", handmade_rows)
+def test_column_accumulator_matches_dataframe_from_records(rows):
+    df = ColumnAccumulator().extend(rows).to_dataframe()
+    expected = pd.DataFrame(rows, index=pd.RangeIndex(len(rows)))
+    assert list(df.columns) == list(expected.columns)
+    pd.testing.assert_frame_equal(df, expected, check_dtype=False, check_index_type=False)
+
+
+def test_column_accumulator_dtypes():
+    rows = [{"i": 1, "f": 1.5, "b": True, "im": 1}, {"i": 2, "f": 2, "b": False}]
+    df = ColumnAccumulator().extend(rows).to_dataframe()
+    assert df["i"].dtype == np.int64
+    assert df["f"].dtype == np.float64
+    assert df["b"].dtype == bool
+    assert df["im"].dtype == np.float64
+    assert np.isnan(df["im"].iloc[1])
+
+
+@pytest.mark.parametrize("other", [1.5, None, {}])
+def test_column_accumulator_keeps_ints_too_large_for_int64(other):
+    rows = [{"big": 2**63 + 1}, {"big": other} if other != {} else {}]
+    acc = ColumnAccumulator().extend(rows)
+    column = acc.to_dataframe()["big"]
+    assert column.dtype == object
+    assert column[0] == 2**63 + 1
+    values, mask = acc.get_masked_column("big")
+    assert values.dtype == object
+    assert values[0] == 2**63 + 1
+    assert mask.tolist() == [False, other != 1.5]
+
+
+def test_column_accumulator_categorical_threshold():
+    rows = [{"s": "a", "u": str(i)} for i in range(10)]
+    df = ColumnAccumulator(categorical_threshold=0.5).extend(rows).to_dataframe()
+    assert isinstance(df["s"].dtype, pd.CategoricalDtype)
+    assert not isinstance(df["u"].dtype, pd.CategoricalDtype)
+
+
+def test_column_accumulator_interns_strings():
+    acc = ColumnAccumulator().extend([{"s": "".join(["ab", "c"])} for _ in range(3)])
+    column = acc._columns["s"]
+    assert column[0] is column[1] is column[2]
+
+
+def test_column_accumulator_len_and_columns():
+    acc = ColumnAccumulator().extend([{"a": 1}, {"b": 2}])
+    assert len(acc) == 2
+    assert acc.columns == ["a", "b"]
+
+
+def test_column_accumulator_to_arrow():
+    pa = pytest.importorskip("pyarrow")
+    table = ColumnAccumulator().extend([{"a": 1}, {"a": 2}]).to_arrow()
+    assert isinstance(table, pa.Table)
+    assert table.column("a").to_pylist() == [1, 2]
@@ -0,0 +1,65 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import pythonbasictools as pbt
+from pythonbasictools.collections_tools import (
+    dict_of_lists_to_list_of_dicts,
+    list_of_dicts_to_dict_of_arrays,
+    list_of_dicts_to_dict_of_lists,
+)
+
+handmade_list_of_dicts = [
+    ([{"a": 1, "b": 9}, {"a": 2, "b": 8}], None, {"a": [1, 2], "b": [9, 8]}),
+    ([], None, {}),
+    ([{"a": 1, "b": 2}, {"a": 3}, {"c": 4}], None, {"a": [1, 3], "b": [2], "c": [None, None, 4]}),
+    ([{"a": 1}, {}, {"a": 2}], 0, {"a": [1, 0, 2]}),
+]
+
+
+@pytest.mark.parametrize("inputs, default, expected_output", handmade_list_of_dicts)
+def test_list_of_dicts_to_dict_of_lists_with_handmade_data(inputs, default, expected_output):
+    assert pbt.collections_tools.list_of_dicts_to_dict_of_lists(inputs, default=default) == expected_output
+
+
+def test_list_of_dicts_to_dict_of_lists_from_generator():
+    assert list_of_dicts_to_dict_of_lists({"a": i} for i in range(3)) == {"a": [0, 1, 2]}
+
+
+def test_round_trip():
+    rng = np.random.default_rng(0)
+    keys = [f"k{i}" for i in range(20)]
+    rows = [{key: int(rng.integers(10)) for key in keys if rng.random() < 0.7} for _ in range(200)]
+    dict_of_lists = list_of_dicts_to_dict_of_lists(rows, default=-1)
+    for key, column in dict_of_lists.items():
+        present = [i for i, row in enumerate(rows) if key in row]
+        assert len(column) == present[-1] + 1
+        assert all(column[i] == (rows[i][key] if key in rows[i] else -1) for i in range(len(column)))
+    full_rows = [{key: row.get(key, -1) for key in dict_of_lists} for row in rows]
+    padded = {key: [row[key] for row in full_rows] for key in dict_of_lists}
+    assert dict_of_lists_to_list_of_dicts(padded) == full_rows
+
+
+def test_dict_of_lists_to_list_of_dicts_with_arrays_and_ranges():
+    result = dict_of_lists_to_list_of_dicts({"a": np.arange(2), "b": range(3), "c": (x for x in "xy")})
+    assert result == [{"a": 0, "b": 0, "c": "x"}, {"a": 1, "b": 1, "c": "y"}, {"b": 2}]
+
+
+def test_list_of_dicts_to_dict_of_arrays():
+    rows = [{"i": 1, "f": 0.5, "b": True, "s": "x"}, {"i": 2, "s": None}, {"f": 2, "o": [1]}]
+    values, masks = list_of_dicts_to_dict_of_arrays(rows)
+    assert list(values) == ["i", "f", "b", "s", "o"]
+    assert values["i"].dtype == np.int64 and values["i"].tolist() == [1, 2, 0]
+    assert masks["i"].tolist() == [False, False, True]
+    np.testing.assert_array_equal(values["f"], [0.5, np.nan, 2.0])
+    assert masks["f"].tolist() == [False, True, False]
+    assert values["b"].dtype == bool and masks["b"].tolist() == [False, True, True]
+    assert values["s"].dtype == object and values["s"].tolist() == ["x", None, None]
+    assert masks["s"].tolist() == [False, True, True]
+    assert values["o"].tolist() == [None, None, [1]]
+    integers = pd.arrays.IntegerArray(values["i"], masks["i"])
+    assert integers.tolist() == [1, 2, pd.NA]
+
+
+def test_list_of_dicts_to_dict_of_arrays_empty():
+    assert list_of_dicts_to_dict_of_arrays([]) == ({}, {})
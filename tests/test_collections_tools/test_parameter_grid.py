@@ -0,0 +1,99 @@
+import pickle
+
+import pytest
+
+import pythonbasictools as pbt
+from pythonbasictools.collections_tools import ParameterGrid
+
+from .test_dict_of_lists_to_product_list_of_dicts import handmade_dict_of_lists
+
+
+@pytest.mark.parametrize("inputs, expected_output", handmade_dict_of_lists)
+def test_parameter_grid_matches_product(inputs, expected_output):
+    grid = ParameterGrid(inputs)
+    assert len(grid) == len(expected_output)
+    assert list(grid) == expected_output
+    assert [grid[i] for i in range(len(grid))] == expected_output
+    assert [grid[i] for i in range(-len(grid), 0)] == expected_output
+
+
+def test_parameter_grid_empty_dict():
+    assert list(ParameterGrid({})) == pbt.collections_tools.dict_of_lists_to_product_list_of_dicts({})
+
+
+def test_parameter_grid_len_is_lazy():
+    grid = ParameterGrid({f"k{i}": range(10) for i in range(12)})
+    assert len(grid) == 10**12
+    assert grid[-1] == {f"k{i}": 9 for i in range(12)}
+    assert grid[123_456_789] == {f"k{i}": int(d) for i, d in enumerate(f"{123_456_789:012d}")}
+
+
+def test_parameter_grid_index_error():
+    grid = ParameterGrid({"a": [1, 2], "b": [3]})
+    with pytest.raises(IndexError):
+        grid[2]
+    with pytest.raises(IndexError):
+        grid[-3]
+
+
+@pytest.mark.parametrize("sl", [slice(1, 5), slice(None, None, 2), slice(-3, None), slice(5, 1, -1), slice(4, 4)])
+def test_parameter_grid_slice(sl):
+    inputs, expected_output = handmade_dict_of_lists[0]
+    grid = ParameterGrid(inputs)
+    sub_grid = grid[sl]
+    assert isinstance(sub_grid, ParameterGrid)
+    assert list(sub_grid) == expected_output[sl]
+    assert len(sub_grid) == len(expected_output[sl])
+    assert list(sub_grid[::2]) == expected_output[sl][::2]
+
+
+def test_parameter_grid_index_and_contains():
+    inputs, expected_output = handmade_dict_of_lists[0]
+    grid = ParameterGrid(inputs)
+    for i, combination in enumerate(expected_output):
+        assert grid.index(combination) == i
+        assert combination in grid
+    sub_grid = grid[3:6]
+    assert sub_grid.index({"a": 2, "b": 8}) == 1
+    assert {"a": 1, "b": 9} not in sub_grid
+    assert {"a": 4, "b": 9} not in grid
+    assert {"a": 1} not in grid
+    assert {"a": 1, "b": 9, "c": 0} not in grid
+    with pytest.raises(ValueError):
+        grid.index({"a": 4, "b": 9})
+
+
+@pytest.mark.parametrize("nb_shards", [1, 2, 4, 9, 13])
+def test_parameter_grid_shards_cover_the_grid_once(nb_shards):
+    inputs, expected_output = handmade_dict_of_lists[0]
+    shards = ParameterGrid(inputs).shards(nb_shards)
+    assert len(shards) == nb_shards
+    assert [combination for shard in shards for combination in shard] == expected_output
+    assert max(len(shard) for shard in shards) - min(len(shard) for shard in shards) <= 1
+
+
+def test_parameter_grid_shard_errors():
+    grid = ParameterGrid({"a": [1, 2]})
+    with pytest.raises(ValueError):
+        grid.shard(0, 0)
+    with pytest.raises(ValueError):
+        grid.shard(2, 2)
+
+
+def test_parameter_grid_pickle():
+    grid = ParameterGrid({"a": [1, 2, 3], "b": ["x", "y"]})[1:5]
+    restored = pickle.loads(pickle.dumps(grid))
+    assert restored == grid
+    assert list(restored) == list(grid)
+
+
+def _sum_shard(shard):
+    return [combination["a"] * 10 + combination["b"] for combination in shard]
+
+
+def test_parameter_grid_shards_in_workers():
+    grid = ParameterGrid({"a": range(5), "b": range(7)})
+    results = pbt.multiprocessing_tools.apply_func_multiprocess(
+        _sum_shard, [(shard,) for shard in grid.shards(3)], nb_workers=2, verbose=False
+    )
+    assert [value for result in results for value in result] == [c["a"] * 10 + c["b"] for c in grid]
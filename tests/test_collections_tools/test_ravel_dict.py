@@ -0,0 +1,135 @@
+import sys
+import threading
+
+import pytest
+
+from pythonbasictools import collections_tools
+from pythonbasictools.collections_tools import ravel_dict, unravel_dict
+
+handmade_nested_dicts = [
+    ({}, {}),
+    ({"a": 1, "b": "x"}, {"a": 1, "b": "x"}),
+    ({"a": {"b": 1, "c": {"d": 2}}, "e": 3}, {"a.b": 1, "a.c.d": 2, "e": 3}),
+    ({"a": {"b": [1, 2]}, "c": (3,)}, {"a.b": [1, 2], "c": (3,)}),
+    ({"x": {"y": {"z": {"w": None}}}}, {"x.y.z.w": None}),
+]
+
+
+@pytest.mark.parametrize("inputs, expected_output", handmade_nested_dicts)
+def test_ravel_dict_with_handmade_data(inputs, expected_output):
+    result = ravel_dict(inputs)
+    assert result == expected_output
+    assert list(result) == list(expected_output)
+
+
+@pytest.mark.parametrize("inputs, expected_output", handmade_nested_dicts)
+def test_unravel_dict_is_the_inverse_of_ravel_dict(inputs, expected_output):
+    assert unravel_dict(expected_output) == inputs
+
+
+def test_ravel_dict_keeps_the_order_of_the_keys():
+    result = ravel_dict({"a": 1, "b": {"c": 2, "d": {"e": 3}}, "f": 4})
+    assert list(result) == ["a", "b.c", "b.d.e", "f"]
+
+
+def test_ravel_dict_custom_sep_and_non_str_keys():
+    assert ravel_dict({"a": {1: {"b": 2}}, 3: {"c": 4}, 5: 6}, key_sep="/") == {"a/1/b": 2, "3/c": 4, 5: 6}
+
+
+def test_ravel_dict_drops_empty_nested_dicts():
+    assert ravel_dict({"a": {}, "b": {"c": {}}, "d": 1}) == {"d": 1}
+
+
+@pytest.mark.parametrize(
+    "max_depth, expected_output",
+    [
+        (0, {"a": {"b": {"c": 1}}, "d": 2}),
+        (1, {"a.b": {"c": 1}, "d": 2}),
+        (2, {"a.b.c": 1, "d": 2}),
+        (None, {"a.b.c": 1, "d": 2}),
+    ],
+)
+def test_ravel_dict_max_depth(max_depth, expected_output):
+    assert ravel_dict({"a": {"b": {"c": 1}}, "d": 2}, max_depth=max_depth) == expected_output
+
+
+def test_ravel_dict_sequences():
+    nested = {"a": {"b": [1, {"c": 2}], "d": (3, [4, 5])}, "e": "str"}
+    raveled = ravel_dict(nested, ravel_sequences=True)
+    assert raveled == {"a.b.0": 1, "a.b.1.c": 2, "a.d.0": 3, "a.d.1.0": 4, "a.d.1.1": 5, "e": "str"}
+    assert unravel_dict(raveled, unravel_sequences=True) == {
+        "a": {"b": [1, {"c": 2}], "d": [3, [4, 5]]},
+        "e": "str",
+    }
+    assert unravel_dict(raveled)["a"]["b"] == {"0": 1, "1": {"c": 2}}
+
+
+def test_ravel_dict_deep_nesting_does_not_recurse():
+    nested = current = {}
+    for _ in range(5_000):
+        current["k"] = {}
+        current = current["k"]
+    current["v"] = 1
+    raveled = ravel_dict(nested)
+    assert list(raveled.values()) == [1]
+    unraveled = unravel_dict(raveled)
+    for _ in range(5_000):
+        unraveled = unraveled["k"]
+    assert unraveled == {"v": 1}
+
+
+def test_ravel_dict_shares_the_keys_of_a_schema():
+    first = ravel_dict({"params": {"lr": 0.1}})
+    second = ravel_dict({"params": {"lr": 0.2}})
+    (first_key,), (second_key,) = first, second
+    assert first_key is second_key
+
+
+def test_ravel_dict_key_cache_is_bounded(monkeypatch):
+    monkeypatch.setattr(collections_tools, "RAVEL_KEY_CACHE_SIZE", 8)
+    collections_tools._clear_ravel_key_cache()
+    d = {f"p{i}": {f"k{j}": j for j in range(20)} for i in range(20)}
+    expected = {f"p{i}.k{j}": j for i in range(20) for j in range(20)}
+    for _ in range(2):
+        assert ravel_dict(d) == expected
+        assert len(collections_tools._RAVEL_KEY_CACHE) <= 8
+        assert sum(map(len, collections_tools._RAVEL_KEY_CACHE.values())) <= 8
+    collections_tools._clear_ravel_key_cache()
+
+
+def test_ravel_dict_from_many_threads(monkeypatch):
+    monkeypatch.setattr(collections_tools, "RAVEL_KEY_CACHE_SIZE", 16)
+    switch_interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)  # Switch threads often to make the races likely
+    errors = []
+
+    def ravel_many(thread_index):
+        try:
+            for i in range(300):
+                d = {f"t{thread_index}p{i}": {f"k{j}": j for j in range(5)}}
+                assert ravel_dict(d) == {f"t{thread_index}p{i}.k{j}": j for j in range(5)}
+        except Exception as e:  # pragma: no cover
+            errors.append(e)
+
+    threads = [threading.Thread(target=ravel_many, args=(i,)) for i in range(8)]
+    try:
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    finally:
+        sys.setswitchinterval(switch_interval)
+        collections_tools._clear_ravel_key_cache()
+    assert errors == []
+
+
+def test_ravel_dict_does_not_confuse_equal_keys():
+    assert ravel_dict({"a": {1: "x"}}) == {"a.1": "x"}
+    assert ravel_dict({"a": {True: "x"}}) == {"a.True": "x"}
+    assert ravel_dict({"a": {1.0: "x"}}) == {"a.1.0": "x"}
+
+
+@pytest.mark.parametrize("raveled", [{"a": 1, "a.b": 2}, {"a.b": 2, "a": 1}, {"a.b": 1, "a.b.c": 2}])
+def test_unravel_dict_conflicting_keys(raveled):
+    with pytest.raises(ValueError):
+        unravel_dict(raveled)
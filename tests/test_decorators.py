@@ -0,0 +1,36 @@
+import pytest
+
+from pythonbasictools.decorators import retry_delay, try_func_n_times
+
+
+@pytest.mark.parametrize(
+    "attempt, delay, backoff, max_delay, expected",
+    [(0, 0.1, 1.0, None, 0.1), (3, 0.1, 1.0, None, 0.1), (3, 0.1, 2.0, None, 0.8), (10, 0.1, 2.0, 1.0, 1.0)],
+)
+def test_retry_delay(attempt, delay, backoff, max_delay, expected):
+    assert retry_delay(attempt, delay, backoff, max_delay) == pytest.approx(expected)
+
+
+def test_try_func_n_times_backoff(monkeypatch):
+    sleeps = []
+    monkeypatch.setattr("time.sleep", sleeps.append)
+    calls = []
+
+    @try_func_n_times(n=4, delay=0.5, backoff=3.0)
+    def _func():
+        calls.append(None)
+        if len(calls) < 4:
+            raise RuntimeError()
+        return "done"
+
+    assert _func() == "done"
+    assert sleeps == pytest.approx([0.5, 1.5, 4.5])
+
+
+def test_try_func_n_times_raises_last():
+    @try_func_n_times(n=2, delay=0.0)
+    def _func():
+        raise KeyError("last")
+
+    with pytest.raises(KeyError):
+        _func()
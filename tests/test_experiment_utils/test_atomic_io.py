@@ -0,0 +1,48 @@
+import os
+
+import pytest
+
+from pythonbasictools.experiment_utils.atomic_io import (
+    Durability,
+    atomic_write,
+    backup_path_of,
+)
+
+
+class TestAtomicWrite:
+    @pytest.mark.parametrize("durability", list(Durability) + ["full"])
+    def test_write_text(self, tmp_path, durability):
+        path = atomic_write(tmp_path / "file.txt", "hello", durability=durability)
+        assert path.read_text() == "hello"
+
+    def test_write_bytes(self, tmp_path):
+        path = atomic_write(tmp_path / "file.bin", b"\x00\x01")
+        assert path.read_bytes() == b"\x00\x01"
+
+    def test_replaces_existing(self, tmp_path):
+        path = tmp_path / "file.txt"
+        path.write_text("old")
+        atomic_write(path, "new")
+        assert path.read_text() == "new"
+
+    def test_no_temporary_file_left(self, tmp_path):
+        atomic_write(tmp_path / "file.txt", "hello", backup=True)
+        atomic_write(tmp_path / "file.txt", "world", backup=True)
+        assert sorted(os.listdir(tmp_path)) == ["file.txt", "file.txt.bak"]
+
+    def test_backup_keeps_previous_content(self, tmp_path):
+        path = tmp_path / "file.txt"
+        atomic_write(path, "first", backup=True)
+        assert not backup_path_of(path).exists()
+        atomic_write(path, "second", backup=True)
+        atomic_write(path, "third", backup=True)
+        assert path.read_text() == "third"
+        assert backup_path_of(path).read_text() == "second"
+
+    def test_failed_write_keeps_original(self, tmp_path):
+        path = tmp_path / "file.txt"
+        path.write_text("original")
+        with pytest.raises(TypeError):
+            atomic_write(path, 42)  # type: ignore
+        assert path.read_text() == "original"
+        assert os.listdir(tmp_path) == ["file.txt"]
@@ -0,0 +1,46 @@
+import numpy as np
+import pytest
+
+from pythonbasictools.experiment_utils.checkpoint import TaskCheckpoint
+
+
+class TestTaskCheckpoint:
+    def test_record_and_load(self, tmp_path):
+        path = tmp_path / "sub" / "run.ckpt"
+        with TaskCheckpoint(path) as checkpoint:
+            checkpoint.record(checkpoint.key((1,), {}), 1)
+            checkpoint.record(checkpoint.key((2,), {"y": 3}), {"value": np.arange(3)})
+        loaded = TaskCheckpoint(path)
+        assert len(loaded) == 2
+        assert loaded.results[loaded.key((1,))] == 1
+        np.testing.assert_array_equal(loaded.results[loaded.key((2,), {"y": 3})]["value"], np.arange(3))
+        assert loaded.key((2,), {"y": 4}) not in loaded
+
+    def test_missing_file(self, tmp_path):
+        checkpoint = TaskCheckpoint(tmp_path / "run.ckpt")
+        assert len(checkpoint) == 0
+        assert not checkpoint.path.exists()
+
+    @pytest.mark.parametrize("nb_dropped_bytes", [1, 5])
+    def test_truncated_record(self, tmp_path, nb_dropped_bytes):
+        path = tmp_path / "run.ckpt"
+        with TaskCheckpoint(path) as checkpoint:
+            checkpoint.record("a", 1)
+            checkpoint.record("b", list(range(100)))
+        content = path.read_bytes()
+        path.write_bytes(content[:-nb_dropped_bytes])
+        with TaskCheckpoint(path) as checkpoint:
+            assert checkpoint.results == {"a": 1}
+            checkpoint.record("c", 3)
+        assert TaskCheckpoint(path).results == {"a": 1, "c": 3}
+
+    def test_clear(self, tmp_path):
+        checkpoint = TaskCheckpoint(tmp_path / "run.ckpt", durability="file")
+        checkpoint.record("a", 1)
+        checkpoint.clear()
+        assert len(checkpoint) == 0
+        assert not checkpoint.path.exists()
+
+    def test_custom_key(self, tmp_path):
+        checkpoint = TaskCheckpoint(tmp_path / "run.ckpt", key_fn=lambda args, kwargs: f"{args[0]}")
+        assert checkpoint.key((7, "ignored")) == "7"
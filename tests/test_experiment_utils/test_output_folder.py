@@ -73,6 +73,24 @@ class TestExperimentStateFile:
     def test_state_file_created_on_init(self, state_file):
         assert state_file.path.exists()
 
+    def test_state_setter_resets_content(self, state_file):
+        state_file.write("some text")
+        state_file.state = ExperimentState.RUNNING
+        assert state_file.read() == ""
+
+    def test_state_setter_leaves_single_file(self, state_file):
+        state_file.state = ExperimentState.RUNNING
+        state_file.state = ExperimentState.FINISHED
+        assert [p.name for p in state_file.path.parent.iterdir()] == [state_file.path.name]
+
+    def test_load_state_prefers_newest_file(self, tmp_path):
+        folder = tmp_path / "run"
+        folder.mkdir()
+        (folder / "state.running").write_text("")
+        os.utime(folder / "state.running", ns=(0, 0))
+        (folder / "state.finished").write_text("")
+        assert ExperimentStateFile(folder).state == ExperimentState.FINISHED
+
 
 # ---------------------------------------------------------------------------
 # OutputFolder
@@ -176,6 +194,41 @@ class TestOutputFolder:
         assert "_output_folder" in meta_df.columns
         assert "_output_folder" in data_df.columns
 
+    def test_root_folder_to_dataframe_rows(self, tmp_path):
+        OutputFolder(tmp_path / "run_a").update_data(loss=0.5, name="a")
+        OutputFolder(tmp_path / "run_b").update_data(loss=0.25)
+        _, data_df = OutputFolder.root_folder_to_dataframe(tmp_path)
+        data_df = data_df.sort_values("_output_folder").reset_index(drop=True)
+        assert data_df["_output_folder"].tolist() == [Path("run_a"), Path("run_b")]
+        assert data_df["loss"].tolist() == [0.5, 0.25]
+        assert data_df["name"].iloc[0] == "a"
+        assert pd.isna(data_df["name"].iloc[1])
+
+    def test_root_folder_to_dataframe_categorical(self, tmp_path):
+        for i in range(4):
+            OutputFolder(tmp_path / f"run_{i}").update_data(optimizer="adam")
+        _, data_df = OutputFolder.root_folder_to_dataframe(tmp_path, categorical_threshold=0.5)
+        assert isinstance(data_df["optimizer"].dtype, pd.CategoricalDtype)
+
+    @pytest.mark.parametrize("backend", ["thread", "process"])
+    def test_root_folder_to_dataframe_parallel(self, tmp_path, backend):
+        for i in range(5):
+            OutputFolder(tmp_path / f"run_{i}").update_data(x=i)
+        serial_meta, serial_data = OutputFolder.root_folder_to_dataframe(tmp_path)
+        meta_df, data_df = OutputFolder.root_folder_to_dataframe(tmp_path, nb_workers=2, backend=backend, chunksize=2)
+        pd.testing.assert_frame_equal(data_df, serial_data)
+        pd.testing.assert_frame_equal(meta_df, serial_meta)
+
+    def test_root_folder_to_dataframe_unknown_backend(self, output_folder, tmp_path):
+        with pytest.raises(ValueError):
+            OutputFolder.root_folder_to_dataframe(tmp_path, nb_workers=2, backend="unknown")
+
+    def test_gather_output_folders_parallel(self, tmp_path):
+        for i in range(5):
+            OutputFolder(tmp_path / f"run_{i}")
+        folders = OutputFolder.gather_output_folders(tmp_path, nb_workers=2, chunksize=2)
+        assert sorted(f.path.name for f in folders) == [f"run_{i}" for i in range(5)]
+
     def test_gather_output_folders(self, output_folder, tmp_path):
         folders = OutputFolder.gather_output_folders(tmp_path)
         assert isinstance(folders, list)
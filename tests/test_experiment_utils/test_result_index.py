@@ -0,0 +1,71 @@
+import os
+
+import pytest
+
+from pythonbasictools.experiment_utils.result_index import ResultIndex
+from pythonbasictools.experiment_utils.run_output_file import RunOutputFile
+
+MP_KWARGS = {"nb_workers": 0, "verbose": False}
+
+
+class TestResultIndex:
+    @pytest.fixture
+    def files(self, tmp_path):
+        return [RunOutputFile(tmp_path / f"run_{i}", data={"x": i}).path for i in range(3)]
+
+    def test_lookup_empty(self, tmp_path, files):
+        index = ResultIndex(tmp_path)
+        assert index.lookup(files) == {}
+
+    def test_store_and_lookup(self, tmp_path, files):
+        index = ResultIndex(tmp_path)
+        index.store({str(p): {"x": i} for i, p in enumerate(files)})
+        assert index.lookup(map(str, files)) == {str(p): {"x": i} for i, p in enumerate(files)}
+        assert len(index) == 3
+
+    def test_persistent(self, tmp_path, files):
+        ResultIndex(tmp_path).store({str(files[0]): {"x": 0}})
+        assert ResultIndex(tmp_path).lookup([str(files[0])]) == {str(files[0]): {"x": 0}}
+
+    def test_modified_file_is_stale(self, tmp_path, files):
+        index = ResultIndex(tmp_path)
+        index.store({str(files[0]): {"x": 0}})
+        with open(files[0], "a") as f:
+            f.write(" ")
+        assert index.lookup([str(files[0])]) == {}
+
+    def test_check_content(self, tmp_path, files):
+        index = ResultIndex(tmp_path, check_content=True)
+        index.store({str(files[0]): {"x": 0}})
+        stat = os.stat(files[0])
+        content = files[0].read_text()
+        files[0].write_text(content.replace('"x": 0', '"x": 9'))
+        os.utime(files[0], ns=(stat.st_atime_ns, stat.st_mtime_ns))
+        assert index.lookup([str(files[0])]) == {}
+
+    def test_prune(self, tmp_path, files):
+        index = ResultIndex(tmp_path)
+        index.store({str(p): {"x": i} for i, p in enumerate(files)})
+        index.prune([files[0]])
+        assert len(index) == 1
+
+    def test_parse_results_with_index(self, tmp_path, files, monkeypatch):
+        df = RunOutputFile.parse_results_from_dir_to_dataframe(tmp_path, mp_kwargs=MP_KWARGS, index=True)
+        assert sorted(df["x"]) == [0, 1, 2]
+        assert (tmp_path / ResultIndex.DEFAULT_FILENAME).exists()
+
+        parsed = []
+        original = RunOutputFile.read_data_from_file.__func__
+
+        def spy(cls, path):
+            parsed.append(path)
+            return original(cls, path)
+
+        monkeypatch.setattr(RunOutputFile, "read_data_from_file", classmethod(spy))
+        RunOutputFile(tmp_path / "run_1", data={"x": 10})
+        RunOutputFile(tmp_path / "run_3", data={"x": 3})
+        os.remove(files[0])
+        df = RunOutputFile.parse_results_from_dir_to_dataframe(tmp_path, mp_kwargs=MP_KWARGS, index=True)
+        assert sorted(df["x"]) == [2, 3, 10]
+        assert sorted(os.path.basename(os.path.dirname(p)) for p in parsed) == ["run_1", "run_3"]
+        assert len(ResultIndex(tmp_path)) == 3
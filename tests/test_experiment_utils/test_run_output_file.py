@@ -6,6 +6,7 @@ import pandas as pd
 import pytest
 
 from pythonbasictools.experiment_utils.run_output_file import RunOutputFile
+from pythonbasictools.experiment_utils.save_policy import SavePolicy
 
 
 class TestRunOutputFile:
@@ -312,3 +313,259 @@ class TestRunOutputFile:
 
     def test_get_unknown_meta_prefix_returns_default(self, rof):
         assert rof.get("UNKNOWN.key", "default") == "default"
+
+    # --- journal mode ---
+
+    def test_journal_appends_instead_of_rewriting(self, tmp_path):
+        rof = RunOutputFile(tmp_path, data={"a": 1}, journal=True)
+        mtime = rof.path.stat().st_mtime_ns
+        rof["b"] = 2
+        rof.update({"c": 3}, print_updated=False)
+        assert rof.journal_path.exists()
+        assert len(rof.journal_path.read_text().splitlines()) == 2
+        assert rof.path.stat().st_mtime_ns == mtime
+
+    def test_journal_replayed_on_load(self, tmp_path):
+        rof = RunOutputFile(tmp_path, data={"a": 1}, journal=True)
+        rof["b"] = 2
+        del rof["a"]
+        rof - ["missing"]
+        rof.log("hello", print_msg=False)
+        reloaded = RunOutputFile(tmp_path, save_every_set=False)
+        assert reloaded.data == {"b": 2}
+        # JSON converts the log levels to strings, in the journal like in the compacted file.
+        assert reloaded.logs[str(logging.INFO)] == ["hello"]
+
+    @pytest.mark.parametrize("serializer", ["json", "msgpack"])
+    def test_journal_replay_matches_compaction(self, tmp_path, serializer):
+        if serializer == "msgpack":
+            pytest.importorskip("msgpack")
+        rof = RunOutputFile(tmp_path, data={"a": 1}, journal=True, serializer=serializer)
+        rof[1] = "int key"
+        rof.update({2: {3: "nested"}}, print_updated=False)
+        del rof["a"]
+        rof.log("hello", print_msg=False)
+        replayed = RunOutputFile.from_file(rof.path, save_every_set=False)
+        rof.compact()
+        compacted = RunOutputFile.from_file(rof.path, save_every_set=False)
+        assert replayed.data == compacted.data
+        assert dict(replayed.logs) == dict(compacted.logs)
+
+    def test_journal_keeps_records_that_cannot_be_encoded(self, tmp_path):
+        rof = RunOutputFile(tmp_path, data={"a": 1}, journal=True)
+        with pytest.raises(TypeError):
+            rof["bad"] = object()
+        assert len(rof._pending_journal) == 1
+        rof._pending_journal[0]["data"]["bad"] = "fixed"
+        rof["b"] = 2
+        assert RunOutputFile(tmp_path, save_every_set=False).data == {"a": 1, "bad": "fixed", "b": 2}
+
+    def test_journal_compact_removes_journal(self, tmp_path):
+        rof = RunOutputFile(tmp_path, journal=True)
+        rof["a"] = 1
+        rof.compact()
+        assert not rof.journal_path.exists()
+        with open(rof.path) as f:
+            assert json.load(f)["data"] == {"a": 1}
+
+    def test_journal_compact_every(self, tmp_path):
+        rof = RunOutputFile(tmp_path, journal=True, journal_compact_every=3)
+        for i in range(3):
+            rof[f"k{i}"] = i
+        assert not rof.journal_path.exists()
+        for i in range(3, 5):
+            rof[f"k{i}"] = i
+        assert len(rof.journal_path.read_text().splitlines()) == 2
+
+    def test_journal_context_manager_compacts(self, tmp_path):
+        with RunOutputFile(tmp_path, journal=True) as rof:
+            rof["a"] = 1
+        assert not rof.journal_path.exists()
+        assert RunOutputFile(tmp_path, save_every_set=False)["a"] == 1
+
+    def test_journal_ignores_already_compacted_records(self, tmp_path):
+        rof = RunOutputFile(tmp_path, journal=True)
+        rof.log("once", print_msg=False)
+        stale = rof.journal_path.read_text()
+        rof.compact()
+        rof.journal_path.write_text(stale)
+        reloaded = RunOutputFile(tmp_path, save_every_set=False)
+        assert sum(len(msgs) for msgs in reloaded.logs.values()) == 1
+
+    def test_journal_ignores_truncated_tail(self, tmp_path):
+        rof = RunOutputFile(tmp_path, journal=True)
+        rof["a"] = 1
+        with open(rof.journal_path, "a") as f:
+            f.write('{"seq": 99, "op": "se')
+        reloaded = RunOutputFile(tmp_path, save_every_set=False)
+        assert reloaded.data == {"a": 1}
+
+    @pytest.mark.parametrize("serializer", ["json", "msgpack"])
+    def test_journal_truncated_tail_is_cut_before_appending(self, tmp_path, serializer):
+        if serializer == "msgpack":
+            pytest.importorskip("msgpack")
+        rof = RunOutputFile(tmp_path, journal=True, serializer=serializer)
+        rof["a"] = 1
+        with open(rof.journal_path, "ab") as f:
+            f.write(rof.serializer.dumps_record({"seq": 99, "op": "update", "data": {"x": 0}})[:-3])
+        # With a save policy, the journal is not compacted when the file is opened.
+        policy = SavePolicy(every_n_changes=2, at_exit=False)
+        reopened = RunOutputFile(tmp_path, journal=True, serializer=serializer, save_policy=policy)
+        assert reopened.data == {"a": 1}
+        reopened["b"] = 2
+        reloaded = RunOutputFile(tmp_path, save_every_set=False, serializer=serializer)
+        assert reloaded.data == {"a": 1, "b": 2}
+
+    def test_journal_truncated_tail_is_kept_by_readers(self, tmp_path):
+        rof = RunOutputFile(tmp_path, journal=True)
+        rof["a"] = 1
+        with open(rof.journal_path, "a") as f:
+            f.write('{"seq": 99, "op": "up')
+        size = rof.journal_path.stat().st_size
+        assert RunOutputFile.read_data_from_file(rof.path) == {"a": 1}
+        assert rof.journal_path.stat().st_size == size
+
+    # --- atomic saves / backup ---
+
+    def test_save_leaves_no_temporary_file(self, tmp_path):
+        rof = RunOutputFile(tmp_path, data={"a": 1}, durability="file")
+        rof["b"] = 2
+        assert os.listdir(tmp_path) == [rof.path.name]
+
+    def test_backup_written_on_save(self, tmp_path):
+        rof = RunOutputFile(tmp_path, data={"a": 1}, backup=True)
+        rof["b"] = 2
+        with open(rof.backup_path) as f:
+            assert json.load(f)["data"] == {"a": 1}
+
+    def test_load_falls_back_to_backup(self, tmp_path):
+        rof = RunOutputFile(tmp_path, data={"a": 1}, backup=True)
+        rof["b"] = 2
+        rof.path.write_text('{"data": {"a": 1, "b"')
+        with pytest.warns(UserWarning, match="backup"):
+            reloaded = RunOutputFile(tmp_path, save_every_set=False, backup=True)
+        assert reloaded.data == {"a": 1}
+
+    def test_corrupted_file_without_backup_warns(self, tmp_path):
+        rof_path = tmp_path / (RunOutputFile.DEFAULT_FILENAME + RunOutputFile.EXT)
+        rof_path.write_text('{"data": ')
+        with pytest.warns(UserWarning, match="Could not decode"):
+            rof = RunOutputFile(tmp_path, save_every_set=False)
+        assert rof.data == {}
+
+    def test_save_after_backup_fallback_keeps_the_backup(self, tmp_path):
+        rof = RunOutputFile(tmp_path, data={"a": 1}, backup=True)
+        rof["b"] = 2
+        rof.path.write_text('{"data": {"a": 1, "b"')
+        with pytest.warns(UserWarning, match="backup"):
+            reloaded = RunOutputFile(tmp_path, backup=True)
+        reloaded["c"] = 3
+        with open(rof.path) as f:
+            assert json.load(f)["data"] == {"a": 1, "c": 3}
+        with open(rof.backup_path) as f:
+            assert json.load(f)["data"] == {"a": 1}
+        reloaded["d"] = 4
+        with open(rof.backup_path) as f:
+            assert json.load(f)["data"] == {"a": 1, "c": 3}
+
+    def test_corrupted_file_is_not_overwritten(self, tmp_path):
+        rof_path = tmp_path / (RunOutputFile.DEFAULT_FILENAME + RunOutputFile.EXT)
+        rof_path.write_text('{"data": ')
+        with pytest.warns(UserWarning, match="Could not decode"):
+            rof = RunOutputFile(tmp_path)
+        assert rof.data == {}
+        assert rof_path.read_text() == '{"data": '
+        with pytest.raises(RuntimeError, match="overwrite"):
+            rof["a"] = 1
+        assert rof_path.read_text() == '{"data": '
+        with pytest.warns(UserWarning, match="Could not decode"):
+            rof = RunOutputFile(tmp_path, data={"a": 1}, overwrite_corrupt=True)
+        with open(rof_path) as f:
+            assert json.load(f)["data"] == {"a": 1}
+
+    # --- ENV store ---
+
+    def test_env_store_keeps_only_a_reference(self, tmp_path, monkeypatch):
+        monkeypatch.setenv("ROF_TEST_VAR", "stored")
+        rof = RunOutputFile(tmp_path / "run", env_store=tmp_path / "store")
+        with open(rof.path) as f:
+            state = json.load(f)
+        assert "ENV" not in state
+        assert state["ENV_REF"]["store"] == "../store"
+        assert rof.get("ENV.ROF_TEST_VAR") == "stored"
+
+    def test_env_store_shared_between_files(self, tmp_path):
+        RunOutputFile(tmp_path / "a", env_store=tmp_path / "store")
+        RunOutputFile(tmp_path / "b", env_store=tmp_path / "store")
+        assert len(list((tmp_path / "store").iterdir())) == 1
+
+    def test_env_store_resolved_lazily_on_reload(self, tmp_path, monkeypatch):
+        monkeypatch.setenv("ROF_TEST_VAR", "original")
+        RunOutputFile(tmp_path, env_store=True)
+        monkeypatch.setenv("ROF_TEST_VAR", "changed")
+        reloaded = RunOutputFile(tmp_path, save_every_set=False)
+        assert reloaded._env is None
+        assert reloaded.get("ENV.ROF_TEST_VAR") == "original"
+
+    def test_env_store_reference_preserved_without_store(self, tmp_path):
+        RunOutputFile(tmp_path, env_store=True)
+        reloaded = RunOutputFile(tmp_path)
+        reloaded["a"] = 1
+        with open(reloaded.path) as f:
+            assert "ENV_REF" in json.load(f)
+
+    def test_env_store_missing_snapshot_warns(self, tmp_path):
+        RunOutputFile(tmp_path, env_store=tmp_path / "store")
+        for file in (tmp_path / "store").iterdir():
+            file.unlink()
+        reloaded = RunOutputFile(tmp_path, save_every_set=False)
+        with pytest.warns(UserWarning, match="missing"):
+            assert reloaded.env == {}
+
+    # --- lazy data-only reading ---
+
+    def test_read_data_from_file(self, tmp_path):
+        rof = RunOutputFile(tmp_path, data={"a": 1, "nested": {"b": [1, 2]}})
+        rof.log("hello", print_msg=False)
+        assert RunOutputFile.read_data_from_file(rof.path) == {"a": 1, "nested": {"b": [1, 2]}}
+
+    def test_read_data_from_file_stops_after_data(self, tmp_path):
+        rof = RunOutputFile(tmp_path, data={"a": 1}, save_every_set=False)
+        rof.save()
+        content = rof.path.read_text()
+        rof.path.write_text(content[: content.index('"logs"')] + "this is not JSON")
+        assert RunOutputFile.read_data_from_file(rof.path) == {"a": 1}
+
+    def test_read_data_from_file_has_no_side_effect(self, tmp_path):
+        rof = RunOutputFile(tmp_path, data={"a": 1})
+        mtime = rof.path.stat().st_mtime_ns
+        RunOutputFile.raveled_state_from_file(rof.path)
+        assert rof.path.stat().st_mtime_ns == mtime
+        assert RunOutputFile.raveled_state_from_file(tmp_path / "missing.out.json") == {}
+        assert not (tmp_path / "missing.out.json").exists()
+
+    def test_read_data_from_file_legacy(self, tmp_path):
+        rof_path = tmp_path / (RunOutputFile.DEFAULT_FILENAME + RunOutputFile.EXT)
+        with open(rof_path, "w") as f:
+            json.dump({"result": 42, "data": {"x": 1}}, f)
+        assert RunOutputFile.read_data_from_file(rof_path) == {"result": 42, "data": {"x": 1}}
+
+    def test_read_data_from_file_replays_journal(self, tmp_path):
+        rof = RunOutputFile(tmp_path, data={"a": 1}, journal=True)
+        rof["b"] = 2
+        assert RunOutputFile.read_data_from_file(rof.path) == {"a": 1, "b": 2}
+
+    def test_read_data_from_file_large_values(self, tmp_path):
+        data = {"big": "x" * 300_000, "number": 123456789, "unicode": "é" * 100_000}
+        rof = RunOutputFile(tmp_path, data=data, serializer="compact_json")
+        assert RunOutputFile.read_data_from_file(rof.path) == data
+
+    def test_raveled_state_from_file_not_lazy(self, tmp_path):
+        rof = RunOutputFile(tmp_path, data={"nested": {"a": 1}})
+        assert RunOutputFile.raveled_state_from_file(rof.path, lazy=False, save_every_set=False) == {"nested.a": 1}
+
+    def test_parse_results_file_column(self, rof, tmp_path):
+        df = RunOutputFile.parse_results_from_dir_to_dataframe(
+            tmp_path, file_column="source", mp_kwargs={"nb_workers": 0, "verbose": False}
+        )
+        assert df["source"].tolist() == [str(rof.path)]
@@ -0,0 +1,148 @@
+import gc
+import json
+import signal
+import threading
+import time
+import weakref
+
+import pytest
+
+from pythonbasictools.experiment_utils import save_policy
+from pythonbasictools.experiment_utils.metadata_file import MetadataFile
+from pythonbasictools.experiment_utils.run_output_file import RunOutputFile
+from pythonbasictools.experiment_utils.save_policy import SavePolicy, _flush_at_exit
+
+
+def _saved_data(rof):
+    with open(rof.path) as f:
+        return json.load(f)["data"]
+
+
+class TestSavePolicy:
+    def test_invalid_every_n_changes(self):
+        with pytest.raises(ValueError):
+            SavePolicy(every_n_changes=0)
+
+    def test_invalid_interval(self):
+        with pytest.raises(ValueError):
+            SavePolicy(interval_ms=-1)
+
+    def test_every_n_changes(self, tmp_path):
+        rof = RunOutputFile(tmp_path, save_policy=SavePolicy(every_n_changes=3))
+        rof["a"] = 1  # The initial save counts as the first change
+        assert not rof.path.exists()
+        rof["b"] = 2
+        assert _saved_data(rof) == {"a": 1, "b": 2}
+        rof["c"] = 3
+        assert _saved_data(rof) == {"a": 1, "b": 2}
+
+    def test_no_trigger_only_flushes_on_close(self, tmp_path):
+        rof = RunOutputFile(tmp_path, save_policy=SavePolicy())
+        for i in range(100):
+            rof[f"k{i}"] = i
+        assert not rof.path.exists()
+        rof.close()
+        assert len(_saved_data(rof)) == 100
+
+    def test_context_manager_flushes(self, tmp_path):
+        with RunOutputFile(tmp_path, save_policy=SavePolicy()) as rof:
+            rof.update({"a": 1}, print_updated=False)
+        assert _saved_data(rof) == {"a": 1}
+
+    def test_flush(self, tmp_path):
+        rof = RunOutputFile(tmp_path, save_policy=SavePolicy())
+        rof["a"] = 1
+        rof.flush()
+        assert _saved_data(rof) == {"a": 1}
+
+    def test_interval_without_background_waits_next_change(self, tmp_path):
+        rof = RunOutputFile(tmp_path, save_policy=SavePolicy(interval_ms=50, background=False))
+        rof["a"] = 1
+        time.sleep(0.1)
+        assert not rof.path.exists()
+        rof["b"] = 2
+        assert _saved_data(rof) == {"a": 1, "b": 2}
+
+    def test_interval_background_thread_flushes(self, tmp_path):
+        rof = RunOutputFile(tmp_path, save_policy=SavePolicy(interval_ms=50))
+        rof["a"] = 1
+        deadline = time.monotonic() + 5.0
+        while not rof.path.exists() and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert _saved_data(rof) == {"a": 1}
+
+    def test_save_every_set_false_ignores_policy(self, tmp_path):
+        rof = RunOutputFile(tmp_path, save_every_set=False, save_policy=SavePolicy(every_n_changes=1))
+        rof["a"] = 1
+        rof.close()
+        assert not rof.path.exists()
+
+    def test_journal_records_are_batched(self, tmp_path):
+        rof = RunOutputFile(tmp_path, journal=True, save_policy=SavePolicy(every_n_changes=5))
+        rof.flush()
+        for i in range(5):
+            rof[f"k{i}"] = i
+        assert len(rof.journal_path.read_text().splitlines()) == 5
+        reloaded = RunOutputFile(tmp_path, save_every_set=False)
+        assert reloaded.data == {f"k{i}": i for i in range(5)}
+
+    def test_metadata_file_accepts_policy(self, tmp_path):
+        meta = MetadataFile(tmp_path, save_policy=SavePolicy())
+        meta["a"] = 1
+        assert not meta.path.exists()
+        meta.close()
+        assert _saved_data(meta) == {"a": 1}
+
+    def test_dropped_target_is_flushed_at_exit(self, tmp_path):
+        rof = RunOutputFile(tmp_path, save_policy=SavePolicy())
+        rof["a"] = 1
+        path, target = rof.path, weakref.ref(rof)
+        del rof
+        gc.collect()
+        assert target() is not None  # Kept alive by its pending changes
+        _flush_at_exit()
+        with open(path) as f:
+            assert json.load(f)["data"] == {"a": 1}
+        gc.collect()
+        assert target() is None
+
+    def test_dropped_target_is_flushed_by_background_thread(self, tmp_path):
+        rof = RunOutputFile(tmp_path, save_policy=SavePolicy(interval_ms=50, at_exit=False))
+        rof["a"] = 1
+        path = rof.path
+        del rof
+        gc.collect()
+        deadline = time.monotonic() + 5.0
+        while not path.exists() and time.monotonic() < deadline:
+            time.sleep(0.01)
+        with open(path) as f:
+            assert json.load(f)["data"] == {"a": 1}
+
+    def test_target_without_later_flush_is_not_kept_alive(self, tmp_path):
+        rof = RunOutputFile(tmp_path, save_policy=SavePolicy(at_exit=False))
+        rof["a"] = 1
+        target = weakref.ref(rof)
+        del rof
+        gc.collect()
+        assert target() is None
+
+    @pytest.mark.skipif(not hasattr(signal, "SIGUSR1"), reason="SIGUSR1 is not available on this platform.")
+    def test_signal_while_the_flusher_lock_is_held(self, tmp_path):
+        previous = signal.signal(signal.SIGUSR1, lambda signum, frame: None)
+        try:
+            rof = RunOutputFile(tmp_path, save_policy=SavePolicy(signals=(signal.SIGUSR1,)))
+            rof["a"] = 1
+
+            def interrupted():
+                # The handler runs in the thread holding the lock, like a signal received in notify_change.
+                with rof._flusher._lock:
+                    save_policy._signal_handler(signal.SIGUSR1, None)
+
+            thread = threading.Thread(target=interrupted, daemon=True)
+            thread.start()
+            thread.join(timeout=10)
+            assert not thread.is_alive()
+            assert _saved_data(rof) == {"a": 1}
+        finally:
+            signal.signal(signal.SIGUSR1, previous)
+            save_policy._PREVIOUS_SIGNAL_HANDLERS.pop(signal.SIGUSR1, None)
@@ -0,0 +1,99 @@
+import os
+
+import pytest
+
+from pythonbasictools.experiment_utils.output_folder import OutputFolder
+from pythonbasictools.experiment_utils.scanner import DirectoryScanner
+
+
+def _touch(path, content=""):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(content)
+    return path
+
+
+class TestDirectoryScanner:
+    @pytest.fixture
+    def tree(self, tmp_path):
+        _touch(tmp_path / "a" / "x.meta.json")
+        _touch(tmp_path / "a" / "x.out.json")
+        _touch(tmp_path / "a" / "b" / "y.out.json")
+        _touch(tmp_path / "a" / "b" / "c" / "z.out.json")
+        _touch(tmp_path / ".git" / "w.out.json")
+        _touch(tmp_path / "other.txt")
+        return tmp_path
+
+    @pytest.fixture
+    def scanner_kwargs(self):
+        return dict(kinds={"metadata": [".meta.json"], "data": [".out.json"]})
+
+    def test_classify(self, tree, scanner_kwargs):
+        files = DirectoryScanner(**scanner_kwargs).scan(tree)
+        assert sorted(files) == ["data", "metadata"]
+        assert files["metadata"] == [tree / "a" / "x.meta.json"]
+        assert sorted(files["data"]) == sorted(
+            [
+                tree / "a" / "x.out.json",
+                tree / "a" / "b" / "y.out.json",
+                tree / "a" / "b" / "c" / "z.out.json",
+                tree / ".git" / "w.out.json",
+            ]
+        )
+
+    def test_first_kind_wins(self, tree):
+        files = DirectoryScanner({"metadata": [".meta.json"], "json": [".json"]}).scan(tree)
+        assert tree / "a" / "x.meta.json" in files["metadata"]
+        assert tree / "a" / "x.meta.json" not in files["json"]
+
+    def test_prune_patterns(self, tree, scanner_kwargs):
+        files = DirectoryScanner(**scanner_kwargs, prune=[".*", "c"]).scan(tree)
+        assert sorted(files["data"]) == sorted([tree / "a" / "x.out.json", tree / "a" / "b" / "y.out.json"])
+
+    def test_prune_callable(self, tree, scanner_kwargs):
+        files = DirectoryScanner(**scanner_kwargs, prune=lambda path: path.endswith("b")).scan(tree)
+        assert tree / "a" / "b" / "y.out.json" not in files["data"]
+        assert tree / "a" / "b" / "c" / "z.out.json" not in files["data"]
+
+    @pytest.mark.parametrize("max_depth, expected", [(0, 0), (1, 2), (2, 3), (3, 4), (None, 4)])
+    def test_max_depth(self, tree, scanner_kwargs, max_depth, expected):
+        files = DirectoryScanner(**scanner_kwargs, max_depth=max_depth).scan(tree)
+        assert len(files["data"]) == expected
+
+    def test_missing_root(self, tmp_path, scanner_kwargs):
+        assert DirectoryScanner(**scanner_kwargs).scan(tmp_path / "missing") == {"metadata": [], "data": []}
+
+    def test_manifest_reused(self, tree, scanner_kwargs, monkeypatch, tmp_path_factory):
+        manifest_path = tmp_path_factory.mktemp("cache") / "manifest.json"
+        expected = DirectoryScanner(**scanner_kwargs).scan(tree)
+        assert DirectoryScanner(**scanner_kwargs, manifest_path=manifest_path).scan(tree) == expected
+        assert manifest_path.exists()
+
+        def _fail(*args, **kwargs):
+            raise AssertionError("The directory should not be listed again.")
+
+        monkeypatch.setattr(DirectoryScanner, "_list_dir", _fail)
+        assert DirectoryScanner(**scanner_kwargs, manifest_path=manifest_path).scan(tree) == expected
+
+    def test_manifest_detects_changes(self, tree, scanner_kwargs):
+        manifest_path = tree / ".manifest.json"
+        DirectoryScanner(**scanner_kwargs, manifest_path=manifest_path).scan(tree)
+        new_file = _touch(tree / "a" / "b" / "new.out.json")
+        stat = os.stat(new_file.parent)
+        os.utime(new_file.parent, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+        files = DirectoryScanner(**scanner_kwargs, manifest_path=manifest_path).scan(tree)
+        assert new_file in files["data"]
+
+    def test_manifest_ignored_for_other_kinds(self, tree, scanner_kwargs):
+        manifest_path = tree / ".manifest.json"
+        DirectoryScanner(**scanner_kwargs, manifest_path=manifest_path).scan(tree)
+        files = DirectoryScanner({"text": [".txt"]}, manifest_path=manifest_path).scan(tree)
+        assert files["text"] == [tree / "other.txt"]
+
+    def test_output_folder_scanner(self, tmp_path):
+        folder = OutputFolder(tmp_path / "run_0")
+        folder.update_metadata(x=0)
+        folder.update_data(y=1)
+        files = OutputFolder.make_scanner().scan(tmp_path)
+        assert files["metadata"] == [folder.metadata_file.path]
+        assert files["data"] == [folder.data_file.path]
+        assert files["state"] == [folder.state_file.path]
@@ -0,0 +1,156 @@
+import json
+import logging
+import math
+
+import pytest
+
+from pythonbasictools.experiment_utils.metadata_file import MetadataFile
+from pythonbasictools.experiment_utils.run_output_file import RunOutputFile
+from pythonbasictools.experiment_utils.serializers import (
+    SERIALIZERS,
+    Serializer,
+    detect_serializer,
+    get_serializer,
+    register_serializer,
+)
+
+AVAILABLE_SERIALIZERS = [name for name, serializer in SERIALIZERS.items() if serializer.is_available()]
+
+
+class _UnavailableSerializer(Serializer):
+    NAME = "unavailable"
+    FALLBACK = "compact_json"
+
+    def is_available(self) -> bool:
+        return False
+
+    def dumps(self, obj):
+        raise NotImplementedError
+
+    def loads(self, raw):
+        raise NotImplementedError
+
+
+class TestSerializers:
+    def test_default_is_json(self, tmp_path):
+        rof = RunOutputFile(tmp_path, data={"a": 1})
+        assert rof.serializer.NAME == "json"
+        with open(rof.path) as f:
+            assert json.load(f)["data"] == {"a": 1}
+
+    def test_unknown_serializer(self):
+        with pytest.raises(ValueError):
+            get_serializer("unknown")
+
+    def test_incomplete_serializer_cannot_be_created(self):
+        class _Incomplete(Serializer):
+            NAME = "incomplete"
+
+            def dumps(self, obj):
+                return json.dumps(obj)
+
+        with pytest.raises(TypeError):
+            _Incomplete()
+
+    def test_fallback_when_unavailable(self):
+        register_serializer(_UnavailableSerializer())
+        try:
+            with pytest.warns(UserWarning, match="not available"):
+                assert get_serializer("unavailable").NAME == "compact_json"
+        finally:
+            SERIALIZERS.pop("unavailable")
+
+    @pytest.mark.parametrize("name", AVAILABLE_SERIALIZERS)
+    def test_round_trip(self, tmp_path, name):
+        rof = RunOutputFile(tmp_path, data={"a": 1, "nested": {"b": [1.5, "x"]}}, serializer=name)
+        rof.log("hello", print_msg=False)
+        reloaded = RunOutputFile(tmp_path, save_every_set=False, serializer=name)
+        assert reloaded.data == {"a": 1, "nested": {"b": [1.5, "x"]}}
+        assert sum(len(msgs) for msgs in reloaded.logs.values()) == 1
+        assert reloaded.env == rof.env
+
+    @pytest.mark.parametrize("name", AVAILABLE_SERIALIZERS)
+    def test_from_file_detects_format(self, tmp_path, name):
+        rof = RunOutputFile(tmp_path, data={"a": 1}, serializer=name)
+        reloaded = RunOutputFile.from_file(rof.path, save_every_set=False)
+        assert reloaded.path == rof.path
+        assert reloaded.data == {"a": 1}
+
+    def test_compact_json_has_no_indentation(self, tmp_path):
+        rof = RunOutputFile(tmp_path, data={"a": 1}, serializer="compact_json")
+        assert "\n" not in rof.path.read_text()
+
+    def test_msgpack_ext(self, tmp_path):
+        pytest.importorskip("msgpack")
+        rof = RunOutputFile(tmp_path, data={"a": 1}, serializer="msgpack")
+        meta = MetadataFile(tmp_path, serializer="msgpack")
+        assert rof.path.name == "run_output.out.msgpack"
+        assert meta.path.name == "METADATA.meta.msgpack"
+        assert detect_serializer(rof.path.read_bytes()).NAME == "msgpack"
+
+    def test_msgpack_keeps_int_log_levels(self, tmp_path):
+        pytest.importorskip("msgpack")
+        rof = RunOutputFile(tmp_path, serializer="msgpack")
+        rof.log("hello", print_msg=False)
+        reloaded = RunOutputFile(tmp_path, save_every_set=False, serializer="msgpack")
+        assert reloaded.logs[logging.INFO] == ["hello"]
+
+    def test_detect_json_with_leading_whitespace(self):
+        assert detect_serializer(b'  \n{"a": 1}').NAME == "json"
+
+    def test_parse_results_reads_every_format(self, tmp_path):
+        RunOutputFile(tmp_path / "a", data={"x": 1})
+        RunOutputFile(tmp_path / "b", data={"x": 2}, serializer="compact_json")
+        if SERIALIZERS["msgpack"].is_available():
+            RunOutputFile(tmp_path / "c", data={"x": 3}, serializer="msgpack")
+        df = RunOutputFile.parse_results_from_dir_to_dataframe(tmp_path, mp_kwargs={"nb_workers": 0, "verbose": False})
+        expected = [1, 2, 3] if SERIALIZERS["msgpack"].is_available() else [1, 2]
+        assert sorted(df["x"].tolist()) == expected
+
+    @pytest.mark.parametrize("name", AVAILABLE_SERIALIZERS)
+    def test_iter_items(self, tmp_path, name):
+        rof = RunOutputFile(tmp_path, data={"a": 1}, serializer=name)
+        with open(rof.path, "rb") as f:
+            items = dict(SERIALIZERS[name].iter_items(f))
+        assert items["data"] == {"a": 1}
+        assert set(items) >= {"datetime", "logs", "path", "ENV", "frozen"}
+
+    @pytest.mark.parametrize("content", [b"", b"[1, 2]", b'{"a": 1', b'{"a" 1}', b'{"a": 1 "b": 2}'])
+    def test_iter_items_invalid_json(self, tmp_path, content):
+        path = tmp_path / "file.json"
+        path.write_bytes(content)
+        with open(path, "rb") as f, pytest.raises(ValueError):
+            list(SERIALIZERS["json"].iter_items(f))
+
+    @pytest.mark.parametrize("content", [b"{}", b" { } ", b'{"a": {"b": [1, 2.5e3, null]}, "c": "}"}'])
+    def test_iter_items_valid_json(self, tmp_path, content):
+        path = tmp_path / "file.json"
+        path.write_bytes(content)
+        with open(path, "rb") as f:
+            assert dict(SERIALIZERS["json"].iter_items(f)) == json.loads(content)
+
+    def test_json_files_are_not_read_with_orjson(self, tmp_path, monkeypatch):
+        orjson = pytest.importorskip("orjson")
+
+        def _fail(raw):
+            raise AssertionError("orjson must only be used when selected")
+
+        monkeypatch.setattr(orjson, "loads", _fail)
+        rof = RunOutputFile(tmp_path, data={"a": 1}, serializer="json")
+        assert RunOutputFile.from_file(rof.path, save_every_set=False).data == {"a": 1}
+        assert RunOutputFile.read_data_from_file(rof.path) == {"a": 1}
+
+    def test_orjson_keeps_non_finite_floats(self, tmp_path):
+        pytest.importorskip("orjson")
+        np = pytest.importorskip("numpy")
+        data = {"nan": float("nan"), "inf": [float("-inf")], "array": np.array([1.0, np.inf]), "x": np.int64(3)}
+        rof = RunOutputFile(tmp_path, data=data, serializer="orjson")
+        reloaded = RunOutputFile.from_file(rof.path, save_every_set=False).data
+        assert math.isnan(reloaded["nan"])
+        assert reloaded["inf"] == [float("-inf")]
+        assert reloaded["array"] == [1.0, float("inf")]
+        assert reloaded["x"] == 3
+
+    def test_orjson_finite_data_is_written_by_orjson(self):
+        pytest.importorskip("orjson")
+        assert get_serializer("orjson").dumps({"a": [1.5, None]}) == b'{"a":[1.5,null]}'
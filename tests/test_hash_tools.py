@@ -1,6 +1,26 @@
+import collections
+import datetime
+import hashlib
+import json
+import pickle
+import sys
+
+import numpy as np
 import pytest
 
 import pythonbasictools as pbt
+from pythonbasictools import hash_tools
+from pythonbasictools.hash_tools import (
+    CanonicalHasher,
+    FrozenDict,
+    FrozenList,
+    fast_algorithm,
+    freeze,
+    hash_args,
+    hash_object,
+    merkle_hash,
+    new_hash,
+)
 
 
 class TestHashTools:
@@ -59,3 +79,233 @@ class TestHashTools:
             assert pbt.hash_dict(d1) == pbt.hash_dict(d2)
         else:
             assert pbt.hash_dict(d1) != pbt.hash_dict(d2)
+
+
+def _json_hash(d):
+    return hashlib.sha256(json.dumps(d, sort_keys=True, separators=(",", ":"), default=str).encode()).hexdigest()
+
+
+class TestCanonicalHasher:
+    @pytest.mark.parametrize(
+        "d",
+        [
+            {},
+            {"a": 1, "b": [1, 2.5, True, None, 'é\n"x', (3, 4)]},
+            {"a": {"z": 1}, "b": {3: "x", 1.5: None, True: 1}, "c": {None: 0}},
+            {"nan": float("nan"), "inf": [float("inf"), -float("inf")], "big": 10**30},
+            {"date": datetime.date(2024, 1, 1), "np_int": np.int64(3), "np_float": np.float64(0.1)},
+            {"ordered": collections.OrderedDict(b=1, a=2), "list": [datetime.date(2024, 1, 1), 1]},
+            {"values": list(range(10_000)), "nested": [[{"a": [1, {"b": 2}]}]]},
+        ],
+    )
+    def test_same_hash_as_json_text(self, d):
+        assert pbt.hash_dict(d) == _json_hash(d)
+
+    def test_containers_are_encoded_at_most_twice(self):
+        class CountingDict(dict):
+            nb_items = 0
+
+            def items(self):
+                CountingDict.nb_items += 1
+                return super().items()
+
+        d = {"leaf": np.arange(3), "date": datetime.date(2024, 1, 1)}
+        for depth in range(10):
+            d = CountingDict(level=depth, child=d)
+        CountingDict.nb_items = 0
+        CanonicalHasher().update(d)
+        # Once by the C encoder, which fails on the array, then once while streaming, whatever the depth.
+        assert CountingDict.nb_items == 2 * 10
+
+    def test_mixed_keys_raise_type_error(self):
+        with pytest.raises(TypeError):
+            pbt.hash_dict({"a": 1, 2: 3})
+        with pytest.raises(TypeError):
+            pbt.hash_dict({(1, 2): 3})
+
+    def test_arrays_are_hashed_by_their_content(self):
+        array = np.arange(10_000)
+        changed = array.copy()
+        changed[5_000] = -1
+        # The string of a large array is truncated, so json cannot tell them apart.
+        assert str(array) == str(changed)
+        assert pbt.hash_dict({"a": array}) != pbt.hash_dict({"a": changed})
+        assert pbt.hash_dict({"a": array}) == pbt.hash_dict({"a": array.copy()})
+
+    @pytest.mark.parametrize(
+        "a1, a2",
+        [
+            (np.zeros(6), np.zeros((2, 3))),
+            (np.zeros(2, dtype=np.float64), np.zeros(4, dtype=np.float32)),
+            (np.zeros(2, dtype=np.float64), np.zeros(16, dtype=np.uint8)),
+        ],
+    )
+    def test_arrays_of_same_bytes_with_other_shape_or_dtype(self, a1, a2):
+        assert pbt.hash_dict({"a": a1}) != pbt.hash_dict({"a": a2})
+
+    def test_non_contiguous_array(self):
+        array = np.arange(12).reshape(3, 4)[:, ::2]
+        assert pbt.hash_dict({"a": array}) == pbt.hash_dict({"a": np.ascontiguousarray(array)})
+
+    def test_object_array(self):
+        assert pbt.hash_dict({"a": np.array([1, "x"], dtype=object)}) != pbt.hash_dict({"a": [1, "x"]})
+        assert pbt.hash_dict({"a": np.array([1, "x"], dtype=object)}) == pbt.hash_dict(
+            {"a": np.array([1, "x"], dtype=object)}
+        )
+
+    def test_bytes_are_hashed_by_their_content(self):
+        assert pbt.hash_dict({"b": b"abc"}) == pbt.hash_dict({"b": bytearray(b"abc")})
+        assert pbt.hash_dict({"b": b"abc"}) != pbt.hash_dict({"b": "b'abc'"})
+        assert pbt.hash_dict({"b": b"abc"}) != pbt.hash_dict({"b": b"abd"})
+
+    def test_streamed_updates(self):
+        hasher = CanonicalHasher()
+        hasher.update({"a": 1})
+        assert hasher.hexdigest() == pbt.hash_dict({"a": 1})
+
+    @pytest.mark.parametrize("algorithm, length", [("sha256", 64), ("blake2b", 128), ("md5", 32), ("sha1", 40)])
+    def test_algorithms(self, algorithm, length):
+        digest = pbt.hash_dict({"a": np.zeros(3)}, algorithm=algorithm)
+        assert len(digest) == length
+        assert digest == pbt.hash_dict({"a": np.zeros(3)}, algorithm=algorithm)
+
+    def test_fast_algorithm(self):
+        assert pbt.hash_dict({"a": 1}, algorithm="fast") == pbt.hash_dict({"a": 1}, algorithm=fast_algorithm())
+
+    @pytest.mark.parametrize("algorithm", ["unknown", "shake_128"])
+    def test_invalid_algorithm(self, algorithm):
+        with pytest.raises(ValueError):
+            new_hash(algorithm)
+
+    def test_xxhash_missing(self, monkeypatch):
+        monkeypatch.setitem(sys.modules, "xxhash", None)
+        with pytest.raises(ImportError):
+            new_hash("xxh3_128")
+        assert fast_algorithm() == "blake2b"
+
+    def test_xxhash(self):
+        pytest.importorskip("xxhash")
+        assert len(pbt.hash_dict({"a": np.zeros(3)}, algorithm="xxh3_128")) == 32
+
+    def test_hash_args(self):
+        assert hash_args((1, np.zeros(2)), {"b": 2}) == pbt.hash_dict({"args": [1, np.zeros(2)], "kwargs": {"b": 2}})
+        assert hash_args((1,), {}, algorithm="md5") != hash_args((1,), {})
+
+
+class TestHashDicts:
+    def test_same_hashes_as_hash_dict(self):
+        base = {"model": {"layers": [{"units": 64, "act": "relu"}, {"units": 32}], "init": None}, "data": {"p": "/x"}}
+        dicts = [{**base, "lr": lr, "w": np.full(2, lr), "date": datetime.date(2024, 1, 1)} for lr in (0.1, 0.2)]
+        dicts += [{**base, "seed": seed} for seed in range(3)] + [base, base, {}]
+        assert pbt.hash_dicts(dicts) == [pbt.hash_dict(d) for d in dicts]
+        assert len(set(pbt.hash_dicts(dicts))) == len(dicts) - 1
+
+    def test_shared_container_with_buffer(self):
+        shared = {"w": np.arange(3), "nested": [{"x": b"abc"}]}
+        dicts = [{"shared": shared, "i": i} for i in range(3)]
+        assert pbt.hash_dicts(dicts) == [pbt.hash_dict(d) for d in dicts]
+
+    def test_algorithm(self):
+        assert pbt.hash_dicts([{"a": 1}], algorithm="md5") == [pbt.hash_dict({"a": 1}, algorithm="md5")]
+
+    def test_mixed_keys_raise_type_error(self):
+        with pytest.raises(TypeError):
+            pbt.hash_dicts([{"a": {"b": [1], 1: 2}}])
+
+
+class TestMerkleHash:
+    config = {"model": {"depth": 4, "layers": [{"units": 64}, {"units": 32}]}, "lr": 0.1, "w": np.zeros(3)}
+
+    def test_frozen_and_plain_give_the_same_hash(self):
+        assert merkle_hash(freeze(self.config)) == merkle_hash(self.config)
+        assert merkle_hash(freeze(self.config), algorithm="md5") == merkle_hash(self.config, algorithm="md5")
+
+    def test_deterministic_and_key_order_independent(self):
+        assert merkle_hash({"a": 1, "b": [2]}) == merkle_hash({"b": [2], "a": 1})
+        assert merkle_hash({"a": {"b": 1}}) != merkle_hash({"a": {"b": 2}})
+
+    @pytest.mark.parametrize(
+        "o1, o2",
+        [
+            ({"a": [1]}, {"a": (1,)}),
+            ({"a": {"b": 1}}, {"a": '{"b":1}'}),
+            ({"a": [1, [2]]}, {"a": [1, 2]}),
+            ({"a": 1}, {"a": "1"}),
+        ],
+    )
+    def test_distinct_structures(self, o1, o2):
+        if isinstance(o1["a"], list) and isinstance(o2["a"], tuple):
+            # The lists and tuples are both sequences, like in hash_dict.
+            assert merkle_hash(o1) == merkle_hash(o2)
+        else:
+            assert merkle_hash(o1) != merkle_hash(o2)
+
+    def test_leaf(self):
+        assert merkle_hash(3) == hash_object(3)
+
+    def test_set_only_hashes_the_changed_path(self, monkeypatch):
+        frozen = freeze(self.config)
+        merkle_hash(frozen)
+        changed = frozen.set(("model", "depth"), 8)
+        assert changed["model"]["layers"] is frozen["model"]["layers"]
+        assert changed["w"] is frozen["w"]
+        recomputed = []
+        original = hash_tools._merkle_digest
+
+        def spy(obj, algorithm):
+            if algorithm not in obj._digests:
+                recomputed.append(obj)
+            return original(obj, algorithm)
+
+        monkeypatch.setattr(hash_tools, "_merkle_digest", spy)
+        digest = merkle_hash(changed)
+        assert [id(obj) for obj in recomputed] == [id(changed), id(changed["model"])]
+        monkeypatch.undo()
+        assert digest == merkle_hash({**self.config, "model": {**self.config["model"], "depth": 8}})
+        assert digest != merkle_hash(frozen)
+
+    def test_set_new_path(self):
+        frozen = FrozenDict({"a": 1})
+        assert frozen.set(("b", "c"), 2) == {"a": 1, "b": {"c": 2}}
+        assert frozen.set("a", [3]) == {"a": (3,)}
+        assert frozen == {"a": 1}
+        with pytest.raises(TypeError):
+            frozen.set(("a", "b"), 2)
+        with pytest.raises(ValueError):
+            frozen.set((), 2)
+
+    @pytest.mark.parametrize(
+        "mutate",
+        [
+            lambda d: d.__setitem__("a", 2),
+            lambda d: d.__delitem__("a"),
+            lambda d: d.update(a=2),
+            lambda d: d.pop("a"),
+            lambda d: d.popitem(),
+            lambda d: d.clear(),
+            lambda d: d.setdefault("b", 1),
+        ],
+    )
+    def test_frozen_dict_is_immutable(self, mutate):
+        frozen = FrozenDict({"a": 1})
+        with pytest.raises(TypeError):
+            mutate(frozen)
+        assert frozen == {"a": 1}
+
+    def test_freeze(self):
+        frozen = freeze({"a": [{"b": [1]}], "c": (2,)})
+        assert isinstance(frozen, FrozenDict)
+        assert isinstance(frozen["a"], FrozenList)
+        assert isinstance(frozen["a"][0], FrozenDict)
+        assert isinstance(frozen["a"][0]["b"], FrozenList)
+        assert freeze(frozen) is frozen
+        assert freeze(3) == 3
+        assert pbt.hash_dict(frozen) == pbt.hash_dict({"a": [{"b": [1]}], "c": [2]})
+
+    def test_pickle(self):
+        frozen = freeze({"a": [{"b": 1}]})
+        merkle_hash(frozen)
+        restored = pickle.loads(pickle.dumps(frozen))
+        assert isinstance(restored["a"], FrozenList)
+        assert restored == frozen
+        assert merkle_hash(restored) == merkle_hash(frozen)
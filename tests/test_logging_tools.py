@@ -0,0 +1,141 @@
+import logging
+import os
+import queue
+import subprocess
+import sys
+import time
+
+import pytest
+
+from pythonbasictools.logging_tools import (
+    BatchingQueueHandler,
+    BatchingQueueListener,
+    ProcessFileHandler,
+    flush_batching_handlers,
+)
+from pythonbasictools.multiprocessing_tools import WorkerPool, apply_func_multiprocess
+
+
+def _record(msg, *args, level=logging.INFO, process_name="MainProcess"):
+    record = logging.LogRecord("test", level, __file__, 0, msg, args, None)
+    record.processName = process_name
+    return record
+
+
+class _ListHandler(logging.Handler):
+    def __init__(self, level=logging.NOTSET):
+        super().__init__(level)
+        self.records = []
+
+    def emit(self, record):
+        self.records.append(record)
+
+
+class TestBatchingQueueHandler:
+    def test_batch_size(self):
+        q = queue.Queue()
+        handler = BatchingQueueHandler(q, batch_size=3, flush_interval=60)
+        handler.handle(_record("a %s", 1))
+        handler.handle(_record("b"))
+        assert q.empty()
+        handler.handle(_record("c"))
+        batch = q.get_nowait()
+        assert [record.getMessage() for record in batch] == ["a 1", "b", "c"]
+        # The records are formatted before being sent, so their arguments are not pickled.
+        assert batch[0].args is None
+        handler.close()
+
+    def test_flush_level_and_flush(self):
+        q = queue.Queue()
+        handler = BatchingQueueHandler(q, batch_size=100, flush_interval=60)
+        handler.handle(_record("a"))
+        handler.handle(_record("b", level=logging.ERROR))
+        assert len(q.get_nowait()) == 2
+        handler.handle(_record("c"))
+        logger = logging.getLogger("test_flush_batching_handlers")
+        logger.addHandler(handler)
+        try:
+            flush_batching_handlers(logger)
+        finally:
+            logger.removeHandler(handler)
+        assert len(q.get_nowait()) == 1
+        handler.close()
+
+    def test_flush_interval(self):
+        q = queue.Queue()
+        handler = BatchingQueueHandler(q, batch_size=100, flush_interval=0.05)
+        handler.handle(_record("a"))
+        assert len(q.get(timeout=5)) == 1
+        handler.close()
+
+    @pytest.mark.parametrize("kwargs", [{"batch_size": 0}, {"flush_interval": 0}])
+    def test_invalid(self, kwargs):
+        with pytest.raises(ValueError):
+            BatchingQueueHandler(queue.Queue(), **kwargs)
+
+
+def test_listener_handles_batches_and_records():
+    q = queue.Queue()
+    handler, warning_handler = _ListHandler(), _ListHandler(logging.WARNING)
+    listener = BatchingQueueListener(q, handler, warning_handler)
+    listener.start()
+    q.put([_record("a"), _record("b", level=logging.WARNING)])
+    q.put(_record("c"))
+    listener.stop()
+    assert [record.getMessage() for record in handler.records] == ["a", "b", "c"]
+    assert [record.getMessage() for record in warning_handler.records] == ["b"]
+
+
+def test_process_file_handler(tmp_path):
+    handler = ProcessFileHandler(str(tmp_path), filename="{processName}.log", max_bytes=100, backup_count=1)
+    handler.setFormatter(logging.Formatter("%(message)s"))
+    handler.handle(_record("first", process_name="Worker-1"))
+    handler.handle(_record("second", process_name="Worker-2"))
+    for i in range(10):
+        handler.handle(_record(f"line {i} of the first worker", process_name="Worker-1"))
+    handler.close()
+    assert (tmp_path / "Worker-2.log").read_text() == "second\n"
+    assert sorted(os.listdir(tmp_path)) == ["Worker-1.log", "Worker-1.log.1", "Worker-2.log"]
+
+
+def test_process_file_handler_closes_the_files_of_exited_processes(tmp_path):
+    exited = subprocess.Popen([sys.executable, "-c", "pass"])
+    exited.wait()
+    handler = ProcessFileHandler(str(tmp_path), filename="{processName}.log")
+    handler.setFormatter(logging.Formatter("%(message)s"))
+    record = _record("from an exited worker", process_name="Worker-1")
+    record.process = exited.pid
+    handler.handle(record)
+    stream = handler._handlers[str(tmp_path / "Worker-1.log")].stream
+    handler.handle(_record("from a new worker", process_name="Worker-2"))
+    assert list(handler._handlers) == [str(tmp_path / "Worker-2.log")]
+    assert stream.closed
+    handler.close()
+    assert (tmp_path / "Worker-1.log").read_text() == "from an exited worker\n"
+
+
+def _log(i):
+    logger = logging.getLogger("test_worker")
+    logger.debug("debug %s", i)
+    logger.info("info %s", i)
+    return i
+
+
+def test_worker_pool_logging_options(tmp_path):
+    log_dir = tmp_path / "logs"
+    options = {"log_dir": str(log_dir), "stream": False, "level": logging.DEBUG, "flush_interval": 60}
+    with WorkerPool(nb_workers=2, logging_options=options) as pool:
+        assert apply_func_multiprocess(_log, [(i,) for i in range(6)], pool=pool, verbose=False) == list(range(6))
+    lines = [line for name in os.listdir(log_dir) for line in (log_dir / name).read_text().splitlines()]
+    assert len(lines) == 12
+    assert any("debug 3" in line for line in lines)
+
+
+def test_terminated_pool_keeps_records(tmp_path):
+    log_dir = tmp_path / "logs"
+    pool = WorkerPool(nb_workers=2, logging_options={"log_dir": str(log_dir), "stream": False, "flush_interval": 60})
+    apply_func_multiprocess(_log, [(i,) for i in range(4)], pool=pool, verbose=False)
+    time.sleep(0.5)  # The queue of the workers sends the records from a thread.
+    pool.terminate()
+    lines = [line for name in os.listdir(log_dir) for line in (log_dir / name).read_text().splitlines()]
+    assert len(lines) == 4
@@ -0,0 +1,103 @@
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from pythonbasictools.multiprocessing_tools import (
+    AsyncioPool,
+    ExecutorPool,
+    apply_func_multiprocess,
+    iter_func_multiprocess,
+)
+
+
+def _add(a, b=0):
+    return a + b
+
+
+async def _async_add(a, b=0):
+    await asyncio.sleep(0.001 * (a % 3))
+    return a + b
+
+
+def _fail(a):
+    raise RuntimeError(a)
+
+
+@pytest.mark.parametrize("backend", ["process", "thread", "asyncio"])
+@pytest.mark.parametrize("chunksize", [1, 4, "auto"])
+def test_backends_ordered(backend, chunksize):
+    func = _async_add if backend == "asyncio" else _add
+    args = [(i,) for i in range(30)]
+    kwargs = [{"b": i} for i in range(30)]
+    results = apply_func_multiprocess(
+        func, args, kwargs, nb_workers=3, backend=backend, chunksize=chunksize, verbose=False
+    )
+    assert results == [2 * i for i in range(30)]
+
+
+@pytest.mark.parametrize("backend", ["thread", "asyncio"])
+def test_backends_unordered(backend):
+    func = _async_add if backend == "asyncio" else _add
+    results = iter_func_multiprocess(func, ((i,) for i in range(20)), nb_workers=2, backend=backend, ordered=False)
+    assert sorted(results) == list(range(20))
+
+
+@pytest.mark.parametrize("backend", ["thread", "asyncio"])
+def test_backends_callbacks(backend):
+    seen = []
+    lock = threading.Lock()
+
+    def _callback(result):
+        with lock:
+            seen.append(result)
+
+    func = _async_add if backend == "asyncio" else _add
+    apply_func_multiprocess(func, [(i,) for i in range(10)], nb_workers=2, backend=backend, callbacks=[_callback])
+    assert sorted(seen) == list(range(10))
+
+
+@pytest.mark.parametrize("backend", ["thread", "asyncio"])
+def test_backends_error(backend):
+    with pytest.raises(RuntimeError):
+        apply_func_multiprocess(_fail, [(1,), (2,)], nb_workers=2, backend=backend, verbose=False)
+
+
+def test_asyncio_plain_function():
+    assert apply_func_multiprocess(_add, [(1, 2)], nb_workers=0, backend="asyncio", verbose=False) == [3]
+
+
+def test_executor_backend_left_running():
+    with ThreadPoolExecutor(2) as executor:
+        assert apply_func_multiprocess(_add, [(1, 2), (3, 4)], backend=executor, verbose=False) == [3, 7]
+        assert executor.submit(_add, 1).result() == 1
+
+
+def test_executor_pool():
+    with ExecutorPool(ThreadPoolExecutor(2), shutdown_executor=True) as pool:
+        assert pool.nb_workers == 2
+        assert apply_func_multiprocess(_add, [(1, 2)], pool=pool, verbose=False) == [3]
+        assert pool.apply_async(_add, (1, 1)).get() == 2
+    assert pool.closed
+    with pytest.raises(ValueError):
+        pool.apply_async(_add, (1,))
+
+
+def test_asyncio_pool_limits_concurrency():
+    running, peak = [0], [0]
+
+    async def _track(_):
+        running[0] += 1
+        peak[0] = max(peak[0], running[0])
+        await asyncio.sleep(0.01)
+        running[0] -= 1
+
+    with AsyncioPool(nb_workers=3) as pool:
+        apply_func_multiprocess(_track, [(i,) for i in range(12)], pool=pool, verbose=False)
+    assert peak[0] == 3
+
+
+def test_unknown_backend():
+    with pytest.raises(ValueError):
+        apply_func_multiprocess(_add, [(1,)], nb_workers=1, backend="gpu", verbose=False)
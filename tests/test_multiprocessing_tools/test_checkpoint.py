@@ -0,0 +1,80 @@
+import os
+
+import pytest
+
+from pythonbasictools.experiment_utils.checkpoint import TaskCheckpoint
+from pythonbasictools.multiprocessing_tools import apply_func_multiprocess
+
+
+def _count_calls(counter_dir, x, y=0):
+    with open(os.path.join(counter_dir, f"{x}_{y}.call"), "a") as f:
+        f.write(".")
+    if x < 0:
+        raise ValueError(x)
+    return x + y
+
+
+def _nb_calls(counter_dir):
+    return sum(os.path.getsize(os.path.join(counter_dir, name)) for name in os.listdir(counter_dir))
+
+
+@pytest.fixture
+def counter_dir(tmp_path):
+    path = tmp_path / "calls"
+    path.mkdir()
+    return str(path)
+
+
+@pytest.mark.parametrize("nb_workers, backend", [(2, "process"), (2, "thread"), (0, "process")])
+def test_resume(tmp_path, counter_dir, nb_workers, backend):
+    path = tmp_path / "run.ckpt"
+    args = [(counter_dir, x) for x in range(8)]
+    kwargs = [{"y": x % 3} for x in range(8)]
+    expected = [x + x % 3 for x in range(8)]
+
+    first = apply_func_multiprocess(
+        _count_calls, args[:5], kwargs[:5], nb_workers=nb_workers, backend=backend, checkpoint=path, verbose=False
+    )
+    assert first == expected[:5]
+    assert _nb_calls(counter_dir) == 5
+
+    results = apply_func_multiprocess(
+        _count_calls, args, kwargs, nb_workers=nb_workers, backend=backend, checkpoint=path, verbose=False
+    )
+    assert results == expected
+    assert _nb_calls(counter_dir) == 8
+    assert len(TaskCheckpoint(path)) == 8
+
+    assert apply_func_multiprocess(_count_calls, args, kwargs, nb_workers=nb_workers, checkpoint=path) == expected
+    assert _nb_calls(counter_dir) == 8
+
+
+def test_results_recorded_before_failure(tmp_path, counter_dir):
+    path = tmp_path / "run.ckpt"
+    args = [(counter_dir, x) for x in [0, 1, -1, 2]]
+    with pytest.raises(ValueError):
+        apply_func_multiprocess(_count_calls, args, nb_workers=1, checkpoint=path, verbose=False)
+    assert len(TaskCheckpoint(path)) >= 2
+
+
+def test_exceptions_not_recorded(tmp_path, counter_dir):
+    path = tmp_path / "run.ckpt"
+    args = [(counter_dir, x) for x in [0, -1, 2]]
+    results = apply_func_multiprocess(
+        _count_calls, args, nb_workers=2, checkpoint=path, return_exceptions=True, verbose=False
+    )
+    assert isinstance(results[1], ValueError)
+    assert len(TaskCheckpoint(path)) == 2
+    apply_func_multiprocess(_count_calls, args, nb_workers=2, checkpoint=path, return_exceptions=True, verbose=False)
+    assert _nb_calls(counter_dir) == 4
+
+
+def test_with_cost_fn_and_chunks(tmp_path, counter_dir):
+    path = tmp_path / "run.ckpt"
+    args = [(counter_dir, x) for x in range(10)]
+    apply_func_multiprocess(_count_calls, args[::2], nb_workers=2, checkpoint=path, verbose=False)
+    results = apply_func_multiprocess(
+        _count_calls, args, nb_workers=2, chunksize=2, cost_fn=lambda d, x: x, checkpoint=path, verbose=False
+    )
+    assert results == list(range(10))
+    assert _nb_calls(counter_dir) == 10
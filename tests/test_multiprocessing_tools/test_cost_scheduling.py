@@ -0,0 +1,80 @@
+import threading
+import time
+
+from pythonbasictools.multiprocessing_tools import (
+    apply_func_multiprocess,
+    iter_func_multiprocess,
+)
+from pythonbasictools.scheduling_tools import TaskCostModel
+
+
+def _sleep(duration):
+    time.sleep(duration)
+    return duration
+
+
+class _Recorder:
+    def __init__(self):
+        self.calls = []
+        self.lock = threading.Lock()
+
+    def __call__(self, x, y=0):
+        with self.lock:
+            self.calls.append(x)
+        return x + y
+
+
+def test_longest_first():
+    func = _Recorder()
+    args = [(x,) for x in [1, 5, 3, 4, 2]]
+    results = apply_func_multiprocess(func, args, nb_workers=1, backend="thread", cost_fn=lambda x: x, verbose=False)
+    assert results == [1, 5, 3, 4, 2]
+    assert func.calls == [5, 4, 3, 2, 1]
+
+
+def test_longest_first_with_kwargs():
+    func = _Recorder()
+    results = apply_func_multiprocess(
+        func,
+        [(x,) for x in range(4)],
+        [{"y": 10 * x} for x in range(4)],
+        nb_workers=1,
+        backend="thread",
+        cost_fn=lambda x, y: y,
+        verbose=False,
+    )
+    assert results == [0, 11, 22, 33]
+    assert func.calls == [3, 2, 1, 0]
+
+
+def test_cost_model_learns_durations(tmp_path):
+    path = tmp_path / "durations.json"
+    durations = [0.01, 0.2, 0.05]
+    results = apply_func_multiprocess(
+        _sleep, [(d,) for d in durations], nb_workers=2, cost_fn=TaskCostModel(path), verbose=False
+    )
+    assert results == durations
+    assert path.exists()
+    model = TaskCostModel(path)
+    costs = model.costs(_sleep, [((d,), {}) for d in durations])
+    for cost, duration in zip(costs, durations):
+        assert duration <= cost < duration + 0.1
+    assert model.costs(_sleep, [((0.2,), {}), ((0.01,), {}), ((0.05,), {})]) == [costs[1], costs[0], costs[2]]
+
+
+def test_iter_records_durations_with_chunks():
+    model = TaskCostModel()
+    durations = [0.01 * i for i in range(6)]
+    results = list(
+        iter_func_multiprocess(
+            _sleep, [(d,) for d in durations], nb_workers=2, chunksize=3, cost_model=model, verbose=False
+        )
+    )
+    assert results == durations
+    for duration in durations:
+        assert duration <= model.predict(_sleep, (duration,)) < duration + 0.1
+
+
+def test_ignored_in_main_process():
+    results = apply_func_multiprocess(_Recorder(), [(x,) for x in range(3)], nb_workers=0, cost_fn=lambda x: x)
+    assert results == [0, 1, 2]
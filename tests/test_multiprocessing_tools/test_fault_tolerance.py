@@ -0,0 +1,129 @@
+import asyncio
+import os
+import time
+
+import pytest
+
+from pythonbasictools.multiprocessing_tools import (
+    TaskError,
+    TaskRunner,
+    TaskTimeoutError,
+    apply_func_multiprocess,
+    iter_func_multiprocess,
+)
+
+
+def _fail_on_odd(i):
+    if i % 2:
+        raise ValueError(i)
+    return i
+
+
+def _flaky(counter_dir, i, nb_failures):
+    path = os.path.join(counter_dir, f"{i}.count")
+    count = int(open(path).read()) if os.path.exists(path) else 0
+    with open(path, "w") as f:
+        f.write(str(count + 1))
+    if count < nb_failures:
+        raise RuntimeError(f"Attempt {count} of task {i} failed.")
+    return i
+
+
+def _sleep(duration):
+    time.sleep(duration)
+    return duration
+
+
+async def _async_sleep(duration):
+    await asyncio.sleep(duration)
+    return duration
+
+
+class _Unpicklable(Exception):
+    def __init__(self, message, resource):
+        super().__init__(message)
+        self.resource = resource
+
+
+def _raise_unpicklable():
+    raise _Unpicklable("boom", resource=lambda: None)
+
+
+def _pid(_):
+    return os.getpid()
+
+
+@pytest.mark.parametrize("backend, nb_workers", [("process", 0), ("process", 2), ("thread", 2)])
+def test_return_exceptions(backend, nb_workers):
+    results = apply_func_multiprocess(
+        _fail_on_odd, [(i,) for i in range(6)], nb_workers=nb_workers, backend=backend, return_exceptions=True
+    )
+    assert results[::2] == [0, 2, 4]
+    assert all(isinstance(r, ValueError) and r.args == (i,) for i, r in zip(range(1, 6, 2), results[1::2]))
+
+
+def test_without_return_exceptions_raises():
+    with pytest.raises(ValueError):
+        apply_func_multiprocess(_fail_on_odd, [(i,) for i in range(4)], nb_workers=2, verbose=False)
+
+
+def test_unpicklable_exception_is_replaced():
+    (result,) = apply_func_multiprocess(_raise_unpicklable, [()], nb_workers=1, return_exceptions=True, verbose=False)
+    assert isinstance(result, TaskError)
+    assert "boom" in str(result)
+
+
+@pytest.mark.parametrize("nb_workers", [0, 2])
+def test_retries(tmp_path, nb_workers):
+    args = [(str(tmp_path), i, 2) for i in range(4)]
+    results = apply_func_multiprocess(_flaky, args, nb_workers=nb_workers, retries=2, retry_delay=0.001, verbose=False)
+    assert results == list(range(4))
+
+
+def test_retries_exhausted(tmp_path):
+    args = [(str(tmp_path), 0, 3)]
+    with pytest.raises(RuntimeError):
+        apply_func_multiprocess(_flaky, args, nb_workers=1, retries=2, retry_delay=0.001, verbose=False)
+    assert open(tmp_path / "0.count").read() == "3"
+
+
+@pytest.mark.parametrize("backend, nb_workers", [("process", 0), ("process", 2), ("thread", 2)])
+def test_timeout(backend, nb_workers):
+    start = time.perf_counter()
+    results = apply_func_multiprocess(
+        _sleep,
+        [(0.0,), (5.0,), (0.01,)],
+        nb_workers=nb_workers,
+        backend=backend,
+        timeout=0.2,
+        return_exceptions=True,
+        verbose=False,
+    )
+    assert time.perf_counter() - start < 4.0
+    assert results[0] == 0.0 and results[2] == 0.01
+    assert isinstance(results[1], TaskTimeoutError)
+
+
+def test_timeout_asyncio():
+    results = apply_func_multiprocess(
+        _async_sleep, [(0.0,), (5.0,)], nb_workers=2, backend="asyncio", timeout=0.1, return_exceptions=True
+    )
+    assert results[0] == 0.0
+    assert isinstance(results[1], TaskTimeoutError)
+
+
+def test_timeout_raises():
+    with pytest.raises(TimeoutError):
+        list(iter_func_multiprocess(_sleep, [(5.0,)], nb_workers=1, timeout=0.1, verbose=False))
+
+
+def test_maxtasksperchild():
+    pids = apply_func_multiprocess(_pid, [(i,) for i in range(6)], nb_workers=1, maxtasksperchild=1, verbose=False)
+    assert len(set(pids)) == 6
+
+
+def test_task_runner_invalid():
+    with pytest.raises(ValueError):
+        TaskRunner(_sleep, timeout=0)
+    with pytest.raises(ValueError):
+        TaskRunner(_sleep, retries=-1)
@@ -0,0 +1,186 @@
+import threading
+import time
+
+import pytest
+
+from pythonbasictools.multiprocessing_tools import (
+    apply_func_multiprocess,
+    iter_func_multiprocess,
+)
+
+
+def _add(a, b=0):
+    return a + b
+
+
+def _sleep_inverse(i, n):
+    time.sleep(0.02 * (n - i))
+    return i
+
+
+def _fail_on(i, bad):
+    if i == bad:
+        raise RuntimeError(f"Task {i} failed.")
+    return i
+
+
+@pytest.mark.parametrize("nb_workers", [0, 2])
+def test_ordered(nb_workers):
+    results = iter_func_multiprocess(_add, ((i, i) for i in range(20)), nb_workers=nb_workers, verbose=False)
+    assert list(results) == [2 * i for i in range(20)]
+
+
+@pytest.mark.parametrize("nb_workers", [0, 2])
+def test_kwargs(nb_workers):
+    results = iter_func_multiprocess(
+        _add, ((i,) for i in range(5)), ({"b": 1} for _ in range(5)), nb_workers=nb_workers, verbose=False
+    )
+    assert list(results) == [i + 1 for i in range(5)]
+
+
+@pytest.mark.parametrize("nb_workers", [0, 2])
+def test_kwargs_length_mismatch(nb_workers):
+    with pytest.raises(ValueError):
+        list(iter_func_multiprocess(_add, [(1,), (2,)], [{}], nb_workers=nb_workers, verbose=False))
+
+
+def test_unordered():
+    n = 6
+    results = list(
+        iter_func_multiprocess(_sleep_inverse, [(i, n) for i in range(n)], nb_workers=n, ordered=False, verbose=False)
+    )
+    assert sorted(results) == list(range(n))
+    assert results != list(range(n))
+
+
+@pytest.mark.parametrize("max_in_flight", [1, 3])
+@pytest.mark.parametrize("ordered", [True, False])
+def test_max_in_flight(max_in_flight, ordered):
+    submitted = []
+
+    def _args():
+        for i in range(10):
+            submitted.append(i)
+            yield (i,)
+
+    results = iter_func_multiprocess(
+        _add, _args(), nb_workers=2, max_in_flight=max_in_flight, ordered=ordered, verbose=False
+    )
+    for nb_results, _ in enumerate(results, start=1):
+        assert len(submitted) <= nb_results + max_in_flight
+    assert len(submitted) == 10
+
+
+def test_max_in_flight_invalid():
+    with pytest.raises(ValueError):
+        list(iter_func_multiprocess(_add, [(1,)], nb_workers=1, max_in_flight=0))
+
+
+@pytest.mark.parametrize("ordered", [True, False])
+def test_error_propagates(ordered):
+    with pytest.raises(RuntimeError):
+        list(iter_func_multiprocess(_fail_on, [(i, 3) for i in range(6)], nb_workers=2, ordered=ordered, verbose=False))
+
+
+def test_early_stop():
+    results = iter_func_multiprocess(_add, ((i,) for i in range(10**9)), nb_workers=2, verbose=False)
+    assert next(results) == 0
+    results.close()
+
+
+def _raise_callback(result):
+    raise ValueError(f"Callback failed on {result}.")
+
+
+@pytest.mark.parametrize("ordered", [True, False])
+@pytest.mark.parametrize("backend", ["process", "thread"])
+def test_callback_error_reaches_the_caller(ordered, backend):
+    errors = []
+
+    def consume():
+        try:
+            list(
+                iter_func_multiprocess(
+                    _add,
+                    [(i,) for i in range(10)],
+                    nb_workers=2,
+                    ordered=ordered,
+                    backend=backend,
+                    callbacks=[_raise_callback],
+                    verbose=False,
+                )
+            )
+        except ValueError as error:
+            errors.append(error)
+
+    consumer = threading.Thread(target=consume, daemon=True)
+    consumer.start()
+    consumer.join(timeout=30)
+    assert not consumer.is_alive()
+    assert len(errors) == 1
+
+
+@pytest.mark.parametrize("ordered", [True, False])
+def test_callbacks_run_in_the_consumer_thread(ordered):
+    threads = set()
+    results = iter_func_multiprocess(
+        _add,
+        [(i,) for i in range(20)],
+        nb_workers=2,
+        ordered=ordered,
+        chunksize=3,
+        callbacks=[lambda *_: threads.add(threading.get_ident())],
+        verbose=False,
+    )
+    assert sorted(results) == list(range(20))
+    assert threads == {threading.get_ident()}
+
+
+def test_callbacks_are_not_mutated():
+    callbacks = []
+    assert apply_func_multiprocess(_add, [(1, 2), (3, 4)], nb_workers=2, callbacks=callbacks, verbose=False) == [3, 7]
+    assert callbacks == []
+
+
+def test_apply_empty():
+    assert apply_func_multiprocess(_add, [], nb_workers=2, verbose=False) == []
+
+
+@pytest.mark.parametrize("chunksize", [1, 3, 100, "auto"])
+@pytest.mark.parametrize("ordered", [True, False])
+def test_chunksize(chunksize, ordered):
+    results = iter_func_multiprocess(
+        _add, [(i, i) for i in range(50)], nb_workers=2, ordered=ordered, chunksize=chunksize, verbose=False
+    )
+    assert sorted(results) == [2 * i for i in range(50)]
+
+
+@pytest.mark.parametrize("chunksize", [3, "auto"])
+def test_chunksize_callbacks_per_item(chunksize):
+    from multiprocessing import Manager
+
+    with Manager() as manager:
+        seen = manager.list()
+        results = apply_func_multiprocess(
+            _add, [(i,) for i in range(20)], nb_workers=2, chunksize=chunksize, callbacks=[seen.append], verbose=False
+        )
+        assert results == list(range(20))
+        assert sorted(seen) == list(range(20))
+
+
+@pytest.mark.parametrize("chunksize", [0, -1, "big", 1.5])
+def test_chunksize_invalid(chunksize):
+    with pytest.raises(ValueError):
+        apply_func_multiprocess(_add, [(1,), (2,)], nb_workers=2, chunksize=chunksize, verbose=False)
+
+
+def test_auto_chunksize_calibration():
+    from pythonbasictools.multiprocessing_tools import _AutoChunksize
+
+    auto_chunksize = _AutoChunksize(nb_workers=2)
+    assert auto_chunksize() == 1
+    auto_chunksize.record(1, 1e-5)
+    assert auto_chunksize() == int(_AutoChunksize.TARGET_CHUNK_DURATION / 1e-5)
+    auto_chunksize.record(1, 10.0)
+    assert auto_chunksize() == 1
+    assert _AutoChunksize(nb_workers=2, total=16).max_chunksize == 2
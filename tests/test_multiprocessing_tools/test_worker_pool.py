@@ -0,0 +1,71 @@
+import os
+
+import pytest
+
+from pythonbasictools.multiprocessing_tools import (
+    WorkerPool,
+    apply_func_multiprocess,
+    get_default_pool,
+    iter_func_multiprocess,
+    shutdown_default_pool,
+)
+
+_WARM = []
+
+
+def _warm_up():
+    _WARM.append(os.getpid())
+
+
+def _is_warm(_):
+    return os.getpid() in _WARM
+
+
+def _pid(_):
+    return os.getpid()
+
+
+def _square(x):
+    return x * x
+
+
+class TestWorkerPool:
+    def test_reused_across_calls(self):
+        with WorkerPool(nb_workers=2) as pool:
+            first = set(apply_func_multiprocess(_pid, [(i,) for i in range(20)], pool=pool, verbose=False))
+            second = set(apply_func_multiprocess(_pid, [(i,) for i in range(20)], pool=pool, verbose=False))
+            assert len(first | second) <= 2
+        assert pool.closed
+
+    def test_initializers(self):
+        with WorkerPool(nb_workers=2, initializers=["json", _warm_up]) as pool:
+            assert all(apply_func_multiprocess(_is_warm, [(i,) for i in range(10)], pool=pool, verbose=False))
+
+    def test_iter_with_pool(self):
+        with WorkerPool(nb_workers=2) as pool:
+            results = iter_func_multiprocess(_square, ((i,) for i in range(10)), pool=pool, verbose=False)
+            assert next(results) == 0
+            results.close()
+            assert not pool.closed
+            assert list(iter_func_multiprocess(_square, [(3,)], pool=pool, verbose=False)) == [9]
+
+    def test_closed_pool(self):
+        pool = WorkerPool(nb_workers=1)
+        pool.close()
+        pool.close()
+        with pytest.raises(ValueError):
+            apply_func_multiprocess(_square, [(1,)], pool=pool, verbose=False)
+
+    def test_no_worker(self):
+        with pytest.raises(ValueError):
+            WorkerPool(nb_workers=0)
+
+    def test_default_pool(self):
+        try:
+            assert apply_func_multiprocess(_square, [(2,), (3,)], nb_workers=2, pool=True, verbose=False) == [4, 9]
+            pool = get_default_pool()
+            assert pool is get_default_pool()
+            assert pool.nb_workers == 2
+        finally:
+            shutdown_default_pool()
+        assert pool.closed
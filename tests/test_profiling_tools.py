@@ -0,0 +1,111 @@
+import asyncio
+import json
+import multiprocessing
+import os
+
+import numpy as np
+import pytest
+
+from pythonbasictools.multiprocessing_tools import (
+    apply_func_multiprocess,
+    iter_func_multiprocess,
+)
+from pythonbasictools.profiling_tools import ProfiledFunc, ProfiledResult, RunProfile
+
+
+def _square(x):
+    return np.full(100, x * x)
+
+
+def _square_together(x, barrier=None):
+    # The tasks given a barrier wait for each other, so they run in distinct workers.
+    if barrier is not None:
+        barrier.wait()
+    return _square(x)
+
+
+async def _async_square(x):
+    await asyncio.sleep(0)
+    return x * x
+
+
+def test_profiled_func():
+    output = ProfiledFunc(_square)(3)
+    assert isinstance(output, ProfiledResult)
+    np.testing.assert_array_equal(output.result, np.full(100, 9))
+    assert output.telemetry["pid"] == os.getpid()
+    assert output.telemetry["started"] <= output.telemetry["ended"]
+    assert output.telemetry["peak_rss"] > 0
+    assert output.telemetry["result_nbytes"] > 800
+    assert "result_nbytes" not in ProfiledFunc(_square, measure_results=False)(3).telemetry
+
+
+def test_profiled_coroutine_function():
+    output = asyncio.run(ProfiledFunc(_async_square)(3))
+    assert output.result == 9
+
+
+@pytest.mark.parametrize("backend, chunksize", [("process", 1), ("process", 3), ("thread", "auto")])
+def test_apply_func_multiprocess_profile(backend, chunksize):
+    profile = RunProfile()
+    with multiprocessing.Manager() as manager:
+        barrier = manager.Barrier(2, timeout=30) if backend == "process" else None
+        # The first tasks of the first two chunks meet at the barrier, so both workers run tasks.
+        together = {0, chunksize} if backend == "process" else set()
+        results = apply_func_multiprocess(
+            _square_together,
+            [(i, barrier if i in together else None) for i in range(10)],
+            nb_workers=2,
+            backend=backend,
+            chunksize=chunksize,
+            profile=profile,
+            verbose=False,
+        )
+    assert [result[0] for result in results] == [i * i for i in range(10)]
+    df = profile.to_dataframe()
+    assert list(df.columns) == RunProfile.COLUMNS
+    assert df["task"].tolist() == list(range(10))
+    assert (df["queue_wait"] >= 0).all() and (df["run_time"] >= 0).all() and (df["transfer_time"] >= 0).all()
+    summary = profile.summary()
+    assert summary["nb_tasks"] == 10
+    assert summary["nb_workers"] == 2
+    assert 0 < summary["utilization"] <= 1
+    assert summary["peak_rss"] > 0
+    if backend == "process":
+        assert summary["nb_processes"] == 2
+        assert summary["args_nbytes"] > 0 and summary["result_nbytes"] > 8000
+        if chunksize == 3:
+            assert summary["nb_chunks"] == 4
+    else:
+        assert summary["nb_processes"] == 1
+        assert summary["args_nbytes"] == 0
+    assert profile.per_worker()["nb_tasks"].sum() == 10
+
+
+def test_iter_func_multiprocess_profile_asyncio():
+    profile = RunProfile()
+    results = list(
+        iter_func_multiprocess(
+            _async_square, [(i,) for i in range(5)], nb_workers=2, backend="asyncio", profile=profile, verbose=False
+        )
+    )
+    assert results == [i * i for i in range(5)]
+    assert len(profile) == 5
+
+
+def test_chrome_trace(tmp_path):
+    profile = RunProfile()
+    apply_func_multiprocess(_square, [(i,) for i in range(4)], nb_workers=2, profile=profile, verbose=False)
+    path = tmp_path / "trace" / "trace.json"
+    trace = profile.to_chrome_trace(path)
+    assert json.loads(path.read_text()) == trace
+    tasks = [event for event in trace["traceEvents"] if event["ph"] == "X"]
+    assert sorted(event["name"] for event in tasks) == [f"task {i}" for i in range(4)]
+    assert all(event["ts"] >= 0 and event["dur"] >= 0 for event in tasks)
+
+
+def test_empty_profile():
+    profile = RunProfile()
+    assert profile.to_dataframe().empty
+    assert profile.summary()["nb_tasks"] == 0
+    assert profile.to_chrome_trace()["traceEvents"] == []
@@ -0,0 +1,59 @@
+import functools
+
+import pytest
+
+from pythonbasictools.scheduling_tools import (
+    TaskCostModel,
+    func_name,
+    longest_first_order,
+)
+
+
+def _task(x, y=0):
+    return x + y
+
+
+def test_longest_first_order():
+    assert longest_first_order([1.0, 3.0, 2.0, 3.0]) == [1, 3, 2, 0]
+    assert longest_first_order([]) == []
+
+
+def test_func_name_unwraps_partials():
+    assert func_name(_task) == f"{__name__}._task"
+    assert func_name(functools.partial(_task, y=1)) == func_name(_task)
+
+
+class TestTaskCostModel:
+    def test_unknown_function(self):
+        model = TaskCostModel()
+        assert model.predict(_task, (1,)) is None
+        assert model.costs(_task, [((1,), {}), ((2,), {})]) == [0.0, 0.0]
+
+    def test_record_and_predict(self):
+        model = TaskCostModel(smoothing=0.5)
+        model.record(_task, (1,), {}, 2.0)
+        model.record(_task, (2,), {"y": 1}, 4.0)
+        assert model.predict(_task, (1,)) == 2.0
+        assert model.predict(_task, (2,), {"y": 1}) == 4.0
+        # An unseen task is estimated by the mean duration of the function.
+        assert model.predict(_task, (3,)) == 3.0
+        model.record(_task, (1,), {}, 4.0)
+        assert model.predict(_task, (1,)) == 3.0
+        assert model.costs(_task, [((1,), {}), ((5,), {})]) == [3.0, 3.5]
+
+    def test_save_and_load(self, tmp_path):
+        path = tmp_path / "cache" / "durations.json"
+        model = TaskCostModel(path)
+        model.record(_task, (1,), {}, 2.0)
+        model.save()
+        assert TaskCostModel(path).predict(_task, (1,)) == 2.0
+
+    def test_custom_key(self):
+        model = TaskCostModel(key_fn=lambda args, kwargs: str(args[0] % 2))
+        model.record(_task, (1,), {}, 2.0)
+        assert model.predict(_task, (3,)) == 2.0
+
+    @pytest.mark.parametrize("smoothing", [0.0, 1.5])
+    def test_invalid_smoothing(self, smoothing):
+        with pytest.raises(ValueError):
+            TaskCostModel(smoothing=smoothing)
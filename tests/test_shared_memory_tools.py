@@ -0,0 +1,142 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from pythonbasictools import shared_memory_tools
+from pythonbasictools.multiprocessing_tools import (
+    WorkerPool,
+    apply_func_multiprocess,
+    iter_func_multiprocess,
+)
+from pythonbasictools.shared_memory_tools import (
+    Shared,
+    SharedArena,
+    SharedArray,
+    SharedMemoryFunc,
+    receive_result,
+)
+
+
+def _row_sum(array, i):
+    return float(array[i].sum())
+
+
+def _is_view(array):
+    return isinstance(array, np.ndarray) and not array.flags.writeable and not array.flags.owndata
+
+
+def _times(array, factor=1):
+    return array * factor
+
+
+def _frame_total(df):
+    return float(df["x"].sum()), list(df["name"])
+
+
+def _nb_attached():
+    return len(shared_memory_tools._ATTACHED) + len(shared_memory_tools._CLOSE_LATER)
+
+
+def _segment_exists(name):
+    from multiprocessing import shared_memory
+
+    try:
+        segment = shared_memory.SharedMemory(name=name)
+    except FileNotFoundError:
+        return False
+    segment.close()
+    return True
+
+
+class TestSharedArena:
+    def test_share_once(self):
+        array = np.arange(10.0)
+        with SharedArena() as arena:
+            handle = arena.share(array)
+            assert isinstance(handle, SharedArray)
+            assert arena.share(array) is handle
+            assert arena.encode((Shared(array), 1), {"a": Shared(array)}) == ((handle, 1), {"a": handle})
+            assert _segment_exists(handle.name)
+        assert not _segment_exists(handle.name)
+
+    def test_auto(self):
+        small, big = np.zeros(2), np.zeros(1000)
+        with SharedArena(auto=True, min_nbytes=100) as arena:
+            args, _ = arena.encode((small, big), {})
+            assert args[0] is small
+            assert isinstance(args[1], SharedArray)
+
+    def test_not_shareable(self):
+        with pytest.raises(ValueError):
+            Shared(np.array([object()]))
+        with pytest.raises(ValueError):
+            Shared([1, 2])
+
+    def test_func_round_trip(self):
+        array = np.arange(12).reshape(3, 4)
+        with SharedArena() as arena:
+            (handle,), _ = arena.encode((Shared(array),), {})
+            result = SharedMemoryFunc(_times, share_results=True)(handle, factor=2)
+            assert isinstance(result, SharedArray)
+            np.testing.assert_array_equal(receive_result(result), array * 2)
+            assert not _segment_exists(result.name)
+
+
+@pytest.mark.parametrize("chunksize", [1, 4])
+def test_shared_args(chunksize):
+    array = np.random.default_rng(0).random((20, 100))
+    results = apply_func_multiprocess(
+        _row_sum, [(Shared(array), i) for i in range(20)], nb_workers=2, chunksize=chunksize, verbose=False
+    )
+    np.testing.assert_allclose(results, array.sum(axis=1))
+
+
+def test_shared_args_are_views():
+    array = np.zeros(10)
+    assert all(apply_func_multiprocess(_is_view, [(Shared(array),)] * 4, nb_workers=2, verbose=False))
+    assert not any(apply_func_multiprocess(_is_view, [(array,)] * 4, nb_workers=2, verbose=False))
+    assert all(apply_func_multiprocess(_is_view, [(array,)] * 4, nb_workers=2, share_args=1, verbose=False))
+
+
+def test_workers_detach_the_segments_after_a_chunk():
+    array = np.random.default_rng(0).random((4, 10))
+    with WorkerPool(nb_workers=1) as pool:
+        apply_func_multiprocess(_row_sum, [(Shared(array), i) for i in range(4)], pool=pool, verbose=False)
+        assert apply_func_multiprocess(_nb_attached, [()], pool=pool, verbose=False) == [0]
+
+
+def test_shared_results():
+    arrays = [np.full((5, 5), i) for i in range(6)]
+    results = apply_func_multiprocess(
+        _times, [(Shared(a), 3) for a in arrays], nb_workers=2, share_results=True, verbose=False
+    )
+    for array, result in zip(arrays, results):
+        np.testing.assert_array_equal(result, array * 3)
+        assert result.flags.writeable
+
+
+@pytest.mark.parametrize("ordered", [True, False])
+def test_shared_results_iter(ordered):
+    results = iter_func_multiprocess(
+        _times, [(np.arange(3), i) for i in range(8)], nb_workers=2, ordered=ordered, share_results=True
+    )
+    assert sorted(int(r.sum()) for r in results) == [3 * i for i in range(8)]
+
+
+def test_shared_dataframe():
+    df = pd.DataFrame({"x": np.arange(5.0), "name": list("abcde")}, index=list("vwxyz"))
+    results = apply_func_multiprocess(_frame_total, [(Shared(df),)] * 3, nb_workers=2, verbose=False)
+    assert results == [(10.0, list("abcde"))] * 3
+
+
+def test_shared_dataframe_result():
+    df = pd.DataFrame({"x": np.arange(5.0), "y": np.arange(5)})
+    (result,) = apply_func_multiprocess(_times, [(Shared(df), 2)], nb_workers=1, share_results=True, verbose=False)
+    pd.testing.assert_frame_equal(result, df * 2)
+
+
+@pytest.mark.parametrize("backend", ["thread"])
+def test_shared_marker_in_memory_backends(backend):
+    array = np.arange(4.0)
+    assert apply_func_multiprocess(_row_sum, [(Shared(array), 1)], nb_workers=1, backend=backend) == [1.0]
+    assert apply_func_multiprocess(_row_sum, [(Shared(array), 2)], nb_workers=0) == [2.0]